@@ -0,0 +1,347 @@
+"""
+Offline parser benchmark over the checked-in LinkedIn fixture corpus.
+
+Runs every parser backend over fixtures/linkedin (detail, list, profile,
+authwall and broken pages) and reports pages/sec, per-field extraction time
+and peak memory, then checks field-level parity between backends. Exits
+non-zero when backends disagree or a backend raises, so parser changes can
+be validated before they land.
+
+Fixtures are anonymized guest-API responses (fictional companies/people).
+Add a page by dropping <kind>_<name>.html into fixtures/linkedin, where
+kind is detail, list, profile, authwall or broken.
+
+Usage:
+    python bench_parsers.py [--iterations 50] [--json bench_output.json]
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import linkedin_scraper as ls
+
+FIXTURE_DIR = os.path.join("fixtures", "linkedin")
+
+# Fixture filename prefix -> corpus kind. Authwall and broken pages are what the
+# detail endpoint returns on a bad day, so they are benchmarked as detail pages.
+KIND_PREFIXES = {
+    'detail': ('detail_', 'authwall_', 'broken_'),
+    'list': ('list_',),
+    'profile': ('profile_',),
+}
+
+BACKENDS = {
+    'detail': {
+        'bs4': lambda page: ls.extract_job_fields(page, 'bs4', fallback=False),
+        'lxml': lambda page: ls.extract_job_fields(page, 'lxml', fallback=False),
+    },
+    'list': {
+        'bs4': lambda page: ls.parse_job_list_entries(page, 'bs4'),
+        'regex': lambda page: ls.parse_job_list_entries(page, 'regex'),
+    },
+    'profile': {
+        'bs4': ls.parse_public_profile,
+    },
+}
+
+
+def load_corpus(fixture_dir: str = FIXTURE_DIR) -> dict:
+    """Returns {kind: [(name, page)]}; list pages stay bytes as in production (response.content)."""
+    corpus = {kind: [] for kind in KIND_PREFIXES}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        name = os.path.basename(path)
+        for kind, prefixes in KIND_PREFIXES.items():
+            if name.startswith(prefixes):
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                corpus[kind].append((name, raw if kind == 'list' else raw.decode('utf-8')))
+                break
+    return corpus
+
+
+def _field_probes():
+    """Per-field locate+extract callables on a pre-parsed tree, one set per detail backend."""
+    from bs4 import BeautifulSoup
+    from lxml import etree, html as lxml_html
+
+    text = ls.get_text_or_none
+    href = ls.get_href_or_none
+
+    def bs4_description(soup):
+        container = soup.find('div', class_='show-more-less-html__markup')
+        if not container:
+            return None
+        return [item.get_text(separator=' ', strip=True) for item in container.find_all(['p', 'ul'])]
+
+    def bs4_criteria(soup):
+        return [(text(item.find('h3', class_='description__job-criteria-subheader')),
+                 text(item.find('span', class_='description__job-criteria-text--criteria')))
+                for item in soup.find_all('li', class_='description__job-criteria-item')]
+
+    bs4_probes = {
+        'job_title': lambda s: text(s.find('h2', class_='top-card-layout__title')),
+        'company': lambda s: text(s.find('a', class_='topcard__org-name-link')),
+        'location': lambda s: text(s.find('span', class_='topcard__flavor--bullet')),
+        'posted_time_ago': lambda s: text(s.find('span', class_='posted-time-ago__text')),
+        'publishing_date': lambda s: ls.extract_publishing_date(text(s.find('span', class_='posted-time-ago__text'))),
+        'num_applicants_note': lambda s: text(s.find('figcaption', class_='num-applicants__caption')),
+        'recruiter_message': lambda s: text(s.select_one('.message-the-recruiter > p')),
+        'recruiter_name': lambda s: text(s.find('h3', class_='base-main-card__title--link')),
+        'recruiter_tagline': lambda s: text(s.find('h4', class_='base-main-card__subtitle')),
+        'job_description': bs4_description,
+        'job_criteria': bs4_criteria,
+        'job_link': lambda s: href(s.find('a', class_='topcard__link', attrs={'data-tracking-control-name': 'public_jobs_topcard-title'})),
+        'company_link': lambda s: href(s.find('a', class_='topcard__org-name-link', attrs={'data-tracking-control-name': 'public_jobs_topcard-org-name'})),
+        'recruiter_link': lambda s: href(s.select_one('div.message-the-recruiter a.base-card__full-link')),
+    }
+
+    def first(expr):
+        xpath = etree.XPath(f"({expr})[1]")
+        return lambda root: next(iter(xpath(root)), None)
+
+    def xtext(expr):
+        find = first(expr)
+        return lambda root: ls._lxml_text(find(root))
+
+    def xhref(expr):
+        find = first(expr)
+
+        def _href(root):
+            el = find(root)
+            return el.get('href') if el is not None else None
+        return _href
+
+    cls = ls._has_class
+    description_xpath = first(f"//div[{cls('show-more-less-html__markup')}]")
+    posted_text = xtext(f"//span[{cls('posted-time-ago__text')}]")
+
+    def lxml_description(root):
+        container = description_xpath(root)
+        if container is None:
+            return None
+        return [ls._lxml_text(item, ' ') for item in container.iter('p', 'ul')]
+
+    def lxml_criteria(root):
+        return [(ls._lxml_text(next(iter(ls._CRITERIA_HEADER_XPATH(item)), None)),
+                 ls._lxml_text(next(iter(ls._CRITERIA_TEXT_XPATH(item)), None)))
+                for item in root.iterfind('.//li') if 'description__job-criteria-item' in (item.get('class') or '').split()]
+
+    lxml_probes = {
+        'job_title': xtext(f"//h2[{cls('top-card-layout__title')}]"),
+        'company': xtext(f"//a[{cls('topcard__org-name-link')}]"),
+        'location': xtext(f"//span[{cls('topcard__flavor--bullet')}]"),
+        'posted_time_ago': posted_text,
+        'publishing_date': lambda root: ls.extract_publishing_date(posted_text(root)),
+        'num_applicants_note': xtext(f"//figcaption[{cls('num-applicants__caption')}]"),
+        'recruiter_message': xtext(f"//*[{cls('message-the-recruiter')}]/p"),
+        'recruiter_name': xtext(f"//h3[{cls('base-main-card__title--link')}]"),
+        'recruiter_tagline': xtext(f"//h4[{cls('base-main-card__subtitle')}]"),
+        'job_description': lxml_description,
+        'job_criteria': lxml_criteria,
+        'job_link': xhref(f"//a[{cls('topcard__link')}][@data-tracking-control-name='public_jobs_topcard-title']"),
+        'company_link': xhref(f"//a[{cls('topcard__org-name-link')}][@data-tracking-control-name='public_jobs_topcard-org-name']"),
+        'recruiter_link': xhref(f"//div[{cls('message-the-recruiter')}]//a[{cls('base-card__full-link')}]"),
+    }
+
+    def lxml_parse(page):
+        try:
+            return lxml_html.document_fromstring(page)
+        except etree.ParserError:
+            return None
+
+    return {
+        'bs4': (lambda page: BeautifulSoup(page, 'lxml'), bs4_probes),
+        'lxml': (lxml_parse, lxml_probes),
+    }
+
+
+def bench_throughput(kind: str, pages: list, iterations: int) -> dict:
+    """pages/sec and ms/page for each backend of a corpus kind."""
+    results = {}
+    for backend, parse in BACKENDS[kind].items():
+        errors = 0
+        for _, page in pages:  # warm-up pass, also surfaces exceptions once
+            try:
+                parse(page)
+            except Exception:
+                errors += 1
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _, page in pages:
+                try:
+                    parse(page)
+                except Exception:
+                    pass
+        elapsed = time.perf_counter() - start
+        n = len(pages) * iterations
+        results[backend] = {
+            'pages': n,
+            'pages_per_sec': round(n / elapsed, 1) if elapsed > 0 else None,
+            'ms_per_page': round(elapsed / n * 1000, 3) if n else None,
+            'errors': errors,
+        }
+    return results
+
+
+def bench_fields(pages: list, iterations: int) -> dict:
+    """Per-field locate+extract time (µs/page) on a pre-parsed tree, plus tree build time."""
+    results = {}
+    for backend, (parse, probes) in _field_probes().items():
+        trees = [parse(page) for _, page in pages]
+        trees = [t for t in trees if t is not None]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _, page in pages:
+                parse(page)
+        timings = {'<parse>': (time.perf_counter() - start) / (iterations * len(pages))}
+        for field, probe in probes.items():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for tree in trees:
+                    probe(tree)
+            timings[field] = (time.perf_counter() - start) / (iterations * max(1, len(trees)))
+        results[backend] = {field: round(t * 1e6, 1) for field, t in timings.items()}
+    return results
+
+
+def _proc_status_kb(field: str):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    # Linux: writing 5 to clear_refs resets VmHWM so the import-time peak doesn't mask the parse peak
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _measure_memory(kind: str, backend: str, fixture_dir: str) -> dict:
+    # Runs in a fresh process so the RSS peak reflects only this backend (lxml trees live outside the Python heap)
+    pages = load_corpus(fixture_dir)[kind]
+    parse = BACKENDS[kind][backend]
+    if _reset_peak_rss():
+        rss_before = _proc_status_kb('VmRSS')
+        read_peak = lambda: _proc_status_kb('VmHWM')
+    else:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        read_peak = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    keep = []
+    for _, page in pages:
+        try:
+            keep.append(parse(page))
+        except Exception:
+            pass
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'python_heap_peak_kb': round(py_peak / 1024, 1),
+        'rss_peak_delta_kb': read_peak() - rss_before,
+    }
+
+
+def bench_memory(kind: str, fixture_dir: str) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+    for backend in BACKENDS[kind]:
+        with ctx.Pool(1) as pool:
+            results[backend] = pool.apply(_measure_memory, (kind, backend, fixture_dir))
+    return results
+
+
+def check_parity(kind: str, pages: list) -> list:
+    """Returns [(page, field, {backend: value})] for every disagreement between backends."""
+    backends = BACKENDS[kind]
+    if len(backends) < 2:
+        return []
+    mismatches = []
+    for name, page in pages:
+        outputs = {}
+        for backend, parse in backends.items():
+            try:
+                outputs[backend] = parse(page)
+            except Exception as e:
+                outputs[backend] = f"<error: {e!r}>"
+        if kind == 'list':
+            outputs = {b: {'entries': v} for b, v in outputs.items()}
+        fields = set()
+        for v in outputs.values():
+            if isinstance(v, dict):
+                fields.update(v)
+        for field in sorted(fields):
+            values = {b: (v.get(field) if isinstance(v, dict) else v) for b, v in outputs.items()}
+            if len({json.dumps(v, sort_keys=True, default=str) for v in values.values()}) > 1:
+                mismatches.append((name, field, values))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LinkedIn HTML parser backends over the fixture corpus")
+    parser.add_argument("--iterations", type=int, default=50, help="Passes over the corpus per backend")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory of *.html fixtures")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report to this JSON file")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the per-backend subprocess memory runs")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixtures)
+    report = {'iterations': args.iterations, 'corpus': {k: [n for n, _ in v] for k, v in corpus.items()}}
+    failed = False
+
+    for kind, pages in corpus.items():
+        if not pages:
+            continue
+        print(f"\n== {kind} ({len(pages)} pages × {args.iterations}) ==")
+        throughput = bench_throughput(kind, pages, args.iterations)
+        memory = {} if args.no_memory else bench_memory(kind, args.fixtures)
+        print(f"{'backend':<8} {'pages/s':>10} {'ms/page':>9} {'errors':>7} {'py_peak_kb':>11} {'rss_delta_kb':>13}")
+        for backend, t in throughput.items():
+            m = memory.get(backend, {})
+            print(f"{backend:<8} {t['pages_per_sec']:>10} {t['ms_per_page']:>9} {t['errors']:>7} "
+                  f"{m.get('python_heap_peak_kb', '-'):>11} {m.get('rss_peak_delta_kb', '-'):>13}")
+            failed = failed or t['errors'] > 0
+        section = {'throughput': throughput, 'memory': memory}
+
+        if kind == 'detail':
+            fields = bench_fields(pages, args.iterations)
+            backends = list(fields)
+            print(f"\n{'field (µs/page)':<22}" + ''.join(f"{b:>10}" for b in backends))
+            for field in fields[backends[0]]:
+                print(f"{field:<22}" + ''.join(f"{fields[b].get(field, '-'):>10}" for b in backends))
+            section['fields_us'] = fields
+
+        mismatches = check_parity(kind, pages)
+        section['parity_mismatches'] = [{'page': n, 'field': f, 'values': v} for n, f, v in mismatches]
+        if mismatches:
+            failed = True
+            print(f"\nPARITY FAIL: {len(mismatches)} field mismatch(es)")
+            for name, field, values in mismatches:
+                print(f"  {name} :: {field} -> {values}")
+        elif len(BACKENDS[kind]) > 1:
+            print(f"\nparity OK across {', '.join(BACKENDS[kind])}")
+        report[kind] = section
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nReport written to {args.json_path}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
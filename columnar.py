@@ -0,0 +1,208 @@
+import argparse
+import csv
+import datetime
+import glob
+import os
+import re
+from typing import Iterable, List, Optional
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without pyarrow only the CSVs are written
+    pa = ds = pq = None
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_RUN_TS_RE = re.compile(r"(\d{8})_(\d{6})")
+
+# Parquet column -> (CSV column, type); company/country/work_type repeat a lot and are dictionary-encoded
+_BASE_FIELDS = [
+    ('id', 'id', 'string'),
+    ('job_title', 'job title', 'string'),
+    ('description', 'description', 'string'),
+    ('company', 'company name', 'string'),
+    ('company_url', 'company linkedin url', 'string'),
+    ('job_url', 'job url', 'string'),
+    ('upload_date', 'upload date', 'string'),
+    ('hiring_manager_name', 'hiring manager name', 'string'),
+    ('hiring_manager_url', 'hiring manager linkedin url', 'string'),
+    ('fit', 'fit', 'int'),
+]
+SEARCH_FIELDS = _BASE_FIELDS + [
+    ('local_score', 'local score', 'float'),
+    ('duplicate_group', 'duplicate group', 'string'),
+    ('country', 'country', 'string'),
+    ('work_type', 'work type', 'string'),
+]
+OUTREACH_FIELDS = _BASE_FIELDS + [
+    ('tailored_cv', 'tailored cv', 'string'),
+    ('message', 'message', 'string'),
+]
+DICTIONARY_COLUMNS = ['company', 'country', 'work_type']
+_FIELDS = {'search': SEARCH_FIELDS, 'outreach': OUTREACH_FIELDS}
+
+
+def available() -> bool:
+    """True when Parquet output is enabled and pyarrow is installed."""
+    return config.PARQUET_ENABLED and pa is not None
+
+
+def dataset_dir(kind: str) -> str:
+    return os.path.join(config.PARQUET_DIR, kind)
+
+
+def run_date(run_ts: str) -> str:
+    """'20251115_051427' -> '2025-11-15' (the partition a run's rows go to)."""
+    m = _RUN_TS_RE.search(run_ts or '')
+    day = m.group(1) if m else datetime.datetime.now().strftime('%Y%m%d')
+    return f"{day[:4]}-{day[4:6]}-{day[6:]}"
+
+
+def _convert(value, kind: str):
+    if kind == 'string':
+        return None if value is None else str(value)
+    m = _NUMBER_RE.search(str(value if value is not None else ''))
+    if m is None:
+        return None
+    return int(float(m.group(0))) if kind == 'int' else float(m.group(0))
+
+
+def _schema(fields):
+    types = {'string': pa.string(), 'int': pa.int32(), 'float': pa.float64()}
+    return pa.schema([(name, types[kind]) for name, _, kind in fields] + [('run_ts', pa.string())])
+
+
+class ParquetRunWriter:
+    """
+    One Parquet file per run at <dataset>/run_date=YYYY-MM-DD/<kind>_<run_ts>.parquet.
+
+    Rows (CSV-column dicts) are buffered and written as row groups of
+    `row_group_rows`, with dictionary-encoded company/country/work_type and
+    config.PARQUET_COMPRESSION. The file is written under a .tmp name and
+    renamed on close(), so readers never see a file without its footer.
+    It is a best-effort copy, not part of the durable commit: rows still in
+    the buffer (or the whole file, if the run dies before close()) are lost
+    on a crash, while the CSV and the processed IDs are already on disk.
+    import_csvs() (`--import-csv`) rebuilds the file from the run's CSV.
+    """
+
+    def __init__(self, kind: str, run_ts: str, row_group_rows: int = 5000):
+        self.fields = _FIELDS[kind]
+        self.run_ts = run_ts
+        self.row_group_rows = max(1, row_group_rows)
+        partition = os.path.join(dataset_dir(kind), f"run_date={run_date(run_ts)}")
+        os.makedirs(partition, exist_ok=True)
+        self.path = os.path.join(partition, f"{kind}_{run_ts}.parquet")
+        self.schema = _schema(self.fields)
+        self._writer = None
+        self._buffer = []
+        self.rows = 0
+
+    def write_rows(self, rows: Iterable[dict]):
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.row_group_rows:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        columns = {name: [_convert(r.get(col), kind) for r in self._buffer] for name, col, kind in self.fields}
+        columns['run_ts'] = [self.run_ts] * len(self._buffer)
+        table = pa.table(columns, schema=self.schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.path + '.tmp', self.schema,
+                compression=config.PARQUET_COMPRESSION,
+                use_dictionary=[c for c in DICTIONARY_COLUMNS if c in self.schema.names],
+            )
+        self._writer.write_table(table)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> Optional[str]:
+        """Write the remaining rows and publish the file; returns its path (None when no rows)."""
+        self._flush()
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        os.replace(self.path + '.tmp', self.path)
+        return self.path
+
+
+def open_writer(kind: str, run_ts: str) -> Optional[ParquetRunWriter]:
+    """Writer for this run's Parquet output; None when Parquet is disabled or pyarrow is missing."""
+    if not available():
+        if config.PARQUET_ENABLED:
+            print("[PARQUET] disabled: pyarrow not installed (pip install -r requirements.txt); only the CSVs are written")
+        return None
+    return ParquetRunWriter(kind, run_ts, config.PARQUET_ROW_GROUP_ROWS)
+
+
+def read_rows(kind: str, columns: List[str], since: str = None, ids: Iterable[str] = None) -> Optional[List[dict]]:
+    """
+    Read only `columns` (Parquet names) of a dataset as a list of dicts.
+
+    since ('YYYY-MM-DD') prunes older run_date partitions without opening
+    them; ids keeps only those job ids. Returns None when Parquet is
+    unavailable or the dataset does not exist, so callers can fall back
+    to the CSVs.
+    """
+    path = dataset_dir(kind)
+    if not available() or not os.path.isdir(path):
+        return None
+    partitioning = ds.partitioning(pa.schema([('run_date', pa.string())]), flavor='hive')
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning, exclude_invalid_files=True)
+    expr = None
+    if since:
+        expr = ds.field('run_date') >= since
+    if ids is not None:
+        id_expr = ds.field('id').isin([str(i) for i in ids])
+        expr = id_expr if expr is None else expr & id_expr
+    return dataset.to_table(columns=columns, filter=expr).to_pylist()
+
+
+def to_csv_row(record: dict, kind: str = 'search') -> dict:
+    """Map a Parquet record back to CSV column names (missing/None values as '')."""
+    out = {}
+    for name, col, _ in _FIELDS[kind]:
+        if name in record:
+            value = record[name]
+            out[col] = '' if value is None else str(value)
+    return out
+
+
+def import_csvs(pattern: str, kind: str = 'search') -> int:
+    """Convert existing run CSVs (named <kind>_<run_ts>.csv) into the Parquet dataset; returns files converted."""
+    converted = 0
+    for csv_path in sorted(glob.glob(pattern)):
+        m = _RUN_TS_RE.search(os.path.basename(csv_path))
+        if not m:
+            continue
+        run_ts = m.group(0)
+        writer = ParquetRunWriter(kind, run_ts, config.PARQUET_ROW_GROUP_ROWS)
+        if os.path.exists(writer.path):
+            continue
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            writer.write_rows(csv.DictReader(f))
+        if writer.close():
+            converted += 1
+            print(f"[PARQUET] {csv_path} -> {writer.path} ({writer.rows} rows)")
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet copies of search / outreach results")
+    parser.add_argument("--import-csv", metavar="GLOB", help="Convert existing run CSVs into the Parquet dataset")
+    parser.add_argument("--kind", choices=sorted(_FIELDS), default="search")
+    args = parser.parse_args()
+    if pa is None:
+        parser.error("pyarrow is not installed (pip install pyarrow)")
+    if args.import_csv:
+        print(f"Converted {import_csvs(args.import_csv, args.kind)} file(s) into {dataset_dir(args.kind)}")
+    else:
+        parser.print_help()
@@ -0,0 +1,229 @@
+import hashlib
+import re
+import threading
+from typing import List
+
+import config
+
+# Tokenizer for budgets and stats, loaded on the first count: litellm (pinned) ships the tiktoken
+# cl100k_base vocabulary in its wheel and points tiktoken's cache at it, so nothing is downloaded.
+# Gemini's own vocabulary is not distributed with any pinned package, so counts are an estimate
+# of Gemini tokens (close for English prose); without it, ~4 characters per token.
+_ENCODING = None
+_ENCODING_LOADED = False
+_ENCODING_LOCK = threading.Lock()
+
+
+def _encoding():
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        with _ENCODING_LOCK:
+            if not _ENCODING_LOADED:
+                try:
+                    from litellm import encoding
+                    _ENCODING = encoding
+                except Exception as e:
+                    print(f"[COMPACT] tokenizer unavailable ({e}); counting ~4 characters per token")
+                _ENCODING_LOADED = True
+    return _ENCODING
+
+# Section headings whose section is pure boilerplate (benefits, EEO/diversity, legal/privacy, how to
+# apply), EN/IT/DE/FR/ES/PT. Company and team sections ("About us", "About the team") are kept: they
+# often carry the stack and seniority details the fit prompt needs.
+_BOILERPLATE_HEADING_RE = re.compile(
+    r"^(?:what we offer|what'?s in it for you|(?:our )?benefits|perks|compensation & benefits|"
+    r"equal (?:employment )?opportunit\w*|diversity(?: & inclusion|, equity)?.*|eeo.*|"
+    r"how to apply|apply now!?|application process|privacy.*|data protection.*|"
+    r"cosa offriamo|offriamo|"
+    r"wir bieten|was wir (?:dir|ihnen) bieten|unser angebot|benefits f[uü]r dich|"
+    r"nous offrons|ce que nous offrons|avantages|"
+    r"(?:lo )?que ofrecemos|ofrecemos|beneficios|"
+    r"o que oferecemos|benef[ií]cios)\s*[:!.]?$",
+    re.IGNORECASE,
+)
+# Standalone boilerplate sentences, dropped wherever they appear
+_BOILERPLATE_LINE_RE = re.compile(
+    r"equal opportunity employer|regardless of (?:race|age|gender)|without regard to (?:race|age)|"
+    r"reasonable accommodation|we (?:celebrate|value|embrace) diversity|committed to (?:diversity|creating an inclusive)|"
+    r"by (?:applying|submitting)[^.]{0,60}(?:agree|consent)|privacy (?:notice|policy)|"
+    r"^apply now!?$|^click (?:on )?apply|only shortlisted candidates|"
+    r"d\.?\s?lgs\.?\s?196|regolamento ue 2016/679|ai sensi (?:della legge|del d)|"
+    r"gleichbehandlung|unabh[äa]ngig von geschlecht",
+    re.IGNORECASE,
+)
+# Paragraphs about the role itself; they end a boilerplate section even without a heading of their own
+_ROLE_CUE_RE = re.compile(
+    r"we(?:'re| are) (?:seeking|looking|hiring)|looking for|you will|you'll|your role|the role|responsibilit|"
+    r"requirements|qualifications|must have|years of experience|"
+    r"cerchiamo|requisiti|nous recherchons|vos missions|profil recherch|buscamos|requisitos|wir suchen|anforderungen",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·▪●◦]|\d+[.)])\s+")
+_NORMALIZE_RE = re.compile(r"[\W_]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def count_tokens(text: str) -> int:
+    """Estimated Gemini token count (bundled cl100k_base vocabulary, else ~4 characters per token)."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _is_heading(block: str) -> bool:
+    line = block.strip()
+    return '\n' not in line and len(line) <= 60 and not _BULLET_RE.match(line) and not line.endswith(('.', ';', ','))
+
+
+def _blocks(text: str) -> List[str]:
+    blocks = []
+    for block in re.split(r"\n\s*\n", text.replace('\r\n', '\n')):
+        block = block.strip('\n')
+        if not block.strip():
+            continue
+        heading, _, rest = block.partition('\n')
+        if rest.strip() and _BOILERPLATE_HEADING_RE.match(heading.strip()):
+            # a boilerplate heading glued to its section (no blank line in between)
+            blocks.extend([heading, rest])
+        else:
+            blocks.append(block)
+    return blocks
+
+
+def _truncate(blocks: List[str], max_tokens: int) -> List[str]:
+    kept, used = [], 0
+    for block in blocks:
+        tokens = count_tokens(block) + 1
+        if used + tokens > max_tokens:
+            remaining = max_tokens - used
+            # keep a head of the block only when a meaningful amount fits
+            if remaining > 20 and not _is_heading(block):
+                lines, part = [], 0
+                for line in block.split('\n'):
+                    part += count_tokens(line) + 1
+                    if part > remaining:
+                        break
+                    lines.append(line)
+                if lines:
+                    kept.append('\n'.join(lines))
+            break
+        kept.append(block)
+        used += tokens
+    # a trailing heading with nothing under it is noise
+    while kept and _is_heading(kept[-1]):
+        kept.pop()
+    return kept
+
+
+def compact_description(text: str, max_tokens: int = None, dropped: list = None) -> str:
+    """
+    Strip boilerplate from a job description and fit it to a token budget.
+
+    Sections under boilerplate headings (benefits, EEO, how to apply,
+    privacy; several languages) are dropped up to the next heading,
+    standalone boilerplate sentences are removed anywhere, repeated bullets
+    are kept once, and the rest is cut at block boundaries to max_tokens.
+    A paragraph that talks about the role ends a boilerplate section early.
+    Each dropped section is appended to `dropped` as (heading, tokens).
+    """
+    if not text:
+        return text or ''
+    kept = []
+    seen_lines = set()
+    skipping = False
+    sections = []  # [heading, tokens] per dropped section
+    for block in _blocks(text):
+        if _is_heading(block):
+            skipping = bool(_BOILERPLATE_HEADING_RE.match(block.strip()))
+            if skipping:
+                sections.append([block.strip(), count_tokens(block)])
+            else:
+                kept.append(block)
+            continue
+        if skipping and not _ROLE_CUE_RE.search(block):
+            sections[-1][1] += count_tokens(block)
+            continue
+        skipping = False
+        lines = []
+        for line in block.split('\n'):
+            if _BOILERPLATE_LINE_RE.search(line.strip()):
+                continue
+            if _BULLET_RE.match(line):
+                key = _NORMALIZE_RE.sub(' ', _BULLET_RE.sub('', line)).strip().lower()
+                if key in seen_lines:
+                    continue
+                seen_lines.add(key)
+            lines.append(line)
+        if lines:
+            kept.append('\n'.join(lines))
+    if max_tokens:
+        kept = _truncate(kept, max_tokens)
+    if not kept:
+        # everything looked like boilerplate: better the raw head than an empty description
+        kept = _truncate(_blocks(text), max_tokens) if max_tokens else _blocks(text)
+    elif dropped is not None:
+        dropped.extend((heading, tokens) for heading, tokens in sections)
+    return _BLANK_LINES_RE.sub('\n\n', '\n\n'.join(kept)).strip()
+
+
+class CompactionStats:
+    """Totals of tokens before/after compaction across a run (each distinct description counted once)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+        self.jobs = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.sections = {}  # lowercased dropped heading -> [sections, tokens]
+
+    def record(self, text: str, before: int, after: int, dropped=()) -> bool:
+        """Add one description's counts; returns False when it was already counted."""
+        digest = hashlib.sha1(text.encode('utf-8')).digest()
+        with self._lock:
+            if digest in self._seen:
+                return False
+            self._seen.add(digest)
+            self.jobs += 1
+            self.tokens_before += before
+            self.tokens_after += after
+            for heading, tokens in dropped:
+                totals = self.sections.setdefault(heading.lower().rstrip(':!. '), [0, 0])
+                totals[0] += 1
+                totals[1] += tokens
+            return True
+
+    def log_stats(self):
+        saved = self.tokens_before - self.tokens_after
+        pct = 100.0 * saved / self.tokens_before if self.tokens_before else 0.0
+        tokenizer = f"{_ENCODING.name} estimate" if _ENCODING is not None else 'chars/4'
+        print(f"[COMPACT] jobs={self.jobs} description tokens {self.tokens_before} -> {self.tokens_after} "
+              f"(saved {saved}, {pct:.1f}%, ~{saved // max(1, self.jobs)}/job, {tokenizer})")
+        # Section drops by heading, largest first, so the savings above can be checked
+        for heading, (count, tokens) in sorted(self.sections.items(), key=lambda kv: -kv[1][1])[:15]:
+            print(f"[COMPACT]   dropped section {heading!r}: {count}x, {tokens} tokens")
+
+
+STATS = CompactionStats()
+
+
+def compact_for_prompt(text: str, label: str = '') -> str:
+    """Compact a description for a prompt per config.COMPACT_*, logging the tokens saved for this job."""
+    if not config.COMPACT_ENABLED or not text:
+        return text or ''
+    before = count_tokens(text)
+    dropped = []
+    compacted = compact_description(text, config.COMPACT_MAX_TOKENS, dropped)
+    after = count_tokens(compacted)
+    if STATS.record(text, before, after, dropped) and before != after:
+        sections = ', '.join(f"{heading!r} -{tokens}" for heading, tokens in dropped)
+        print(f"[COMPACT] {label[:60]} tokens {before} -> {after} (-{before - after})"
+              + (f"; dropped sections: {sections}" if sections else ''))
+    return compacted
+
+
+def log_stats():
+    STATS.log_stats()
@@ -30,13 +30,138 @@ WORK_TYPES = {
 # Scraping settings
 DELAY_BETWEEN_SEARCHES = 1  # seconds
 
+# HTTP client settings (shared pooled session used by all LinkedIn fetches)
+HTTP_CONNECT_TIMEOUT = 5  # seconds to establish the TCP/TLS connection
+HTTP_READ_TIMEOUT = 20  # seconds to wait for response bytes
+HTTP_POOL_CONNECTIONS = 4  # number of host pools kept alive
+HTTP_POOL_MAXSIZE = 16  # keep-alive connections per host
+HTTP_MAX_RETRIES = 3  # retries on connection errors and transient statuses
+HTTP_BACKOFF_FACTOR = 0.5  # exponential backoff base (0.5s, 1s, 2s, ...)
+HTTP_BACKOFF_JITTER = 0.5  # random extra seconds added to every backoff
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Persistent HTTP response cache (compressed, content-addressed, LRU-capped)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # compressed bytes on disk
+HTTP_CACHE_TTLS = {  # seconds per endpoint; 0 or missing = never cached
+    'list': 30 * 60,  # search results change quickly
+    'detail': 3 * 24 * 3600,
+    'description': 3 * 24 * 3600,
+    'profile': 7 * 24 * 3600,
+}
+
+# Recruiter profiles are fetched only for jobs whose outreach message uses them, at most once per
+# URL per run, on a small pool of their own (throttled by PROFILE_RATE_*). Across runs the 'profile'
+# TTL above applies; in CI the HTTP cache is carried between runs by the workflow's actions/cache step
+PROFILE_FETCH_WORKERS = 4
+
+# Shared async LLM layer: AIMD concurrency (grows per success, halves on rate limits) + retries
+LLM_INITIAL_CONCURRENCY = 4
+LLM_MIN_CONCURRENCY = 1
+LLM_MAX_CONCURRENCY = 32
+LLM_MAX_RETRIES = 5  # on rate-limit / timeout / 5xx errors
+LLM_BACKOFF_BASE = 1.0  # seconds; doubled per retry, plus up to this much random jitter
+LLM_BACKOFF_MAX = 30.0
+LLM_ATTEMPT_TIMEOUT = 60  # seconds per attempt
+LLM_DEADLINE = 180  # seconds per request, across all attempts
+
+# LLM prices in USD per 1M (input, output) tokens, for the per-run cost estimate
+LLM_PRICES = {
+    "gemini/gemini-2.5-flash": (0.30, 2.50),
+    "gemini/gemini-2.5-pro": (1.25, 10.00),
+}
+
+# Persistent LLM completion cache (keyed by model, temperature, response_format and both prompts)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"  # set LLM_CACHE=0 to bypass
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # stored completion text, LRU-evicted
+
+# Job detail fetching: concurrency and global token-bucket politeness
+DETAIL_FETCH_WORKERS = 4  # threads fetching detail pages per scrape
+DETAIL_RATE_PER_SEC = 1.5  # sustained detail requests/sec across the process
+DETAIL_RATE_BURST = 3  # requests allowed back-to-back before throttling
+LIST_RATE_PER_SEC = 0.5  # sustained search list-page requests/sec across the process
+LIST_RATE_BURST = 2
+PROFILE_RATE_PER_SEC = 1.0  # sustained recruiter-profile requests/sec across the process
+PROFILE_RATE_BURST = 2
+
+# Job detail HTML parsing: 'lxml' (compiled XPath, fast) or 'bs4' (reference implementation)
+PARSER_BACKEND = "lxml"
+PARSER_PARITY_CHECK = False  # also run bs4 on every page and log field mismatches (slow)
+# Search list-page parsing: 'regex' (job-card IDs straight from the bytes) or 'bs4' (full soup)
+LIST_PARSER = "regex"
+
+# Local pre-filter: jobs scoring below the threshold get a 'local score' and skip the LLM fit call (they
+# are not marked processed, so the next run scores them again with its own threshold)
+# (run `python prefilter.py --calibrate` to compare local scores with past LLM fits)
+PREFILTER_ENABLED = True
+PREFILTER_THRESHOLD = 0.01  # cosine similarity between job and CV (BM25-weighted TF-IDF)
+PREFILTER_CORPUS_SIZE = 2000  # recent job descriptions used for document frequencies
+PREFILTER_REJECT_TITLES = [  # title keywords that score 0, unless a keep keyword or a searched title also matches
+    'rater', 'annotator', 'translator', 'transcriber', 'sales', 'account executive', 'recruiter',
+    'marketing', 'frontend', 'front-end', 'ios', 'android', 'teacher', 'tutor', 'customer support',
+]
+PREFILTER_KEEP_TITLES = [  # title keywords that add PREFILTER_KEEP_BONUS
+    'data', 'ai', 'ml', 'machine learning', 'llm', 'genai', 'architect', 'analytics', 'mlops',
+    'engineer', 'developer', 'scientist', 'cto',
+]
+PREFILTER_KEEP_BONUS = 0.05
+
+# Near-duplicate collapsing (MinHash + LSH over title + company + description): one job per group is
+# scored, duplicates reuse its fit, and outreach contacts one job per group
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.8  # estimated Jaccard similarity of word 5-shingles
+DEDUP_TITLE_THRESHOLD = 0.5  # and at least this share of title words in common
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16  # LSH bands (DEDUP_NUM_PERM / DEDUP_BANDS rows each)
+DEDUP_HISTORY_DAYS = 14  # also match jobs seen in the last N days
+
+# Job description compaction for LLM prompts: boilerplate sections (about us, benefits, EEO, how to
+# apply) and repeated bullets are dropped, then the description is cut to a token budget
+COMPACT_ENABLED = True
+COMPACT_MAX_TOKENS = 700  # per description (estimated tokens, see compaction.count_tokens)
+
+# Output writes (search and outreach): a background writer group-commits rows and their processed IDs
+# every WRITE_GROUP_MAX_ROWS rows or WRITE_GROUP_MAX_DELAY seconds. Durability of each commit:
+# 'none' (left to the OS), 'flush' (flushed to OS buffers) or 'fsync' (on disk before the IDs count);
+# any other value stops search.py / outreach.py at startup
+WRITE_DURABILITY = os.getenv("WRITE_DURABILITY", "fsync")
+WRITE_GROUP_MAX_ROWS = 50
+WRITE_GROUP_MAX_DELAY = 2.0  # seconds
+
+# Columnar copy of search / outreach results (pyarrow, pinned in requirements.txt; skipped with a
+# [PARQUET] log line when it is not installed):
+# <PARQUET_DIR>/<search|outreach>/run_date=YYYY-MM-DD/<kind>_<run_ts>.parquet
+# (gitignored like the caches: a derived copy of the committed CSVs, kept between CI runs by actions/cache)
+PARQUET_ENABLED = True
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_ROWS = 5000
+
+# Per-stage tracing (set TRACE=1): summary table at the end of a run and a Chrome/Perfetto trace
+# JSON (<run csv>_trace.json, open in ui.perfetto.dev or chrome://tracing)
+TRACE_ENABLED = os.getenv("TRACE", "0") == "1"
+TRACE_MAX_EVENTS = 200000  # spans beyond this only count in the summary table
+
 # File paths
 OUTPUT_DIR = "output"
 JSON_OUTPUT_PATH = f"{OUTPUT_DIR}/linkedin_jobs.json"
 OUTREACH_OUTPUT_DIR = f"{OUTPUT_DIR}/outreach"
+PARQUET_DIR = f"{OUTPUT_DIR}/parquet"
 STATE_DIR = f"{OUTPUT_DIR}/state"
+# Append-only processed-ID logs ("<run_ts>\t<job_id>" per line)
+PROCESSED_IDS_LOG_PATH = f"{STATE_DIR}/search_job_ids.log"
+OUTREACH_PROCESSED_IDS_LOG_PATH = f"{STATE_DIR}/outreach_job_ids.log"
+# Legacy JSON state, migrated into the logs above on first run
 PROCESSED_IDS_PATH = f"{STATE_DIR}/search_job_ids.json"
 OUTREACH_PROCESSED_IDS_PATH = f"{STATE_DIR}/outreach_job_ids.json"
+# Indexed SQLite job store (an index derived from the per-run CSVs, which stay the record; rebuild
+# with `python job_store.py --import-csv "output/outreach/*.csv"`) and near-duplicate signatures.
+# Both are gitignored: CI keeps them between runs with actions/cache and rebuilds a missing job
+# store from the committed CSVs (see .github/workflows/scrape.yml)
+JOB_STORE_PATH = f"{STATE_DIR}/jobs.sqlite"
+DEDUP_INDEX_PATH = f"{STATE_DIR}/dedup_signatures.sqlite"
+CACHE_DIR = f"{OUTPUT_DIR}/cache"
+HTTP_CACHE_DIR = f"{CACHE_DIR}/http"
+LLM_CACHE_PATH = f"{CACHE_DIR}/llm/completions.sqlite"
 
 # Common field definitions for job data
 JOB_FIELDS = [
@@ -59,6 +184,16 @@ OUTREACH_CSV_COLUMNS = [
     'fit',
 ]
 
+# Search CSV columns: the outreach columns plus the local pre-filter score and near-duplicate group id
+SEARCH_CSV_COLUMNS = OUTREACH_CSV_COLUMNS + ['local score', 'duplicate group']
+# Final search CSV order: (column, 'text' | 'number', 'asc' | 'desc'); batches are written as sorted
+# runs and merged at the end of the run (sorted_csv)
+SEARCH_SORT_KEYS = [
+    ('company name', 'text', 'asc'),
+    ('fit', 'number', 'desc'),
+]
+SORT_MERGE_FAN_IN = 64  # max run files merged at once
+
 # BigQuery settings
 BIGQUERY_PROJECT="decent-era-411512"
 BIGQUERY_DATASET="jobs_tracker"
@@ -0,0 +1,206 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from typing import Optional, Tuple
+
+import config
+
+_WORD_RE = re.compile(r"\w+")
+# Title words that say nothing about the role itself
+_TITLE_NOISE = frozenset('remote freelance freelancer contract contractor full time part 100 m f d w h x all genders'.split())
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+
+
+def shingles(text: str, k: int = 5) -> set:
+    """Word k-shingles of the normalized text (the whole text when shorter than k words)."""
+    words = _WORD_RE.findall((text or '').lower())
+    if len(words) <= k:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def title_words(title: str) -> frozenset:
+    return frozenset(w for w in _WORD_RE.findall((title or '').lower()) if w not in _TITLE_NOISE)
+
+
+def word_jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def job_text(job: dict) -> str:
+    return f"{job.get('job_title') or ''}\n{job.get('company') or ''}\n{job.get('job_description') or ''}"
+
+
+class MinHasher:
+    """MinHash signatures with stable (crc32-based) hashing, so signatures persist across runs."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, text: str) -> array:
+        hashes = [zlib.crc32(s.encode('utf-8')) for s in shingles(text)]
+        return array('I', (min(((a * h + b) % _PRIME) & _MASK for h in hashes) for a, b in self._perms))
+
+
+def similarity(sig_a: array, sig_b: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate job grouping with MinHash + LSH banding.
+
+    Each job's title + company + description is shingled and MinHashed; LSH
+    buckets propose candidates, which join a group only when their
+    estimated Jaccard similarity is at least `threshold` and their titles
+    share at least `title_threshold` of their words (companies reuse one
+    long template for different roles). A group is named after its first
+    job (the representative). Signatures are persisted (SQLite) so jobs are
+    also matched against the last `history_days` days.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.8, title_threshold: float = 0.5, num_perm: int = 64,
+                 bands: int = 16, history_days: int = 14):
+        self.path = path
+        self.threshold = threshold
+        self.title_threshold = title_threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.history_days = history_days
+        self._lock = threading.Lock()
+        self._conn = None
+        self._buckets = {}  # (band, band bytes) -> [job_id]
+        self._sigs = {}  # job_id -> signature
+        self._titles = {}  # job_id -> title words
+        self._groups = {}  # job_id -> group id
+        self._history = set()  # job ids loaded from previous runs
+        self._history_groups = set()  # group ids loaded from previous runs
+        self.duplicates = 0
+        self._loaded = False
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS signatures ("
+                " job_id TEXT PRIMARY KEY, group_id TEXT, added_at REAL, title TEXT, minhash BLOB)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_added ON signatures(added_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _band_keys(self, sig: array):
+        raw = sig.tobytes()
+        width = self.rows * sig.itemsize
+        return [(b, raw[b * width:(b + 1) * width]) for b in range(self.bands)]
+
+    def _insert(self, job_id: str, group_id: str, sig: array, title: frozenset):
+        # Called with self._lock held
+        self._sigs[job_id] = sig
+        self._titles[job_id] = title
+        self._groups[job_id] = group_id
+        for key in self._band_keys(sig):
+            self._buckets.setdefault(key, []).append(job_id)
+
+    def load_history(self) -> int:
+        """Load signatures from the last history_days days; returns how many were loaded."""
+        with self._lock:
+            if self._loaded:
+                return len(self._history)
+            self._loaded = True
+            since = time.time() - self.history_days * 86400
+            for job_id, group_id, title, blob in self._db().execute(
+                "SELECT job_id, group_id, title, minhash FROM signatures WHERE added_at >= ? ORDER BY added_at", (since,)
+            ):
+                sig = array('I')
+                sig.frombytes(blob)
+                if len(sig) != self.hasher.num_perm:
+                    continue
+                self._insert(job_id, group_id, sig, frozenset((title or '').split()))
+                self._history.add(job_id)
+                self._history_groups.add(group_id)
+            return len(self._history)
+
+    def assign(self, job: dict) -> Tuple[str, Optional[str]]:
+        """
+        Place a job in its near-duplicate group.
+
+        Returns (group_id, representative): representative is None when the
+        job starts a new group (it must be scored), else the id of the
+        group's representative job, whose score it should reuse.
+        """
+        job_id = str(job.get('id'))
+        sig = self.hasher.signature(job_text(job))
+        title = title_words(job.get('job_title'))
+        with self._lock:
+            if job_id in self._groups:
+                group_id = self._groups[job_id]
+                return group_id, (None if group_id == job_id else group_id)
+            best, best_sim = None, self.threshold
+            seen = set()
+            for key in self._band_keys(sig):
+                for other in self._buckets.get(key, ()):
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    if word_jaccard(title, self._titles[other]) < self.title_threshold:
+                        continue
+                    sim = similarity(sig, self._sigs[other])
+                    if sim >= best_sim:
+                        best, best_sim = other, sim
+            group_id = self._groups[best] if best is not None else job_id
+            self._insert(job_id, group_id, sig, title)
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO signatures (job_id, group_id, added_at, title, minhash) VALUES (?, ?, ?, ?, ?)",
+                (job_id, group_id, time.time(), ' '.join(sorted(title)), sig.tobytes()),
+            )
+            db.commit()
+            if best is None:
+                return group_id, None
+            self.duplicates += 1
+            return group_id, group_id
+
+    def from_history(self, group_id: str) -> bool:
+        """True when the group was started by a job of a previous run."""
+        return group_id in self._history_groups
+
+    def log_stats(self):
+        print(f"[DEDUP] Collapsed {self.duplicates} near-duplicate job(s) "
+              f"(threshold={self.threshold}, history={len(self._history)} signatures)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def build_index() -> Optional[DuplicateIndex]:
+    """Index configured from config.DEDUP_*, with history loaded; None when dedup is disabled."""
+    if not config.DEDUP_ENABLED:
+        return None
+    index = DuplicateIndex(
+        config.DEDUP_INDEX_PATH,
+        threshold=config.DEDUP_THRESHOLD,
+        title_threshold=config.DEDUP_TITLE_THRESHOLD,
+        num_perm=config.DEDUP_NUM_PERM,
+        bands=config.DEDUP_BANDS,
+        history_days=config.DEDUP_HISTORY_DAYS,
+    )
+    index.load_history()
+    return index
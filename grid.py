@@ -0,0 +1,88 @@
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List
+
+import config
+import tracing
+
+
+def build_grid(countries: List[str], work_types: List[str], keywords: List[str]) -> List[dict]:
+    """
+    Build the keyword × country × work-type combos, interleaved round-robin by country.
+
+    Each country's combos keep the usual work_type → keyword order, but the
+    resulting list alternates countries so a parallel scheduler never drains
+    one country before starting the next.
+    """
+    per_country = []
+    for country in countries:
+        if country not in config.GEO_IDS:
+            continue
+        combos = []
+        for work_type_name, work_type_val in config.WORK_TYPES.items():
+            # filter only selected work types
+            if work_type_name not in work_types:
+                continue
+            for kw in keywords:
+                combos.append({
+                    'keyword': kw,
+                    'country': country,
+                    'geo_id': config.GEO_IDS[country],
+                    'work_type_name': work_type_name,
+                    'work_type_val': work_type_val,
+                })
+        per_country.append(combos)
+
+    grid = []
+    depth = max((len(c) for c in per_country), default=0)
+    for i in range(depth):
+        for combos in per_country:
+            if i < len(combos):
+                grid.append(combos[i])
+    for idx, combo in enumerate(grid, start=1):
+        combo['idx'] = idx
+    return grid
+
+
+def describe_combo(combo: dict) -> str:
+    return f"kw='{combo['keyword']}', country='{combo['country']}', work_type='{combo['work_type_name']}'"
+
+
+def run_grid(combos: List[dict], scrape_fn: Callable[[dict], object], parallelism: int = 1):
+    """
+    Run scrape_fn over every combo with up to `parallelism` combos in flight.
+
+    scrape_fn returns the combo's jobs (a list) or, for streaming scrapers
+    that hand jobs off as they go, the number of jobs found. Combos are
+    submitted in grid order (already country-interleaved) and results are
+    yielded as they complete: (combo, result, elapsed_seconds). A combo
+    whose scrape raises yields an empty job list.
+    """
+    total = len(combos)
+
+    def _run(combo):
+        print(f"[GRID] {combo['idx']}/{total} → {describe_combo(combo)} start")
+        start = time.perf_counter()
+        try:
+            # spans opened by the scrape on this thread are tagged with the combo
+            with tracing.span('grid.combo', context=True, combo=describe_combo(combo), combo_idx=combo['idx']):
+                jobs = scrape_fn(combo)
+            if jobs is None:  # a count of 0 is a valid streaming result, keep it as an int
+                jobs = []
+        except Exception as e:
+            print(f"ERROR scraping combo {combo['idx']}/{total} ({describe_combo(combo)}): {e}")
+            print(traceback.format_exc())
+            jobs = []
+        return jobs, time.perf_counter() - start
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as ex:
+        futures = {ex.submit(_run, combo): combo for combo in combos}
+        for fut in as_completed(futures):
+            combo = futures[fut]
+            jobs, elapsed = fut.result()
+            done += 1
+            found = jobs if isinstance(jobs, int) else len(jobs)
+            print(f"[GRID] {combo['idx']}/{total} done in {elapsed:.1f}s jobs={found} ({done}/{total} complete) → {describe_combo(combo)}")
+            yield combo, jobs, elapsed
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Common headers to mimic a browser; gzip/deflate is negotiated explicitly
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_retry() -> Retry:
+    retry_kwargs = dict(
+        total=config.HTTP_MAX_RETRIES,
+        connect=config.HTTP_MAX_RETRIES,
+        read=config.HTTP_MAX_RETRIES,
+        status=config.HTTP_MAX_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=config.HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=config.HTTP_BACKOFF_JITTER, **retry_kwargs)
+    except TypeError:
+        # urllib3 < 2.0 has no jitter support; plain exponential backoff
+        return Retry(**retry_kwargs)
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=config.HTTP_POOL_MAXSIZE,
+                    max_retries=_build_retry(),
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+class LatencyStats:
+    """Thread-safe per-endpoint request counters and latency samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._errors = {}
+
+    def record(self, endpoint: str, elapsed: float, ok: bool = True):
+        with self._lock:
+            self._samples.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            out = {}
+            for endpoint, samples in self._samples.items():
+                ordered = sorted(samples)
+                n = len(ordered)
+                out[endpoint] = {
+                    'count': n,
+                    'errors': self._errors.get(endpoint, 0),
+                    'total_s': round(sum(ordered), 3),
+                    'avg_s': round(sum(ordered) / n, 3),
+                    'p50_s': round(ordered[n // 2], 3),
+                    'p95_s': round(ordered[min(n - 1, int(n * 0.95))], 3),
+                    'max_s': round(ordered[-1], 3),
+                }
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._errors.clear()
+
+
+STATS = LatencyStats()
+
+
+def get(url: str, endpoint: str = 'other', timeout=None, **kwargs) -> requests.Response:
+    """
+    GET a URL through the shared pooled session.
+
+    Args:
+        url: URL to fetch
+        endpoint: Label used to group latency stats (e.g. 'list', 'detail', 'profile')
+        timeout: (connect, read) tuple; defaults to the HTTP_* settings in config
+    """
+    if timeout is None:
+        timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    start = time.perf_counter()
+    ok = False
+    try:
+        response = get_session().get(url, timeout=timeout, **kwargs)
+        ok = response.status_code < 400
+        return response
+    finally:
+        STATS.record(endpoint, time.perf_counter() - start, ok)
+
+
+def log_stats():
+    """Log a one-line latency summary per endpoint."""
+    for endpoint, s in STATS.summary().items():
+        logger.info(
+            f"[HTTP] {endpoint}: n={s['count']} errors={s['errors']} total={s['total_s']}s "
+            f"avg={s['avg_s']}s p50={s['p50_s']}s p95={s['p95_s']}s max={s['max_s']}s"
+        )
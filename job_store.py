@@ -0,0 +1,288 @@
+import argparse
+import csv
+import datetime
+import glob
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+import config
+
+# CSV column -> jobs table column (shared by search and outreach rows)
+_JOB_COLUMNS = {
+    'id': 'id',
+    'job title': 'job_title',
+    'description': 'description',
+    'company name': 'company',
+    'company linkedin url': 'company_url',
+    'job url': 'job_url',
+    'upload date': 'upload_date',
+    'hiring manager name': 'hiring_manager_name',
+    'hiring manager linkedin url': 'hiring_manager_url',
+    'fit': 'fit',
+}
+# Search rows (config.SEARCH_CSV_COLUMNS) add the pre-filter score and near-duplicate group;
+# outreach rows the generated outputs
+_SEARCH_COLUMNS = dict(_JOB_COLUMNS, **{'local score': 'local_score', 'duplicate group': 'dup_group'})
+_OUTREACH_COLUMNS = dict(_JOB_COLUMNS, **{'tailored cv': 'tailored_cv', 'message': 'message'})
+# Columns only overwritten by a real value (scores are parsed on write)
+_SCORE_COLUMNS = {'fit', 'local_score', 'dup_group'}
+
+_JOB_DATA_COLUMNS = [c for c in _SEARCH_COLUMNS.values() if c != 'id']
+_FIT_RE = re.compile(r'\d+')
+_CSV_NAME_RE = re.compile(r'^(search|outreach)_(\d{8}_\d{6})\.csv$')
+
+
+def _local_score(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def fit_to_int(value) -> Optional[int]:
+    """Parse a fit value ('7', '7/10', 7) to an int (first number); None when it has none."""
+    m = _FIT_RE.search(str(value or ''))
+    return int(m.group(0)) if m else None
+
+
+class JobStore:
+    """
+    Embedded SQLite index of every job seen by search and outreach, keyed by job id.
+
+    `jobs` holds one row per job (first search run_ts/date_added kept, data
+    refreshed on re-scrape) with indexes on company, fit, date_added and
+    run_ts; `outreach` holds the generated message / tailored CV per job.
+    Writers add whole batches in one transaction. The committed per-run CSVs
+    remain the record: the store is derived from them and can be rebuilt
+    with import_csvs (`--import-csv`); export_csv goes the other way.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, run_ts TEXT, date_added TEXT,"
+                " job_title TEXT, description TEXT, company TEXT, company_url TEXT, job_url TEXT,"
+                " upload_date TEXT, hiring_manager_name TEXT, hiring_manager_url TEXT, fit INTEGER, local_score REAL,"
+                " dup_group TEXT);"
+                "CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company COLLATE NOCASE);"
+                "CREATE INDEX IF NOT EXISTS idx_jobs_fit ON jobs(fit);"
+                "CREATE INDEX IF NOT EXISTS idx_jobs_date_added ON jobs(date_added);"
+                "CREATE INDEX IF NOT EXISTS idx_jobs_run_ts ON jobs(run_ts);"
+                "CREATE TABLE IF NOT EXISTS outreach ("
+                " id TEXT PRIMARY KEY, run_ts TEXT, date_added TEXT, fit INTEGER, message TEXT, tailored_cv TEXT);"
+                "CREATE INDEX IF NOT EXISTS idx_outreach_run_ts ON outreach(run_ts);"
+            )
+            # Stores created by older versions lack the later columns
+            columns = {r['name'] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, sql_type in (('local_score', 'REAL'), ('dup_group', 'TEXT')):
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {sql_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dup_group ON jobs(dup_group)")
+            # Jobs first seen by outreach used to take the outreach run's run_ts, which no search run
+            # could correct; they carry no search run until a search run sees them
+            self._conn.execute("UPDATE jobs SET run_ts = NULL WHERE run_ts IN (SELECT DISTINCT run_ts FROM outreach)")
+            self._conn.commit()
+        return self._conn
+
+    def _upsert_jobs(self, db: sqlite3.Connection, run_ts: str, rows: Iterable[dict], now: str):
+        cols = ', '.join(_JOB_DATA_COLUMNS)
+        marks = ', '.join('?' for _ in _JOB_DATA_COLUMNS)
+        # Keep the first search run/date a job was seen in (run_ts is NULL for jobs only outreach has seen);
+        # refresh its data and only overwrite scores with real ones
+        updates = 'run_ts = COALESCE(run_ts, excluded.run_ts), ' + ', '.join(
+            f"{c} = COALESCE(excluded.{c}, {c})" if c in _SCORE_COLUMNS else f"{c} = excluded.{c}"
+            for c in _JOB_DATA_COLUMNS
+        )
+        params = []
+        for row in rows:
+            jid = str(row.get('id') or '').strip()
+            if not jid:
+                continue
+            values = [
+                fit_to_int(row.get(k)) if c == 'fit' else _local_score(row.get(k)) if c == 'local_score'
+                else (row.get(k) or None) if c == 'dup_group' else (row.get(k) or '')
+                for k, c in _SEARCH_COLUMNS.items() if c != 'id'
+            ]
+            params.append((jid, run_ts, now, *values))
+        db.executemany(
+            f"INSERT INTO jobs (id, run_ts, date_added, {cols}) VALUES (?, ?, ?, {marks})"
+            f" ON CONFLICT(id) DO UPDATE SET {updates}",
+            params,
+        )
+        return len(params)
+
+    def add_search_rows(self, run_ts: str, rows: List[dict], now: str = None) -> int:
+        """Insert or update a batch of search CSV rows in one transaction; returns rows written."""
+        now = now or datetime.datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            db = self._db()
+            with db:
+                return self._upsert_jobs(db, run_ts, rows, now)
+
+    def add_outreach_rows(self, run_ts: str, rows: List[dict], now: str = None) -> int:
+        """Record a batch of outreach CSV rows (job data + message / tailored CV) in one transaction."""
+        now = now or datetime.datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            db = self._db()
+            with db:
+                # Outreach fit scores belong to the outreach table; never overwrite the search fit. Jobs not
+                # seen by a search run get no run_ts, so the search run that finds them sets it
+                written = self._upsert_jobs(db, None, [dict(r, fit='') for r in rows], now)
+                db.executemany(
+                    "INSERT INTO outreach (id, run_ts, date_added, fit, message, tailored_cv) VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET run_ts = excluded.run_ts, date_added = excluded.date_added,"
+                    " fit = excluded.fit, message = excluded.message, tailored_cv = excluded.tailored_cv",
+                    [
+                        (str(r.get('id')), run_ts, now, fit_to_int(r.get('fit')), r.get('message') or '', r.get('tailored cv') or '')
+                        for r in rows if str(r.get('id') or '').strip()
+                    ],
+                )
+                return written
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the stored job as a search CSV row dict (plus 'run_ts'), or None."""
+        with self._lock:
+            row = self._db().execute("SELECT * FROM jobs WHERE id = ?", (str(job_id),)).fetchone()
+        if row is None:
+            return None
+        out = {k: ('' if row[c] is None else str(row[c])) for k, c in _SEARCH_COLUMNS.items()}
+        out['run_ts'] = row['run_ts']
+        return out
+
+    def __contains__(self, job_id) -> bool:
+        with self._lock:
+            return self._db().execute("SELECT 1 FROM jobs WHERE id = ?", (str(job_id),)).fetchone() is not None
+
+    def recent_job_urls(self, min_fit: int = 3, days: int = 1) -> List[str]:
+        """
+        Job URLs with fit > min_fit from search runs of the last `days` days (1 = today), best fit first.
+
+        Only one job per near-duplicate group is returned (the earliest seen).
+        """
+        since = (datetime.date.today() - datetime.timedelta(days=max(1, days) - 1)).strftime('%Y%m%d')
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT job_url, COALESCE(dup_group, id) AS grp, fit FROM jobs"
+                " WHERE run_ts >= ? AND fit > ? AND job_url != ''"
+                " ORDER BY fit DESC, run_ts ASC, date_added ASC",
+                (since, min_fit),
+            ).fetchall()
+        seen = set()
+        urls = []
+        for r in rows:
+            if r['grp'] not in seen:
+                seen.add(r['grp'])
+                urls.append(r['job_url'])
+        return urls
+
+    def group_outreach_id(self, job_id: str) -> Optional[str]:
+        """Id of another job in job_id's near-duplicate group that already has an outreach row, or None."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT o.id FROM jobs j JOIN jobs g ON g.dup_group = j.dup_group JOIN outreach o ON o.id = g.id"
+                " WHERE j.id = ? AND j.dup_group IS NOT NULL AND g.id != j.id LIMIT 1",
+                (str(job_id),),
+            ).fetchone()
+        return row['id'] if row else None
+
+    def recent_descriptions(self, limit: int) -> List[str]:
+        """The `limit` most recently added non-empty job descriptions."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT description FROM jobs WHERE description != '' ORDER BY date_added DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [r['description'] for r in rows]
+
+    def export_csv(self, csv_path: str, run_ts: str = None, outreach: bool = False) -> int:
+        """
+        Write jobs to csv_path, optionally limited to one run, sorted by (company, -fit).
+
+        outreach=True exports the outreach view (OUTREACH_CSV_COLUMNS + tailored cv, message).
+        Returns the number of rows written.
+        """
+        mapping = _OUTREACH_COLUMNS if outreach else _SEARCH_COLUMNS
+        fieldnames = config.OUTREACH_CSV_COLUMNS + ['tailored cv', 'message'] if outreach else config.SEARCH_CSV_COLUMNS
+        if outreach:
+            query = ("SELECT j.id, j.job_title, j.description, j.company, j.company_url, j.job_url, j.upload_date,"
+                     " j.hiring_manager_name, j.hiring_manager_url, o.fit, o.message, o.tailored_cv"
+                     " FROM outreach o JOIN jobs j ON j.id = o.id")
+            where = " WHERE o.run_ts = ?" if run_ts else ""
+            order = " ORDER BY j.company COLLATE NOCASE"
+        else:
+            query = "SELECT * FROM jobs"
+            where = " WHERE run_ts = ?" if run_ts else ""
+            order = " ORDER BY company COLLATE NOCASE, fit DESC"
+        written = 0
+        with self._lock:
+            cursor = self._db().execute(query + where + order, (run_ts,) if run_ts else ())
+            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                for row in cursor:
+                    writer.writerow({k: ('' if row[c] is None else row[c]) for k, c in mapping.items()})
+                    written += 1
+        return written
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+STORE = JobStore(config.JOB_STORE_PATH)
+
+
+def import_csvs(store: JobStore, pattern: str) -> int:
+    """
+    Rebuild/refresh the store from per-run CSVs named search_<run_ts>.csv / outreach_<run_ts>.csv.
+
+    Files are loaded in run order, so each job keeps the first search run
+    that saw it; date_added is the run's time. Returns the rows loaded.
+    """
+    runs = []
+    for path in glob.glob(pattern):
+        m = _CSV_NAME_RE.match(os.path.basename(path))
+        if m:
+            runs.append((m.group(2), m.group(1), path))
+    loaded = 0
+    for run_ts, kind, path in sorted(runs):
+        now = datetime.datetime.strptime(run_ts, '%Y%m%d_%H%M%S').isoformat(timespec='seconds')
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        add = store.add_search_rows if kind == 'search' else store.add_outreach_rows
+        count = add(run_ts, rows, now=now)
+        loaded += count
+        print(f"[STORE] {path}: {count} row(s)")
+    return loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export jobs from the local job store to CSV, or rebuild it from the run CSVs")
+    parser.add_argument("csv_path", nargs="?", help="Destination CSV file")
+    parser.add_argument("--run", default=None, help="Only export one run (run timestamp, e.g. 20251115_051427)")
+    parser.add_argument("--outreach", action="store_true", help="Export outreach rows (with message / tailored cv)")
+    parser.add_argument("--import-csv", metavar="GLOB", help="Load search_/outreach_<run_ts>.csv files into the store")
+    args = parser.parse_args()
+    if args.import_csv:
+        n = import_csvs(STORE, args.import_csv)
+        print(f"Imported {n} rows into {STORE.path}")
+    elif args.csv_path:
+        n = STORE.export_csv(args.csv_path, run_ts=args.run, outreach=args.outreach)
+        print(f"Exported {n} rows -> {args.csv_path}")
+    else:
+        parser.error("give a csv_path to export to, or --import-csv GLOB")
+    STORE.close()
@@ -1,27 +1,62 @@
-import requests
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import time
 import datetime
 import re
+import html as html_lib
 from pathlib import Path
 import pandas as pd
 import logging
 import config
 import os
-import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import http_client
+import response_cache
+from rate_limiter import TokenBucket
+from tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Common headers to mimic a browser
-COMMON_HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+# Common headers to mimic a browser (sent by the shared pooled session)
+COMMON_HEADERS = http_client.DEFAULT_HEADERS
+
+# Global politeness limiter for job detail fetches, shared across threads
+DETAIL_RATE_LIMITER = TokenBucket(config.DETAIL_RATE_PER_SEC, config.DETAIL_RATE_BURST)
+# Separate limiter for search list pages, which parallel grid combos hit concurrently
+LIST_RATE_LIMITER = TokenBucket(config.LIST_RATE_PER_SEC, config.LIST_RATE_BURST)
+# Recruiter profiles: prefetched concurrently by outreach, so they get a politeness limit of their own
+PROFILE_RATE_LIMITER = TokenBucket(config.PROFILE_RATE_PER_SEC, config.PROFILE_RATE_BURST)
+
+# LinkedIn serves sign-in / join interstitials with status 200; they must not be cached as the real page
+_AUTHWALL_RE = re.compile(rb'class="[^"]*\bauthwall|/uas/login-submit|<title>\s*(?:Sign (?:Up|In)|Log In)\s*\|\s*LinkedIn', re.IGNORECASE)
+
+def is_authwall(content):
+    """True when the page is a LinkedIn authwall / sign-in interstitial rather than content."""
+    return bool(_AUTHWALL_RE.search(content if isinstance(content, bytes) else content.encode('utf-8', 'replace')))
+
+def _cacheable_page(response):
+    return not is_authwall(response.content)
+
+# Byte-level markers of a real job page, checked before caching it (no parse: clean_job_html parses it once)
+_JOB_TITLE_MARKER_RE = re.compile(rb'class="[^"]*\btop-card-layout__title\b[^"]*"[^>]*>\s*[^<\s]')
+_JOB_DESCRIPTION_MARKER_RE = re.compile(rb'class="[^"]*\bshow-more-less-html__markup\b[^"]*"[^>]*>')
+_DESCRIPTION_BLOCK_RE = re.compile(rb'<(?:p|ul)\b', re.IGNORECASE)
+
+def _cacheable_job_page(response):
+    # Same fields the extractor's callers rely on: a title, and a description container holding
+    # the <p>/<ul> blocks the description is built from
+    content = response.content
+    if is_authwall(content) or not _JOB_TITLE_MARKER_RE.search(content):
+        return False
+    m = _JOB_DESCRIPTION_MARKER_RE.search(content)
+    return bool(m and _DESCRIPTION_BLOCK_RE.search(content, m.end(), m.end() + 4096))
 
 def get_job_description(job_public_url):
     """Fetch a job description from a public LinkedIn URL"""
-    response = requests.get(job_public_url)
+    response = response_cache.fetch(job_public_url, 'description', cacheable=_cacheable_page)
     soup = BeautifulSoup(response.text, "html.parser")
     description = soup.find('div', class_='description__text description__text--rich').text.strip()  # Example: Job title
     return description
@@ -33,8 +68,8 @@ def get_text_or_none(element):
 def get_href_or_none(element):
     return element['href'] if element and element.has_attr('href') else None
 
-def clean_job_html(html_content, work_type=None, country=None, search_keyword_job_title=None):
-    """Extract structured job data from LinkedIn job HTML"""
+def _extract_job_fields_bs4(html_content):
+    """Reference extractor: BeautifulSoup tree plus one find/select per field."""
     soup = BeautifulSoup(html_content, 'lxml')
 
     # --- Top Card Information ---
@@ -124,21 +159,11 @@ def clean_job_html(html_content, work_type=None, country=None, search_keyword_jo
     # However, in your HTML, the <a> wraps the content.
     recruiter_link = get_href_or_none(recruiter_profile_anchor_element)
 
-    # Extract the publishing date from posted_time_ago
-    publishing_date = extract_publishing_date(posted_time_ago)
-    date_added = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Get work type name if specified
-    work_type_name = config.WORK_TYPE_NAMES.get(work_type, "Unknown")
-
-    # Create and return a dictionary with all extracted variables
-    job_data = {
+    return {
         "job_title": job_title,
         "company": company_name,
         "location": location,
         "posted_time_ago": posted_time_ago,
-        "publishing_date": publishing_date,
-        "date_added": date_added,
         "num_applicants_note": num_applicants_note,
         "recruiter_message": recruiter_message,
         "recruiter_name": recruiter_name,
@@ -151,6 +176,185 @@ def clean_job_html(html_content, work_type=None, country=None, search_keyword_jo
         "job_link": job_link,
         "company_link": company_link,
         "recruiter_link": recruiter_link,
+    }
+
+_JOB_FIELD_KEYS = (
+    "job_title", "company", "location", "posted_time_ago", "num_applicants_note",
+    "recruiter_message", "recruiter_name", "recruiter_tagline", "job_description",
+    "seniority_level", "employment_type", "job_function", "industries",
+    "job_link", "company_link", "recruiter_link",
+)
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# One precompiled XPath union selecting every node clean_job_html needs; libxml2
+# returns the matches in document order, so "first match" semantics match bs4's find()
+_JOB_NODES_XPATH = etree.XPath(" | ".join([
+    f"//h2[{_has_class('top-card-layout__title')}]",
+    f"//a[{_has_class('topcard__org-name-link')} or {_has_class('topcard__link')} or {_has_class('base-card__full-link')}]",
+    f"//span[{_has_class('topcard__flavor--bullet')} or {_has_class('posted-time-ago__text')}]",
+    f"//figcaption[{_has_class('num-applicants__caption')}]",
+    f"//*[{_has_class('message-the-recruiter')}]/p",
+    f"//h3[{_has_class('base-main-card__title--link')}]",
+    f"//h4[{_has_class('base-main-card__subtitle')}]",
+    f"//div[{_has_class('show-more-less-html__markup')}]",
+    f"//li[{_has_class('description__job-criteria-item')}]",
+]))
+_CRITERIA_HEADER_XPATH = etree.XPath(f".//h3[{_has_class('description__job-criteria-subheader')}]")
+_CRITERIA_TEXT_XPATH = etree.XPath(f".//span[{_has_class('description__job-criteria-text--criteria')}]")
+_RECRUITER_CARD_XPATH = etree.XPath(f"ancestor::div[{_has_class('message-the-recruiter')}]")
+
+_CRITERIA_FIELDS = {
+    'Seniority level': 'seniority_level',
+    'Employment type': 'employment_type',
+    'Job function': 'job_function',
+    'Industries': 'industries',
+}
+
+def _lxml_text(element, separator=''):
+    """lxml equivalent of bs4 get_text(separator=..., strip=True)."""
+    if element is None:
+        return None
+    return separator.join(t for t in (s.strip() for s in element.itertext()) if t)
+
+def _extract_job_fields_lxml(html_content):
+    """Fast extractor: one lxml parse and one compiled XPath pass over the matched nodes."""
+    fields = dict.fromkeys(_JOB_FIELD_KEYS)
+    try:
+        root = lxml_html.document_fromstring(html_content)
+    except etree.ParserError:
+        # Empty document: bs4 yields no matches either
+        return fields
+
+    found = {}
+    description_container = None
+    criteria_items = []
+    for el in _JOB_NODES_XPATH(root):
+        tag = el.tag
+        if tag == 'p':
+            found.setdefault('recruiter_message', el)
+            continue
+        classes = (el.get('class') or '').split()
+        if tag == 'a':
+            tracking = el.get('data-tracking-control-name')
+            if 'topcard__org-name-link' in classes:
+                found.setdefault('company', el)
+                if tracking == 'public_jobs_topcard-org-name':
+                    found.setdefault('company_link', el)
+            if 'topcard__link' in classes and tracking == 'public_jobs_topcard-title':
+                found.setdefault('job_link', el)
+            if 'base-card__full-link' in classes and 'recruiter_link' not in found and _RECRUITER_CARD_XPATH(el):
+                found['recruiter_link'] = el
+        elif tag == 'span':
+            if 'topcard__flavor--bullet' in classes:
+                found.setdefault('location', el)
+            if 'posted-time-ago__text' in classes:
+                found.setdefault('posted_time_ago', el)
+        elif tag == 'li':
+            criteria_items.append(el)
+        elif tag == 'div':
+            if description_container is None:
+                description_container = el
+        elif tag == 'h2':
+            found.setdefault('job_title', el)
+        elif tag == 'h3':
+            found.setdefault('recruiter_name', el)
+        elif tag == 'h4':
+            found.setdefault('recruiter_tagline', el)
+        elif tag == 'figcaption':
+            found.setdefault('num_applicants_note', el)
+
+    for key in ('job_title', 'company', 'location', 'posted_time_ago', 'num_applicants_note',
+                'recruiter_message', 'recruiter_name', 'recruiter_tagline'):
+        fields[key] = _lxml_text(found.get(key))
+    for key in ('job_link', 'company_link', 'recruiter_link'):
+        el = found.get(key)
+        fields[key] = el.get('href') if el is not None else None
+
+    if description_container is not None:
+        job_description_parts = []
+        for item in description_container.iter('p', 'ul'):
+            if item.tag == 'ul':
+                list_items = [_lxml_text(li, ' ') for li in item.iter('li')]
+                job_description_parts.append("\n".join(["- " + li for li in list_items]))
+            else:
+                job_description_parts.append(_lxml_text(item, ' '))
+        fields['job_description'] = "\n\n".join(job_description_parts)
+
+    for item in criteria_items:
+        header = _CRITERIA_HEADER_XPATH(item)
+        text_element = _CRITERIA_TEXT_XPATH(item)
+        if header and text_element:
+            key = _CRITERIA_FIELDS.get(_lxml_text(header[0]))
+            if key:
+                fields[key] = _lxml_text(text_element[0])
+    return fields
+
+_JOB_FIELD_EXTRACTORS = {
+    'lxml': _extract_job_fields_lxml,
+    'bs4': _extract_job_fields_bs4,
+}
+
+def extract_job_fields(html_content, backend=None, fallback=True):
+    """
+    Extract the raw job fields from LinkedIn job HTML with the given parser backend.
+
+    backend: 'lxml' (compiled XPath, default via config.PARSER_BACKEND) or 'bs4'
+    (reference implementation). The lxml path falls back to bs4 on any error
+    unless fallback=False (benchmarks and parity checks want the raw error).
+    """
+    backend = backend or config.PARSER_BACKEND
+    if backend == 'lxml' and fallback:
+        try:
+            return _extract_job_fields_lxml(html_content)
+        except Exception as e:
+            logger.warning(f"lxml extractor failed, falling back to bs4: {e}")
+            return _extract_job_fields_bs4(html_content)
+    return _JOB_FIELD_EXTRACTORS[backend](html_content)
+
+def check_parser_parity(html_content):
+    """Run both backends on the same HTML; returns {field: (bs4_value, lxml_value)} for mismatches."""
+    reference = _extract_job_fields_bs4(html_content)
+    fast = _extract_job_fields_lxml(html_content)
+    return {k: (reference.get(k), fast.get(k)) for k in _JOB_FIELD_KEYS if reference.get(k) != fast.get(k)}
+
+@traced('parse.clean_job_html', lambda html_content, *a, **k: {'bytes': len(html_content or '')})
+def clean_job_html(html_content, work_type=None, country=None, search_keyword_job_title=None, backend=None):
+    """Extract structured job data from LinkedIn job HTML"""
+    fields = extract_job_fields(html_content, backend)
+    if config.PARSER_PARITY_CHECK and (backend or config.PARSER_BACKEND) != 'bs4':
+        mismatches = check_parser_parity(html_content)
+        if mismatches:
+            logger.warning(f"Parser parity mismatch on fields: {sorted(mismatches)}")
+
+    # Extract the publishing date from posted_time_ago
+    publishing_date = extract_publishing_date(fields["posted_time_ago"])
+    date_added = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Get work type name if specified
+    work_type_name = config.WORK_TYPE_NAMES.get(work_type, "Unknown")
+
+    # Create and return a dictionary with all extracted variables
+    job_data = {
+        "job_title": fields["job_title"],
+        "company": fields["company"],
+        "location": fields["location"],
+        "posted_time_ago": fields["posted_time_ago"],
+        "publishing_date": publishing_date,
+        "date_added": date_added,
+        "num_applicants_note": fields["num_applicants_note"],
+        "recruiter_message": fields["recruiter_message"],
+        "recruiter_name": fields["recruiter_name"],
+        "recruiter_tagline": fields["recruiter_tagline"],
+        "job_description": fields["job_description"],
+        "seniority_level": fields["seniority_level"],
+        "employment_type": fields["employment_type"],
+        "job_function": fields["job_function"],
+        "industries": fields["industries"],
+        "job_link": fields["job_link"],
+        "company_link": fields["company_link"],
+        "recruiter_link": fields["recruiter_link"],
         "work_type": work_type_name,
         "country": country,
         "search_keyword_job_title": search_keyword_job_title
@@ -188,19 +392,8 @@ def extract_publishing_date(posted_time_ago):
     # If no match, fallback to now
     return now.strftime("%Y-%m-%d %H:%M:%S")
 
-def get_job_list_page(keywords, location, geoId, start_position, work_type, contract_types=None, time_posted_code: str = ""):
-    """
-    Fetches a page of job listings from LinkedIn
-    
-    Args:
-        keywords: Search keywords
-        location: Location to search in
-        geoId: LinkedIn GeoID for the location
-        start_position: Starting position for pagination
-        work_type: Work type filter (None, 1=on-site, 2=remote, 3=hybrid)
-    """
-
-    
+def build_job_list_url(keywords, location, geoId, start_position, work_type, contract_types=None, time_posted_code: str = ""):
+    """Builds the guest-API search URL for one page of job listings"""
     # Build optional contract types param f_JT=F%2CC (if provided)
     contract_param = ""
     if contract_types:
@@ -214,7 +407,7 @@ def get_job_list_page(keywords, location, geoId, start_position, work_type, cont
     if time_posted_code:
         time_param = f"&f_TPR={time_posted_code}"
 
-    list_url = config.LINKEDIN_JOB_LIST_URL_TEMPLATE.format(
+    return config.LINKEDIN_JOB_LIST_URL_TEMPLATE.format(
         keywords=keywords,
         location=location,
         geoId=geoId,
@@ -223,11 +416,26 @@ def get_job_list_page(keywords, location, geoId, start_position, work_type, cont
         time_param=time_param,
         start_position=start_position
     )
+
+@traced('scraper.get_job_list_page', lambda keywords, location, geoId, start_position, *a, **k: {'keywords': keywords, 'country': location, 'start': start_position})
+def get_job_list_page(keywords, location, geoId, start_position, work_type, contract_types=None, time_posted_code: str = ""):
+    """
+    Fetches a page of job listings from LinkedIn
+    
+    Args:
+        keywords: Search keywords
+        location: Location to search in
+        geoId: LinkedIn GeoID for the location
+        start_position: Starting position for pagination
+        work_type: Work type filter (None, 1=on-site, 2=remote, 3=hybrid)
+    Returns: the page's <li> elements (see get_job_list_entries for the lightweight variant)
+    """
+    list_url = build_job_list_url(keywords, location, geoId, start_position, work_type, contract_types, time_posted_code)
     
     logger.info(f"Fetching URL: {list_url}")  # Debugging output
     
     try:
-        response = requests.get(list_url, headers=COMMON_HEADERS)
+        response = response_cache.fetch(list_url, 'list', before_fetch=LIST_RATE_LIMITER.acquire, cacheable=_cacheable_page)
         soup = BeautifulSoup(response.text, "html.parser")
         page_jobs = soup.find_all("li")
         return page_jobs
@@ -235,6 +443,79 @@ def get_job_list_page(keywords, location, geoId, start_position, work_type, cont
         logger.error(f"Error fetching job list page: {str(e)}")
         return []
 
+@traced('scraper.get_job_list_entries', lambda keywords, location, geoId, start_position, *a, **k: {'keywords': keywords, 'country': location, 'start': start_position})
+def get_job_list_entries(keywords, location, geoId, start_position, work_type, contract_types=None, time_posted_code: str = "", parser=None):
+    """
+    Fetches a page of job listings and returns plain (job_id, title, company) tuples
+
+    Same arguments as get_job_list_page; `parser` selects the list parsing mode
+    (defaults to config.LIST_PARSER, see parse_job_list_entries).
+    """
+    list_url = build_job_list_url(keywords, location, geoId, start_position, work_type, contract_types, time_posted_code)
+
+    logger.info(f"Fetching URL: {list_url}")  # Debugging output
+
+    try:
+        response = response_cache.fetch(list_url, 'list', before_fetch=LIST_RATE_LIMITER.acquire, cacheable=_cacheable_page)
+        return parse_job_list_entries(response.content, parser)
+    except Exception as e:
+        logger.error(f"Error fetching job list page: {str(e)}")
+        return []
+
+# Start tag of a job card: <div ... data-entity-urn="urn:li:jobPosting:<id>" ...>
+_JOB_CARD_RE = re.compile(rb'<div\b[^>]*?\bdata-entity-urn="urn:li:jobPosting:(\d+)"[^>]*>', re.IGNORECASE)
+_CLASS_ATTR_RE = re.compile(rb'\bclass="([^"]*)"', re.IGNORECASE)
+_CARD_TITLE_RE = re.compile(rb'<h3\b[^>]*\bclass="[^"]*\bbase-search-card__title\b[^"]*"[^>]*>(.*?)</h3>', re.IGNORECASE | re.DOTALL)
+_CARD_COMPANY_RE = re.compile(rb'<h4\b[^>]*\bclass="[^"]*\bbase-search-card__subtitle\b[^"]*"[^>]*>(.*?)</h4>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(rb'<!--.*?-->|<[^>]+>', re.DOTALL)
+
+def _card_text(fragment):
+    """Text of an HTML fragment with bs4 get_text(strip=True) semantics."""
+    if fragment is None:
+        return None
+    parts = _TAG_RE.split(fragment)
+    return ''.join(html_lib.unescape(p.decode('utf-8', 'replace')).strip() for p in parts)
+
+def parse_job_list_entries(page, parser=None):
+    """
+    Parses a seeMoreJobPostings response into (job_id, title, company) tuples
+
+    parser: 'regex' (default via config.LIST_PARSER) pulls the job-card
+    start tags straight out of the raw bytes and never builds a tree; 'bs4'
+    is the reference path (full soup + extract_job_id per <li>).
+    """
+    parser = parser or config.LIST_PARSER
+    if parser == 'bs4':
+        soup = BeautifulSoup(page, "html.parser")
+        entries = []
+        for job_element in soup.find_all("li"):
+            job_id = extract_job_id(job_element)
+            if job_id:
+                title = get_text_or_none(job_element.find('h3', class_='base-search-card__title'))
+                company = get_text_or_none(job_element.find('h4', class_='base-search-card__subtitle'))
+                entries.append((job_id, title, company))
+        return entries
+
+    if isinstance(page, str):
+        page = page.encode('utf-8')
+    cards = []
+    for m in _JOB_CARD_RE.finditer(page):
+        class_attr = _CLASS_ATTR_RE.search(m.group(0))
+        # Same filter as extract_job_id: only div.base-card job cards
+        if class_attr and b'base-card' in class_attr.group(1).split():
+            cards.append(m)
+    entries = []
+    for i, m in enumerate(cards):
+        card_end = cards[i + 1].start() if i + 1 < len(cards) else len(page)
+        title = _CARD_TITLE_RE.search(page, m.end(), card_end)
+        company = _CARD_COMPANY_RE.search(page, m.end(), card_end)
+        entries.append((
+            m.group(1).decode('ascii'),
+            _card_text(title.group(1)) if title else None,
+            _card_text(company.group(1)) if company else None,
+        ))
+    return entries
+
 def extract_job_id(job_element):
     """Extracts job ID from a job listing element"""
     base_card_div = job_element.find("div", {"class": "base-card"})
@@ -243,12 +524,15 @@ def extract_job_id(job_element):
     
     return base_card_div.get("data-entity-urn").split(":")[-1]
 
-def fetch_job_details(job_id, work_type=None, country=None, search_keyword_job_title=None):
+@traced('scraper.fetch_job_details', lambda job_id, work_type=None, country=None, search_keyword_job_title=None, **k: {'job_id': job_id, 'country': country, 'keyword': search_keyword_job_title})
+def fetch_job_details(job_id, work_type=None, country=None, search_keyword_job_title=None, rate_limiter=None):
     """Fetches and processes details for a specific job"""
     job_url = config.LINKEDIN_JOB_DETAIL_URL_TEMPLATE.format(job_id=job_id)
     
     try:
-        job_response = requests.get(job_url, headers=COMMON_HEADERS)
+        # Rate limit only real network fetches; cache hits are free
+        before_fetch = rate_limiter.acquire if rate_limiter is not None else None
+        job_response = response_cache.fetch(job_url, 'detail', before_fetch=before_fetch, cacheable=_cacheable_job_page)
         html_content = job_response.text
         job_details = clean_job_html(html_content, work_type, country, search_keyword_job_title)
         
@@ -259,96 +543,203 @@ def fetch_job_details(job_id, work_type=None, country=None, search_keyword_job_t
         logger.error(f"Error scraping job {job_id}: {str(e)}")
         return None, None
 
-def scrape_linkedin_jobs(keywords, location, geoId, work_type, jobs_per_page=25, max_pages=1, search_keyword_job_title=None, contract_types=None, time_posted_code: str = ""):
+class JobIdFilter:
     """
-    Scrapes LinkedIn jobs for the specified search criteria
-    Returns: List of job dictionaries
+    Run-wide membership filter applied to list-page IDs before any detail fetch.
+
+    Combines the persisted processed IDs with a set of IDs claimed during this
+    run, so a job surfacing under several keywords/countries is fetched once.
+    Thread-safe: claim() is an atomic check-and-add.
+    """
+
+    def __init__(self, processed_ids=None):
+        self._processed = processed_ids if processed_ids is not None else set()
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.skipped_processed = 0
+        self.skipped_seen = 0
+
+    def claim(self, job_id) -> bool:
+        """Return True if the caller should fetch job_id, False if it must be skipped."""
+        with self._lock:
+            if job_id in self._processed:
+                self.skipped_processed += 1
+                return False
+            if job_id in self._seen:
+                self.skipped_seen += 1
+                return False
+            self._seen.add(job_id)
+            return True
+
+    def release(self, job_id):
+        """Give back a claim (e.g. the detail fetch failed) so another combo may retry it."""
+        with self._lock:
+            self._seen.discard(job_id)
+
+    def __contains__(self, job_id):
+        with self._lock:
+            return job_id in self._processed or job_id in self._seen
+
+    @property
+    def skipped(self) -> int:
+        return self.skipped_processed + self.skipped_seen
+
+def _scrape_job_detail(job_id, keywords, location, geoId, work_type, search_keyword_job_title, debug_html_dir):
+    """Fetch one job's details, saving the raw HTML when title/company are missing."""
+    job_details, html_content = fetch_job_details(job_id, work_type, location, search_keyword_job_title, rate_limiter=DETAIL_RATE_LIMITER)
+    if not job_details:
+        logger.warning(f"Failed to fetch details for job ID: {job_id}")
+        return None
+    job_title = job_details.get('job_title')
+    company_name = job_details.get('company')
+    if not job_title or not company_name:
+        job_link = config.LINKEDIN_JOB_DETAIL_URL_TEMPLATE.format(job_id=job_id)
+        html_file_path = os.path.join(debug_html_dir, f"debug_html_{job_id}.html")
+        try:
+            with open(html_file_path, 'w', encoding='utf-8') as f:
+                f.write(html_content if html_content else "")
+            logger.warning(f"Missing title/company for job ID: {job_id}. Link: {job_link}. HTML saved to: {html_file_path}")
+        except Exception as e_write:
+            logger.error(f"Could not write HTML for job ID {job_id} to {html_file_path}: {e_write}")
+    job_details['search_keywords'] = keywords
+    job_details['search_location'] = location
+    job_details['search_geo_id'] = geoId
+    return job_details
+
+def iter_linkedin_jobs(keywords, location, geoId, work_type, jobs_per_page=25, max_pages=1, search_keyword_job_title=None, contract_types=None, time_posted_code: str = "", detail_workers=None, id_filter=None, budget=None):
+    """
+    Streams LinkedIn jobs for the specified search criteria
+
+    Yields each job dictionary as soon as its detail page has been fetched and
+    parsed (completion order within a page), so downstream stages can start
+    before the whole search is scraped.
+
+    Detail pages are fetched by up to `detail_workers` threads (defaults to
+    config.DETAIL_FETCH_WORKERS); politeness comes from the global
+    DETAIL_RATE_LIMITER token bucket shared by every caller in the process.
+    When `id_filter` (a JobIdFilter) is given, list-page IDs it rejects are
+    skipped before their detail page is downloaded. When `budget` (a
+    RequestBudget) runs out, no further list or detail requests are made.
     """
-    all_jobs = []
     processed_job_ids = set()
+    skipped_ids = 0
     debug_html_dir = os.path.join("output", "debug_html")
     os.makedirs(debug_html_dir, exist_ok=True)
+    if detail_workers is None:
+        detail_workers = config.DETAIL_FETCH_WORKERS
+    detail_workers = max(1, int(detail_workers))
+
+    def _scrape(job_id):
+        if budget is not None and not budget.try_spend():
+            return None
+        return _scrape_job_detail(job_id, keywords, location, geoId, work_type, search_keyword_job_title, debug_html_dir)
+
+    def _accept(job_id, job_details):
+        if job_details:
+            processed_job_ids.add(job_id)
+            return True
+        if id_filter is not None:
+            id_filter.release(job_id)
+        return False
 
     for page_num in range(max_pages):
         start_position = page_num * jobs_per_page
-        page_job_elements = get_job_list_page(keywords, location, geoId, start_position, work_type, contract_types, time_posted_code)
-        if not page_job_elements:
+        if budget is not None and not budget.try_spend():
+            logger.warning(f"Request budget exhausted; stopping scrape for keywords: '{keywords}', location: '{location}'")
             break
-        for job_element in page_job_elements:
-            job_id = extract_job_id(job_element)
-            if job_id and job_id not in processed_job_ids:
-                time.sleep(random.uniform(1.0, 2.5))
-                job_details, html_content = fetch_job_details(job_id, work_type, location, search_keyword_job_title)
-                if job_details:
-                    job_title = job_details.get('job_title')
-                    company_name = job_details.get('company')
-                    if not job_title or not company_name:
-                        job_link = config.LINKEDIN_JOB_DETAIL_URL_TEMPLATE.format(job_id=job_id)
-                        html_file_path = os.path.join(debug_html_dir, f"debug_html_{job_id}.html")
-                        try:
-                            with open(html_file_path, 'w', encoding='utf-8') as f:
-                                f.write(html_content if html_content else "")
-                            logger.warning(f"Missing title/company for job ID: {job_id}. Link: {job_link}. HTML saved to: {html_file_path}")
-                        except Exception as e_write:
-                            logger.error(f"Could not write HTML for job ID {job_id} to {html_file_path}: {e_write}")
-                    job_details['search_keywords'] = keywords
-                    job_details['search_location'] = location
-                    job_details['search_geo_id'] = geoId
-                    all_jobs.append(job_details)
-                    processed_job_ids.add(job_id)
-                else:
-                    logger.warning(f"Failed to fetch details for job ID: {job_id}")
-            # else: job_id is None, so it's not a job card we can process
-        if len(page_job_elements) == 0:
+        page_entries = get_job_list_entries(keywords, location, geoId, start_position, work_type, contract_types, time_posted_code)
+        if not page_entries:
             break
+        page_job_ids = []
+        for job_id, _title, _company in page_entries:
+            if job_id not in processed_job_ids and job_id not in page_job_ids:
+                if id_filter is not None and not id_filter.claim(job_id):
+                    skipped_ids += 1
+                    continue
+                page_job_ids.append(job_id)
+
+        if detail_workers == 1 or len(page_job_ids) <= 1:
+            for job_id in page_job_ids:
+                job_details = _scrape(job_id)
+                if _accept(job_id, job_details):
+                    yield job_details
+        else:
+            with ThreadPoolExecutor(max_workers=min(detail_workers, len(page_job_ids))) as ex:
+                futures = {ex.submit(_scrape, job_id): job_id for job_id in page_job_ids}
+                for fut in as_completed(futures):
+                    job_id = futures[fut]
+                    job_details = fut.result()
+                    if _accept(job_id, job_details):
+                        yield job_details
         if page_num < max_pages - 1:
             time.sleep(config.DELAY_BETWEEN_SEARCHES)
-    logger.info(f"Scrape finished for keywords: '{keywords}', location: '{location}'. Found {len(all_jobs)} jobs.")
-    return all_jobs
+    logger.info(f"Scrape finished for keywords: '{keywords}', location: '{location}'. Found {len(processed_job_ids)} jobs, skipped {skipped_ids} already-seen IDs.")
+
+def scrape_linkedin_jobs(keywords, location, geoId, work_type, jobs_per_page=25, max_pages=1, search_keyword_job_title=None, contract_types=None, time_posted_code: str = "", detail_workers=None, id_filter=None, budget=None):
+    """
+    Scrapes LinkedIn jobs for the specified search criteria
+    Returns: List of job dictionaries (see iter_linkedin_jobs for the streaming variant)
+    """
+    return list(iter_linkedin_jobs(
+        keywords, location, geoId, work_type,
+        jobs_per_page=jobs_per_page,
+        max_pages=max_pages,
+        search_keyword_job_title=search_keyword_job_title,
+        contract_types=contract_types,
+        time_posted_code=time_posted_code,
+        detail_workers=detail_workers,
+        id_filter=id_filter,
+        budget=budget,
+    ))
+
+def parse_public_profile(html_content):
+    """Extract minimal profile info from public LinkedIn profile HTML (best-effort)."""
+    soup = BeautifulSoup(html_content, 'lxml')
+    # Best-effort selectors across public profiles
+    # Headline fallback to <title>
+    title_tag = soup.find('title')
+    headline = title_tag.get_text(strip=True) if title_tag else None
+
+    # Try to capture a visible name element
+    name = None
+    h1 = soup.find('h1')
+    if h1:
+        name = h1.get_text(strip=True)
+
+    # Try to capture a subtitle/headline block
+    subtitle = None
+    possible_classes = [
+        'text-body-medium',
+        'pv-text-details__left-panel',
+        'pv-top-card--list',
+    ]
+    for cls in possible_classes:
+        el = soup.find(class_=cls)
+        if el:
+            subtitle = el.get_text(separator=' ', strip=True)
+            break
 
+    location = None
+    loc_candidates = soup.find_all('span')
+    for span in loc_candidates[:100]:
+        txt = span.get_text(strip=True)
+        if txt and any(k in txt.lower() for k in ["location", "based", "milan", "london", "remote"]):
+            location = txt
+            break
+
+    return {
+        'profile_headline': headline,
+        'profile_name': name,
+        'profile_subtitle': subtitle,
+        'profile_location': location,
+    }
+
+@traced('scraper.fetch_public_profile', lambda profile_url: {'url': profile_url})
 def fetch_public_profile(profile_url):
     """Fetch minimal public profile info from a LinkedIn profile URL (unauthenticated, best-effort)."""
     try:
-        resp = requests.get(profile_url, headers=COMMON_HEADERS, timeout=15)
-        soup = BeautifulSoup(resp.text, 'lxml')
-        # Best-effort selectors across public profiles
-        # Headline fallback to <title>
-        title_tag = soup.find('title')
-        headline = title_tag.get_text(strip=True) if title_tag else None
-
-        # Try to capture a visible name element
-        name = None
-        h1 = soup.find('h1')
-        if h1:
-            name = h1.get_text(strip=True)
-
-        # Try to capture a subtitle/headline block
-        subtitle = None
-        possible_classes = [
-            'text-body-medium',
-            'pv-text-details__left-panel',
-            'pv-top-card--list',
-        ]
-        for cls in possible_classes:
-            el = soup.find(class_=cls)
-            if el:
-                subtitle = el.get_text(separator=' ', strip=True)
-                break
-
-        location = None
-        loc_candidates = soup.find_all('span')
-        for span in loc_candidates[:100]:
-            txt = span.get_text(strip=True)
-            if txt and any(k in txt.lower() for k in ["location", "based", "milan", "london", "remote"]):
-                location = txt
-                break
-
-        return {
-            'profile_headline': headline,
-            'profile_name': name,
-            'profile_subtitle': subtitle,
-            'profile_location': location,
-        }
+        resp = response_cache.fetch(profile_url, 'profile', before_fetch=PROFILE_RATE_LIMITER.acquire, cacheable=_cacheable_page)
+        return parse_public_profile(resp.text)
     except Exception as e:
         logger.error(f"Error fetching public profile {profile_url}: {e}")
         return {
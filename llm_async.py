@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import litellm
+from litellm import acompletion
+
+import config
+import llm_cache
+import llm_metrics
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying; anything else (bad request, auth, ...) fails immediately
+_THROTTLE_ERRORS = tuple(getattr(litellm, n) for n in ('RateLimitError',) if hasattr(litellm, n))
+_TRANSIENT_ERRORS = tuple(
+    getattr(litellm, n)
+    for n in ('Timeout', 'APIConnectionError', 'ServiceUnavailableError', 'InternalServerError')
+    if hasattr(litellm, n)
+) + (asyncio.TimeoutError,)
+
+
+def _is_throttle(e: Exception) -> bool:
+    if _THROTTLE_ERRORS and isinstance(e, _THROTTLE_ERRORS):
+        return True
+    return getattr(e, 'status_code', None) == 429 or 'rate limit' in str(e).lower() or 'resource_exhausted' in str(e).lower()
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease cap on in-flight LLM requests.
+
+    Every successful request grows the limit by 1/limit (about +1 per full
+    window of successes); a rate-limit error multiplies it by `decrease`.
+    Errors from requests started before the last decrease are ignored, so
+    one burst of 429s counts as a single congestion signal. Must be used
+    from the client's event loop.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.in_flight = 0
+        self.peak = self.limit
+        self._last_decrease = 0.0
+        self._cond = None
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass back to release()."""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return time.monotonic()
+
+    async def release(self, started: float, ok: bool = True, throttled: bool = False):
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+            elif ok:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                self.peak = max(self.peak, self.limit)
+            self._cond.notify_all()
+
+
+class AsyncLLMClient:
+    """
+    Shared asyncio LLM execution layer on a background event-loop thread.
+
+    Requests go through litellm's acompletion under an AIMD concurrency
+    limit, with exponential backoff plus jitter on rate-limit and transient
+    errors and an overall per-request deadline. Thread-based callers use
+    submit() (returns a concurrent.futures.Future) or call() (blocking), so
+    search and outreach worker pools share one limiter and one cache.
+    """
+
+    def __init__(self, initial_concurrency: int, min_concurrency: int, max_concurrency: int,
+                 max_retries: int, backoff_base: float, backoff_max: float,
+                 attempt_timeout: float, deadline: float):
+        self.limiter = AIMDLimiter(initial_concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self._loop = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='llm-loop', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt)) + random.uniform(0, self.backoff_base)
+
+    async def complete(self, system_prompt: str, user_prompt: str, model: str, temperature: float = 0,
+                       response_format=None, use_cache: bool = True, deadline: float = None, purpose: str = 'other'):
+        """Coroutine returning (content, prompt_tokens, completion_tokens); raises after retries/deadline."""
+        start = time.perf_counter()
+        cache = llm_cache.CACHE
+        key = None
+        if use_cache and cache.enabled:
+            key = llm_cache.cache_key(model, temperature, response_format, system_prompt, user_prompt)
+            # SQLite I/O stays off the loop thread, which drives every in-flight request
+            cached = await asyncio.to_thread(cache.get, key)
+            # entries stored before completions were validated may not parse: treat those as misses
+            if cached is not None and llm_cache.is_cacheable(cached, response_format):
+                llm_metrics.METRICS.record(purpose, model, time.perf_counter() - start, cache='hit', attempts=0)
+                return cached, 0, 0
+
+        kwargs = {}
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        cache_status = 'miss' if key is not None else 'bypass'
+        self.calls += 1
+        attempts = 0
+        try:
+            response, attempts = await self._request(model, messages, temperature, kwargs, deadline or self.deadline)
+        except Exception as e:
+            llm_metrics.METRICS.record(purpose, model, time.perf_counter() - start, cache=cache_status, ok=False,
+                                       attempts=getattr(e, 'llm_attempts', attempts))
+            raise
+
+        # LiteLLM returns an OpenAI-compatible response schema
+        content = response["choices"][0]["message"].get("content", "")
+        usage = response.get("usage", {})
+        prompt_tokens, completion_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        llm_metrics.METRICS.record(purpose, model, time.perf_counter() - start, prompt_tokens, completion_tokens,
+                                   cache=cache_status, attempts=attempts)
+        if key is not None and llm_cache.is_cacheable(content, response_format):
+            try:
+                await asyncio.to_thread(cache.put, key, model, content, prompt_tokens, completion_tokens)
+            except Exception as e:
+                logger.warning(f"[CACHE] could not store LLM response: {e}")
+        return content, prompt_tokens, completion_tokens
+
+    async def _request(self, model: str, messages: list, temperature: float, kwargs: dict, deadline: float):
+        """Send one request with AIMD admission and retries; returns (response, attempts)."""
+        give_up_at = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                self.failures += 1
+                e = TimeoutError(f"LLM request deadline exceeded after {attempt} attempt(s)")
+                e.llm_attempts = attempt
+                raise e
+            started = await self.limiter.acquire()
+            ok, throttled = False, False
+            try:
+                response = await asyncio.wait_for(
+                    acompletion(model=model, messages=messages, temperature=temperature, **kwargs),
+                    timeout=min(self.attempt_timeout, remaining),
+                )
+                ok = True
+            except Exception as e:
+                throttled = _is_throttle(e)
+                retryable = throttled or isinstance(e, _TRANSIENT_ERRORS)
+                if throttled:
+                    self.throttled += 1
+                if not retryable or attempt >= self.max_retries:
+                    self.failures += 1
+                    e.llm_attempts = attempt + 1
+                    raise
+                error = e
+            finally:
+                await self.limiter.release(started, ok=ok, throttled=throttled)
+            if ok:
+                return response, attempt + 1
+            delay = min(self._backoff(attempt), max(0.0, give_up_at - time.monotonic()))
+            logger.warning(f"[LLM] retry {attempt + 1}/{self.max_retries} in {delay:.1f}s "
+                           f"(limit={int(self.limiter.limit)}): {type(error).__name__}: {error}")
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def submit(self, system_prompt: str, user_prompt: str, **kwargs):
+        """Schedule a request on the background loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self.complete(system_prompt, user_prompt, **kwargs), self._ensure_loop())
+
+    def call(self, system_prompt: str, user_prompt: str, **kwargs):
+        """Blocking request from any thread; returns (content, prompt_tokens, completion_tokens)."""
+        return self.submit(system_prompt, user_prompt, **kwargs).result()
+
+    def log_stats(self):
+        logger.info(
+            f"[LLM] calls={self.calls} retries={self.retries} throttled={self.throttled} failures={self.failures} "
+            f"concurrency={int(self.limiter.limit)} peak={int(self.limiter.peak)}"
+        )
+
+
+CLIENT = AsyncLLMClient(
+    initial_concurrency=config.LLM_INITIAL_CONCURRENCY,
+    min_concurrency=config.LLM_MIN_CONCURRENCY,
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    max_retries=config.LLM_MAX_RETRIES,
+    backoff_base=config.LLM_BACKOFF_BASE,
+    backoff_max=config.LLM_BACKOFF_MAX,
+    attempt_timeout=config.LLM_ATTEMPT_TIMEOUT,
+    deadline=config.LLM_DEADLINE,
+)
+
+
+def log_stats():
+    CLIENT.log_stats()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, temperature: float, response_format, system_prompt: str, user_prompt: str) -> str:
+    """SHA-256 over everything that determines the completion."""
+    payload = json.dumps(
+        [model, temperature, response_format, system_prompt, user_prompt],
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(content, response_format=None) -> bool:
+    """Whether a completion is worth replaying: non-empty, and valid JSON when JSON output was requested."""
+    if not content:
+        return False
+    if isinstance(response_format, dict) and response_format.get('type') in ('json_object', 'json_schema'):
+        try:
+            json.loads(content)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM completions keyed by cache_key().
+
+    Entries live in one SQLite file; the total content size is capped with
+    LRU eviction on last access. Only completions passing is_cacheable() are
+    stored (the client checks), so a failed, empty or malformed answer is
+    retried on the next run. The total size is kept
+    as a running count and hits only record their access time in memory
+    (written in batches), so a lookup is one indexed SELECT and a store one
+    INSERT; callers on an event loop still run both in a worker thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total = 0  # bytes of content stored
+        self._touched = {}  # key -> last access time not yet written
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, model TEXT, content TEXT, size INTEGER,"
+                " prompt_tokens INTEGER, completion_tokens INTEGER, created_at REAL, accessed_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed_at)")
+            self._conn.commit()
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        return self._conn
+
+    def get(self, key: str):
+        """Return the cached completion content for key, or None (counts a hit or a miss)."""
+        with self._lock:
+            row = self._db().execute("SELECT content FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= 100:
+                self._flush_touched()
+            self.hits += 1
+            return row[0]
+
+    def _flush_touched(self):
+        # Called with self._lock held; writes the batched access times of cache hits
+        if not self._touched:
+            return
+        db = self._db()
+        db.executemany("UPDATE completions SET accessed_at = ? WHERE key = ?",
+                       [(at, key) for key, at in self._touched.items()])
+        db.commit()
+        self._touched = {}
+
+    def flush(self):
+        """Write pending access times (end of run)."""
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched()
+
+    def put(self, key: str, model: str, content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        if not content:
+            return
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO completions"
+                " (key, model, content, size, prompt_tokens, completion_tokens, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, content, size, prompt_tokens or 0, completion_tokens or 0, now, now),
+            )
+            db.commit()
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        # Called with self._lock held; LRU order needs the batched access times first
+        self._flush_touched()
+        target = int(self.max_bytes * 0.9)
+        for key, size in db.execute("SELECT key, size FROM completions ORDER BY accessed_at ASC").fetchall():
+            if self._total <= target:
+                break
+            db.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._total -= size
+            self.evictions += 1
+        db.commit()
+
+    def log_stats(self):
+        logger.info(f"[CACHE] llm hits={self.hits} misses={self.misses} evictions={self.evictions}")
+
+
+CACHE = LLMCache(config.LLM_CACHE_PATH, max_bytes=config.LLM_CACHE_MAX_BYTES, enabled=config.LLM_CACHE_ENABLED)
+
+
+def log_stats():
+    CACHE.flush()
+    CACHE.log_stats()
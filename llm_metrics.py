@@ -0,0 +1,133 @@
+import json
+import logging
+import math
+import os
+import threading
+from typing import List
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int):
+    """USD cost from config.LLM_PRICES (per 1M tokens); None for models without a price."""
+    prices = config.LLM_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class LLMMetrics:
+    """
+    Per-call accounting for every LLM request of a run.
+
+    Each call records its purpose (fit, fit_batch, outreach_message,
+    tailored_cv, ...), model, wall-clock latency, token counts, attempts and
+    cache status ('hit', 'miss' or 'bypass'). summary() aggregates per
+    purpose with latency percentiles and estimated cost; write_report()
+    saves it as JSON next to the run's CSV.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def record(self, purpose: str, model: str, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+               cache: str = 'miss', ok: bool = True, attempts: int = 1):
+        with self._lock:
+            self._calls.append({
+                'purpose': purpose or 'other',
+                'model': model,
+                'latency': latency,
+                'prompt_tokens': prompt_tokens or 0,
+                'completion_tokens': completion_tokens or 0,
+                'cache': cache,
+                'ok': ok,
+                'attempts': attempts,
+            })
+
+    def _aggregate(self, calls: list) -> dict:
+        latencies = sorted(c['latency'] for c in calls if c['cache'] != 'hit')
+        prompt_tokens = sum(c['prompt_tokens'] for c in calls)
+        completion_tokens = sum(c['completion_tokens'] for c in calls)
+        cost, unpriced = 0.0, set()
+        for c in calls:
+            call_cost = estimate_cost(c['model'], c['prompt_tokens'], c['completion_tokens'])
+            if call_cost is None:
+                if c['prompt_tokens'] or c['completion_tokens']:
+                    unpriced.add(c['model'])
+            else:
+                cost += call_cost
+        agg = {
+            'calls': len(calls),
+            'errors': sum(1 for c in calls if not c['ok']),
+            'cache_hits': sum(1 for c in calls if c['cache'] == 'hit'),
+            'retries': sum(max(0, c['attempts'] - 1) for c in calls),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'latency_s': {
+                'p50': round(percentile(latencies, 50), 3),
+                'p90': round(percentile(latencies, 90), 3),
+                'p99': round(percentile(latencies, 99), 3),
+                'max': round(latencies[-1], 3) if latencies else 0.0,
+                'total': round(sum(latencies), 3),
+            },
+            'estimated_cost_usd': round(cost, 6),
+        }
+        if unpriced:
+            agg['unpriced_models'] = sorted(unpriced)
+        return agg
+
+    def summary(self) -> dict:
+        with self._lock:
+            calls = list(self._calls)
+        by_purpose = {}
+        for c in calls:
+            by_purpose.setdefault(c['purpose'], []).append(c)
+        return {
+            'total': self._aggregate(calls),
+            'by_purpose': {p: self._aggregate(cs) for p, cs in sorted(by_purpose.items())},
+        }
+
+    def write_report(self, path: str, run: dict = None) -> dict:
+        """Write the run summary as JSON to path (plus optional run metadata); returns the summary."""
+        report = self.summary()
+        if run:
+            report = dict(run=run, **report)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+        return report
+
+    def log_summary(self):
+        summary = self.summary()
+        for purpose, agg in list(summary['by_purpose'].items()) + [('total', summary['total'])]:
+            lat = agg['latency_s']
+            logger.info(
+                f"[LLM] {purpose}: calls={agg['calls']} errors={agg['errors']} cache_hits={agg['cache_hits']} "
+                f"tokens={agg['prompt_tokens']}+{agg['completion_tokens']} "
+                f"p50={lat['p50']}s p90={lat['p90']}s p99={lat['p99']}s cost=${agg['estimated_cost_usd']:.4f}"
+            )
+
+
+METRICS = LLMMetrics()
+
+
+def write_report(path: str, run: dict = None) -> dict:
+    return METRICS.write_report(path, run)
+
+
+def log_summary():
+    METRICS.log_summary()
@@ -1,23 +1,38 @@
 import re
 import os
 import csv
-import json
 import datetime
+import threading
 import traceback
-from math import ceil
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import columnar
+import compaction
 import config
-from linkedin_scraper import fetch_job_details, fetch_public_profile
+import http_client
+import llm_async
+import llm_cache
+import llm_metrics
+import profiles
+import response_cache
+import tracing
+from job_store import STORE
+from linkedin_scraper import DETAIL_RATE_LIMITER, fetch_job_details
 from utils import call_llm
 import prompts
+from pipeline import GroupCommitWriter, check_durability, run_stream, sync_file
+from state_log import ProcessedIdLog
 
 CONFIG = {
     'job_url': None,  # Can be a single URL (str) or a list of URLs
     'cv_file': 'cv.txt',
     # Parallelization controls
-    'batch_size': 5,
-    'max_workers': 5,  # real workers = min(batch_size, max_workers)
+    # Long-lived worker pool fed from one queue; LLM concurrency is adaptive (llm_async)
+    'max_workers': 16,
+    # Max job URLs waiting for a worker
+    'queue_size': 32,
+    # Fallback when no job_url is given: search jobs with fit > min_fit from the last N days (1 = today)
+    'fallback_min_fit': 3,
+    'fallback_days': 1,
 }
 
 
@@ -26,48 +41,18 @@ def ensure_dirs():
     os.makedirs(config.STATE_DIR, exist_ok=True)
 
 
+STATE = ProcessedIdLog(config.OUTREACH_PROCESSED_IDS_LOG_PATH, legacy_path=config.OUTREACH_PROCESSED_IDS_PATH,
+                       fsync=config.WRITE_DURABILITY == 'fsync')
+
+
 def load_processed_ids() -> set:
     ensure_dirs()
-    path = config.OUTREACH_PROCESSED_IDS_PATH
-    if os.path.exists(path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                return set(data)
-            if isinstance(data, dict):
-                acc = set()
-                for _, ids in data.items():
-                    if isinstance(ids, list):
-                        acc.update(ids)
-                return acc
-            return set()
-        except Exception as e:
-            print(f"ERROR load_processed_ids: {e}")
-            print(traceback.format_exc())
-            return set()
-    return set()
+    return STATE.load()
 
 
 def append_run_processed_ids(run_ts: str, ids: set):
     ensure_dirs()
-    existing = {}
-    path = config.OUTREACH_PROCESSED_IDS_PATH
-    if os.path.exists(path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                existing = data
-            elif isinstance(data, list):
-                existing = {"legacy": data}
-        except Exception as e:
-            print(f"ERROR reading processed ids: {e}")
-            print(traceback.format_exc())
-            existing = {}
-    existing[run_ts] = sorted(list(ids))
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(existing, f)
+    STATE.append(run_ts, ids)
 
 
 def extract_job_id(url: str) -> str:
@@ -86,6 +71,163 @@ def extract_job_id(url: str) -> str:
     raise ValueError('Could not extract job id from URL')
 
 
+def row_to_job_details(row: dict) -> dict:
+    """Rebuild a fetch_job_details-style dict from a search CSV / job store row."""
+    return {
+        'job_title': row.get('job title') or '',
+        'job_description': row.get('description') or '',
+        'company': row.get('company name') or '',
+        'company_link': row.get('company linkedin url') or '',
+        'job_link': row.get('job url') or '',
+        'publishing_date': row.get('upload date') or '',
+        'posted_time_ago': row.get('upload date') or '',
+        'recruiter_name': row.get('hiring manager name') or '',
+        'recruiter_link': row.get('hiring manager linkedin url') or '',
+    }
+
+
+PARQUET_SOURCE = 'parquet'
+# Everything a cached job needs except the description, which is read lazily
+_PARQUET_DETAIL_COLUMNS = ['id', 'job_title', 'company', 'company_url', 'job_url', 'upload_date',
+                           'hiring_manager_name', 'hiring_manager_url', 'fit']
+
+
+class SearchCsvIndex:
+    """
+    job_id -> cached job details from prior search CSVs.
+
+    Each CSV is read in a single streaming pass that keeps only the wanted
+    IDs (details minus the description, plus the row number). Descriptions,
+    the bulk of every row, are loaded lazily: the first lookup that needs one
+    from a CSV reads that file once more and keeps only the indexed rows'
+    descriptions. A cache hit is then a dictionary lookup.
+    Jobs in the Parquet search dataset are indexed from it instead, reading
+    only the detail columns (and, lazily, the indexed ids' descriptions).
+    """
+
+    def __init__(self):
+        self._entries = {}  # job_id -> (csv_path, row_number, details); (PARQUET_SOURCE, job_id, details) for Parquet
+        self._descriptions = {}  # csv_path -> {row_number: description}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, job_id):
+        return str(job_id) in self._entries
+
+    def add_csv(self, csv_path: str, wanted: set) -> int:
+        """Index the rows of csv_path whose job id is in `wanted`; returns how many were indexed."""
+        found = 0
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row_number, row in enumerate(csv.DictReader(f)):
+                jid = (row.get('id') or '').strip()
+                if not jid:
+                    try:
+                        jid = extract_job_id(row.get('job url') or '')
+                    except Exception:
+                        continue
+                if jid not in wanted or jid in self._entries:
+                    continue
+                row['description'] = ''
+                self._entries[jid] = (csv_path, row_number, row_to_job_details(row))
+                found += 1
+        return found
+
+    def add_parquet(self, wanted: set, since: str = None) -> int:
+        """Index the wanted ids found in the Parquet search dataset (runs since `since`); returns how many."""
+        records = columnar.read_rows('search', _PARQUET_DETAIL_COLUMNS, since=since, ids=wanted)
+        found = 0
+        for record in records or ():
+            jid = record['id']
+            if jid in self._entries:
+                continue
+            self._entries[jid] = (PARQUET_SOURCE, jid, row_to_job_details(columnar.to_csv_row(record)))
+            found += 1
+        return found
+
+    def _load_descriptions(self, csv_path: str) -> dict:
+        # Called with self._lock held
+        rows = {n for path, n, _ in self._entries.values() if path == csv_path}
+        if csv_path == PARQUET_SOURCE:
+            records = columnar.read_rows('search', ['id', 'description'], ids=rows) or []
+            self._descriptions[csv_path] = {r['id']: r['description'] or '' for r in records}
+            return self._descriptions[csv_path]
+        descriptions = {}
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row_number, row in enumerate(csv.DictReader(f)):
+                if row_number in rows:
+                    descriptions[row_number] = row.get('description') or ''
+        self._descriptions[csv_path] = descriptions
+        return descriptions
+
+    def details(self, job_id: str):
+        """Indexed details of job_id without its description (no file is read), or None."""
+        entry = self._entries.get(str(job_id))
+        return entry[2] if entry else None
+
+    def get(self, job_id: str):
+        """Return (job_details, csv_path) for job_id, or (None, None) when it is not indexed."""
+        entry = self._entries.get(str(job_id))
+        if entry is None:
+            return None, None
+        csv_path, row_number, details = entry
+        with self._lock:
+            descriptions = self._descriptions.get(csv_path)
+            if descriptions is None:
+                descriptions = self._load_descriptions(csv_path)
+        return dict(details, job_description=descriptions.get(row_number, '')), csv_path
+
+
+def build_search_csv_index(cache_index: dict, job_ids) -> SearchCsvIndex:
+    """Index the given job ids from the search CSVs of the runs that processed them (one pass per CSV)."""
+    index = SearchCsvIndex()
+    wanted_by_run = {}
+    for jid in job_ids:
+        run_ts = cache_index.get(str(jid))
+        if run_ts:
+            wanted_by_run.setdefault(run_ts, set()).add(str(jid))
+    if wanted_by_run:
+        # One projected read of the Parquet copy, pruned to the run dates involved
+        try:
+            index.add_parquet(set().union(*wanted_by_run.values()),
+                              since=min(columnar.run_date(ts) for ts in wanted_by_run))
+        except Exception as e:
+            print(f"[CACHE] ERROR reading Parquet search results: {e}")
+            print(traceback.format_exc())
+    for run_ts, wanted in wanted_by_run.items():
+        wanted = {jid for jid in wanted if jid not in index}
+        if not wanted:
+            continue
+        search_csv = os.path.join(config.OUTREACH_OUTPUT_DIR, f"search_{run_ts}.csv")
+        if not os.path.exists(search_csv):
+            continue
+        try:
+            index.add_csv(search_csv, wanted)
+        except Exception as e:
+            print(f"[CACHE] ERROR reading search CSV for run={run_ts}: {e}")
+            print(traceback.format_exc())
+    return index
+
+
+def parquet_recent_job_urls(min_fit: int, days: int):
+    """Like STORE.recent_job_urls, from the Parquet search dataset; None when it is unavailable."""
+    since = (datetime.date.today() - datetime.timedelta(days=max(1, days) - 1)).isoformat()
+    records = columnar.read_rows('search', ['job_url', 'fit', 'duplicate_group', 'id', 'run_ts'], since=since)
+    if records is None:
+        return None
+    records = [r for r in records if (r['fit'] or 0) > min_fit and r['job_url']]
+    records.sort(key=lambda r: (-r['fit'], r['run_ts'] or ''))
+    seen = set()
+    urls = []
+    for r in records:
+        group = r['duplicate_group'] or r['id']
+        if group not in seen:
+            seen.add(group)
+            urls.append(r['job_url'])
+    return urls
+
+
 def read_cv_text(cv_path: str) -> str:
     with open(cv_path, 'r', encoding='utf-8') as f:
         return f.read()
@@ -96,7 +238,7 @@ def build_system_prompt_outreach(cv_text: str) -> str:
 
 
 def build_user_prompt_outreach(job: dict, profile: dict) -> str:
-    bullets = job.get('job_description') or ''
+    bullets = compaction.compact_for_prompt(job.get('job_description') or '', label=job.get('job_title') or '')
     company = job.get('company') or ''
     recruiter_name = job.get('recruiter_name') or ''
     profile_snippet = ''
@@ -117,7 +259,7 @@ def build_system_prompt_cv(cv_text: str) -> str:
 
 
 def build_user_prompt_cv(job: dict) -> str:
-    bullets = job.get('job_description') or ''
+    bullets = compaction.compact_for_prompt(job.get('job_description') or '', label=job.get('job_title') or '')
     return (
         f"Job title: {job.get('job_title','')}\n"
         f"Company: {job.get('company','')}\n\n"
@@ -140,22 +282,15 @@ def open_csv_writer_for_today():
 
 
 def main():
+    # Fail fast on a bad WRITE_DURABILITY: inside a group commit the error would drop every group
+    check_durability(config.WRITE_DURABILITY)
     ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     processed = load_processed_ids()
 
-    # Build cache index from prior search runs: job_id -> last run_ts
+    # Build cache index from prior search runs: job_id -> run_ts whose search CSV holds it
     cache_index = {}
     try:
-        if os.path.exists(config.PROCESSED_IDS_PATH):
-            with open(config.PROCESSED_IDS_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                # Iterate run_ts sorted ascending so last write wins (latest run)
-                for run_ts in sorted(data.keys()):
-                    ids = data.get(run_ts) or []
-                    if isinstance(ids, list):
-                        for jid in ids:
-                            cache_index[str(jid)] = run_ts
+        cache_index = ProcessedIdLog(config.PROCESSED_IDS_LOG_PATH, legacy_path=config.PROCESSED_IDS_PATH).load_run_index()
     except Exception as e:
         print(f"[CACHE] ERROR building cache index: {e}")
         print(traceback.format_exc())
@@ -167,7 +302,30 @@ def main():
         split_lines = [u.strip() for u in urls.splitlines()]
         urls = [u for u in split_lines if u and (u.startswith('http://') or u.startswith('https://'))]
 
-    # Fallback: if no URLs, use today's search output with fit>3
+    # Fallback: if no URLs, use recent search jobs with fit>3 (index-backed query on the job store)
+    min_fit = CONFIG.get('fallback_min_fit', 3)
+    if not urls:
+        try:
+            urls = STORE.recent_job_urls(min_fit=min_fit, days=CONFIG.get('fallback_days', 1))
+            print(f"[FALLBACK] Selected {len(urls)} URLs from the job store with fit>{min_fit}")
+        except Exception as e:
+            print(f"[FALLBACK] ERROR querying job store: {e}")
+            print(traceback.format_exc())
+            urls = []
+
+    # No job store rows (e.g. another machine): the Parquet copy, reading only the url / fit / group columns
+    if not urls:
+        try:
+            parquet_urls = parquet_recent_job_urls(min_fit, CONFIG.get('fallback_days', 1))
+            if parquet_urls is not None:
+                urls = parquet_urls
+                print(f"[FALLBACK] Selected {len(urls)} URLs from the Parquet search results with fit>{min_fit}")
+        except Exception as e:
+            print(f"[FALLBACK] ERROR reading Parquet search results: {e}")
+            print(traceback.format_exc())
+            urls = []
+
+    # Runs from before the job store existed only have CSVs: scan today's search output
     if not urls:
         try:
             today_prefix = datetime.datetime.now().strftime('%Y%m%d')
@@ -186,7 +344,7 @@ def main():
                             # extract integer from string, default 0
                             digits = ''.join(ch for ch in fit_raw if ch.isdigit())
                             fit_val = int(digits) if digits else 0
-                            if fit_val > 3:
+                            if fit_val > min_fit:
                                 u = (row.get('job url') or '').strip()
                                 if u:
                                     urls.append(u)
@@ -200,7 +358,7 @@ def main():
                     seen.add(u)
                     deduped.append(u)
             urls = deduped
-            print(f"[FALLBACK] Selected {len(urls)} URLs from today's search CSVs with fit>3")
+            print(f"[FALLBACK] Selected {len(urls)} URLs from today's search CSVs with fit>{min_fit}")
         except Exception as e:
             print(f"[FALLBACK] ERROR collecting today's URLs: {e}")
             print(traceback.format_exc())
@@ -210,6 +368,7 @@ def main():
 
     # Normalize and pre-extract ids; drop invalid and already processed
     url_items = []
+    groups_seen = set()
     for url in urls:
         try:
             jid = extract_job_id(url)
@@ -219,6 +378,21 @@ def main():
         if jid in processed:
             print(f"[SKIP] outreach already processed id={jid}")
             continue
+        # One outreach per near-duplicate group (same role reposted by other countries/agencies)
+        try:
+            group = (STORE.get(jid) or {}).get('duplicate group')
+            contacted = STORE.group_outreach_id(jid) if group else None
+        except Exception as e:
+            print(f"[SKIP] ERROR reading duplicate group for id={jid}: {e}")
+            group, contacted = None, None
+        if contacted:
+            print(f"[SKIP] outreach already sent for duplicate id={contacted} of id={jid}")
+            continue
+        if group and group in groups_seen:
+            print(f"[SKIP] duplicate of a job already queued id={jid} group={group}")
+            continue
+        if group:
+            groups_seen.add(group)
         url_items.append((url, jid))
 
     if not url_items:
@@ -226,56 +400,63 @@ def main():
         fh.close()
         return
 
-    total = len(url_items)
-    batch_size = max(1, CONFIG.get('batch_size', 5))
-    batches = [url_items[i:i+batch_size] for i in range(0, total, batch_size)]
-    total_batches = len(batches)
+    # One streaming pass per referenced search CSV; jobs already in the job store don't need it
+    csv_index = SearchCsvIndex()
+    try:
+        csv_index = build_search_csv_index(cache_index, [jid for _, jid in url_items if jid not in STORE])
+        print(f"[CACHE] Indexed {len(csv_index)} job(s) from prior search CSVs")
+    except Exception as e:
+        print(f"[CACHE] ERROR building search CSV index: {e}")
+        print(traceback.format_exc())
+
+    # Recruiter links already known from the store / search CSVs: start their profile fetches now,
+    # so they overlap with the items ahead of them instead of running inside the item
+    for _, jid in url_items:
+        try:
+            known = STORE.get(jid)
+            link = (row_to_job_details(known) if known else csv_index.details(jid) or {}).get('recruiter_link')
+        except Exception:
+            continue
+        profiles.PROFILES.prefetch(link)
 
-    print(f"[BATCH] total_urls={total} batch_size={batch_size} total_batches={total_batches}")
+    total = len(url_items)
+    max_workers = max(1, min(CONFIG.get('max_workers', 16), total or 1))
+    print(f"[BATCH] total_urls={total} workers={max_workers}")
 
     def process_item(item):
+        # spans opened while processing the item are tagged with its job id
+        with tracing.span('outreach.item', context=True, job_id=item[1]):
+            return _process_item(item)
+
+    def _process_item(item):
         url, job_id = item
         try:
-            # Try cache reuse from prior search CSV
+            # Try cache reuse from the job store (indexed by id), then from a prior search CSV
             job_details = None
             recruiter_link = ''
             recruiter_name = ''
-            cached_run = cache_index.get(str(job_id))
-            if cached_run:
-                try:
-                    search_csv = os.path.join(config.OUTREACH_OUTPUT_DIR, f"search_{cached_run}.csv")
-                    if os.path.exists(search_csv):
-                        with open(search_csv, 'r', encoding='utf-8') as cf:
-                            reader = csv.DictReader(cf)
-                            for row in reader:
-                                try:
-                                    rid = extract_job_id(row.get('job url') or '')
-                                except Exception:
-                                    continue
-                                if rid == job_id:
-                                    job_details = {
-                                        'job_title': row.get('job title') or '',
-                                        'job_description': row.get('description') or '',
-                                        'company': row.get('company name') or '',
-                                        'company_link': row.get('company linkedin url') or '',
-                                        'job_link': row.get('job url') or '',
-                                        'publishing_date': row.get('upload date') or '',
-                                        'posted_time_ago': row.get('upload date') or '',
-                                        'recruiter_name': row.get('hiring manager name') or '',
-                                        'recruiter_link': row.get('hiring manager linkedin url') or '',
-                                    }
-                                    recruiter_link = job_details.get('recruiter_link') or ''
-                                    recruiter_name = job_details.get('recruiter_name') or ''
-                                    print(f"[CACHE] hit id={job_id} run={cached_run}")
-                                    break
-                except Exception as e:
-                    print(f"[CACHE] ERROR reading search CSV for run={cached_run}: {e}")
-                    print(traceback.format_exc())
+            try:
+                stored = STORE.get(job_id)
+            except Exception as e:
+                print(f"[CACHE] ERROR reading job store for id={job_id}: {e}")
+                stored = None
+            if stored:
+                job_details = row_to_job_details(stored)
+                recruiter_link = job_details.get('recruiter_link') or ''
+                recruiter_name = job_details.get('recruiter_name') or ''
+                print(f"[CACHE] hit id={job_id} store run={stored.get('run_ts')}")
+            if not job_details:
+                job_details, cached_csv = csv_index.get(job_id)
+                if job_details:
+                    recruiter_link = job_details.get('recruiter_link') or ''
+                    recruiter_name = job_details.get('recruiter_name') or ''
+                    print(f"[CACHE] hit id={job_id} csv={os.path.basename(cached_csv)}")
 
             # Fallback to fresh scrape when cache miss
             if not job_details:
                 try:
-                    job_details, _ = fetch_job_details(job_id)
+                    # up to max_workers items miss at once: share the process-wide detail politeness limit
+                    job_details, _ = fetch_job_details(job_id, rate_limiter=DETAIL_RATE_LIMITER)
                 except Exception as e:
                     print(f"ERROR fetching job details for {job_id}: {e}")
                     print(traceback.format_exc())
@@ -286,22 +467,15 @@ def main():
                 recruiter_link = job_details.get('recruiter_link') or ''
                 recruiter_name = job_details.get('recruiter_name') or ''
 
-            profile = None
-            if recruiter_link:
-                try:
-                    profile = fetch_public_profile(recruiter_link)
-                except Exception as e:
-                    print(f"ERROR fetching recruiter profile: {e}")
-                    print(traceback.format_exc())
-
             fit_val = ''
             message = ''
             tailored_cv = ''
             try:
                 if recruiter_link:
                     sys_prompt = build_system_prompt_outreach(cv_text)
-                    usr_prompt = build_user_prompt_outreach(job_details, profile or {})
-                    content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"})
+                    # Only the outreach message uses the profile: memoized per URL, usually prefetched
+                    usr_prompt = build_user_prompt_outreach(job_details, profiles.PROFILES.get(recruiter_link) or {})
+                    content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"}, purpose='outreach_message')
                     if isinstance(content, dict):
                         fit_val = str(content.get('fit', ''))
                         message = content.get('message', '') or ''
@@ -317,7 +491,7 @@ def main():
                 else:
                     sys_prompt = build_system_prompt_cv(cv_text)
                     usr_prompt = build_user_prompt_cv(job_details)
-                    content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"})
+                    content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"}, purpose='tailored_cv')
                     if isinstance(content, dict):
                         tailored_cv = content.get('tailored_cv', '') or ''
                     else:
@@ -351,175 +525,87 @@ def main():
             print(traceback.format_exc())
             return None
 
-    def process_batch(batch_idx: int, items: list):
-        batch_rows = []
-        batch_ids = set()
-        print(f"[BATCH] start {batch_idx+1}/{total_batches} size={len(items)}")
-        real_workers = max(1, min(CONFIG.get('max_workers', 5), len(items), batch_size))
-        with ThreadPoolExecutor(max_workers=real_workers) as ex:
-            futures = [ex.submit(process_item, item) for item in items]
-            for fut in as_completed(futures):
-                result = fut.result()
-                if not result:
-                    continue
-                row, jid = result
-                batch_rows.append(row)
-                batch_ids.add(jid)
-        # Sort for deterministic order
-        batch_rows.sort(key=lambda r: (r.get('company name') or '').lower())
-        return batch_rows, batch_ids
-        batch_rows = []
-        batch_ids = set()
-        print(f"[BATCH] start {batch_idx+1}/{total_batches} size={len(items)}")
-        for url, job_id in items:
-            try:
-                # Try cache reuse from prior search CSV
-                job_details = None
-                recruiter_link = ''
-                recruiter_name = ''
-                cached_run = cache_index.get(str(job_id))
-                if cached_run:
-                    try:
-                        search_csv = os.path.join(config.OUTREACH_OUTPUT_DIR, f"search_{cached_run}.csv")
-                        if os.path.exists(search_csv):
-                            with open(search_csv, 'r', encoding='utf-8') as cf:
-                                reader = csv.DictReader(cf)
-                                for row in reader:
-                                    try:
-                                        rid = extract_job_id(row.get('job url') or '')
-                                    except Exception:
-                                        continue
-                                    if rid == job_id:
-                                        job_details = {
-                                            'job_title': row.get('job title') or '',
-                                            'job_description': row.get('description') or '',
-                                            'company': row.get('company name') or '',
-                                            'company_link': row.get('company linkedin url') or '',
-                                            'job_link': row.get('job url') or '',
-                                            'publishing_date': row.get('upload date') or '',
-                                            'posted_time_ago': row.get('upload date') or '',
-                                            'recruiter_name': row.get('hiring manager name') or '',
-                                            'recruiter_link': row.get('hiring manager linkedin url') or '',
-                                        }
-                                        recruiter_link = job_details.get('recruiter_link') or ''
-                                        recruiter_name = job_details.get('recruiter_name') or ''
-                                        print(f"[CACHE] hit id={job_id} run={cached_run}")
-                                        break
-                    except Exception as e:
-                        print(f"[CACHE] ERROR reading search CSV for run={cached_run}: {e}")
-                        print(traceback.format_exc())
-
-                # Fallback to fresh scrape when cache miss
-                if not job_details:
-                    try:
-                        job_details, _ = fetch_job_details(job_id)
-                    except Exception as e:
-                        print(f"ERROR fetching job details for {job_id}: {e}")
-                        print(traceback.format_exc())
-                        continue
-                    if not job_details:
-                        print(f"ERROR: No job details for {job_id}")
-                        continue
-                    recruiter_link = job_details.get('recruiter_link') or ''
-                    recruiter_name = job_details.get('recruiter_name') or ''
-
-                profile = None
-                if recruiter_link:
-                    try:
-                        profile = fetch_public_profile(recruiter_link)
-                    except Exception as e:
-                        print(f"ERROR fetching recruiter profile: {e}")
-                        print(traceback.format_exc())
-
-                fit_val = ''
-                message = ''
-                tailored_cv = ''
-                try:
-                    if recruiter_link:
-                        sys_prompt = build_system_prompt_outreach(cv_text)
-                        usr_prompt = build_user_prompt_outreach(job_details, profile or {})
-                        content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"})
-                        if isinstance(content, dict):
-                            fit_val = str(content.get('fit', ''))
-                            message = content.get('message', '') or ''
-                        else:
-                            import json as _json
-                            try:
-                                parsed = _json.loads(content or '{}')
-                                fit_raw = parsed.get('fit')
-                                fit_val = str(fit_raw) if fit_raw is not None else ''
-                                message = parsed.get('message', '') or ''
-                            except Exception:
-                                pass
-                    else:
-                        sys_prompt = build_system_prompt_cv(cv_text)
-                        usr_prompt = build_user_prompt_cv(job_details)
-                        content, _, _ = call_llm(sys_prompt, usr_prompt, response_format={"type": "json_object"})
-                        if isinstance(content, dict):
-                            tailored_cv = content.get('tailored_cv', '') or ''
-                        else:
-                            import json as _json
-                            try:
-                                parsed = _json.loads(content or '{}')
-                                tailored_cv = parsed.get('tailored_cv', '') or ''
-                            except Exception:
-                                pass
-                except Exception as e:
-                    print(f"ERROR LLM: {e}")
-                    print(traceback.format_exc())
-
-                batch_rows.append({
-                    'job title': job_details.get('job_title') or '',
-                    'description': job_details.get('job_description') or '',
-                    'company name': job_details.get('company') or '',
-                    'company linkedin url': job_details.get('company_link') or '',
-                    'job url': job_details.get('job_link') or '',
-                    'upload date': job_details.get('publishing_date') or job_details.get('posted_time_ago') or '',
-                    'hiring manager name': recruiter_name,
-                    'hiring manager linkedin url': recruiter_link or '',
-                    'fit': fit_val,
-                    'message': message,
-                    'tailored cv': tailored_cv,
-                })
-                batch_ids.add(job_id)
-            except Exception as e:
-                print(f"[BATCH] ERROR item id={job_id}: {e}")
-                print(traceback.format_exc())
-        # Sort for deterministic order
-        batch_rows.sort(key=lambda r: (r.get('company name') or '').lower())
-        return batch_rows, batch_ids
-
     written = 0
     new_ids = set()
+    # Columnar copy partitioned by run date (None without pyarrow)
+    parquet_out = columnar.open_writer('outreach', ts)
+
+    def _commit(rows, ids):
+        # Runs on the writer thread: rows reach the CSV and the job store before their IDs count as processed
+        # (the Parquet copy is best-effort: rows are buffered into row groups and written on close(), so
+        # after a crash it is rebuilt from the CSV with `python columnar.py --import-csv`)
+        nonlocal written
+        with tracing.span('write.csv', rows=len(rows)):
+            for r in rows:
+                writer.writerow(r)
+            sync_file(fh, config.WRITE_DURABILITY)
+        with tracing.span('write.job_store', rows=len(rows)):
+            STORE.add_outreach_rows(ts, rows)
+        if parquet_out is not None:
+            with tracing.span('write.parquet', rows=len(rows)):
+                parquet_out.write_rows(rows)
+        written += len(rows)
+        new_ids.update(ids)
+        # Persist processed ids incrementally (append-only, this group's ids)
+        with tracing.span('write.state', ids=len(ids)):
+            append_run_processed_ids(ts, ids)
+        print(f"[WRITE] wrote={len(rows)} total={written}")
+
+    # Group commits happen off the main thread, so disk syncs never hold up the workers
+    committer = GroupCommitWriter(_commit, max_rows=config.WRITE_GROUP_MAX_ROWS, max_delay=config.WRITE_GROUP_MAX_DELAY,
+                                  name='outreach-writer')
+
+    def _feed(submit):
+        for item in url_items:
+            submit(item)
+
     try:
-        for i, items in enumerate(batches):
-            try:
-                rows, ids = process_batch(i, items)
-            except Exception as e:
-                print(f"[BATCH] ERROR batch {i+1}: {e}")
-                print(traceback.format_exc())
-                continue
-            try:
-                for r in rows:
-                    writer.writerow(r)
-                fh.flush()
-                os.fsync(fh.fileno())
-                written += len(rows)
-                new_ids.update(ids)
-                # Persist processed ids incrementally
-                tmp_ids = set(processed)
-                tmp_ids.update(new_ids)
-                append_run_processed_ids(ts, tmp_ids)
-                print(f"[WRITE] batch {i+1}/{total_batches} wrote={len(rows)} total={written}")
-            except Exception as e:
-                print(f"[WRITE] ERROR writing batch {i+1}: {e}")
-                print(traceback.format_exc())
+        # One pool for the whole run: a worker takes the next URL as soon as it is free, so a slow
+        # profile fetch or LLM call holds up only its own item
+        done = failed = 0
+        for item, result, err in run_stream(_feed, process_item, workers=max_workers, queue_size=CONFIG.get('queue_size', 32)):
+            done += 1
+            if err is not None:
+                print(f"[BATCH] ERROR item id={item[1]}: {err}")
+            if not result:
+                failed += 1
+            else:
+                row, jid = result
+                committer.put(row, jid)
+            print(f"[PROGRESS] {done}/{total} processed ok={done - failed} failed={failed}")
     finally:
+        committer.close()
+        profiles.PROFILES.close()
         fh.close()
+    committer.log_stats()
+    if parquet_out is not None:
+        try:
+            parquet_path = parquet_out.close()  # flushes the last row group, so rows is final after it
+            print(f"[WRITE] Parquet copy ({parquet_out.rows} rows) -> {parquet_path}")
+        except Exception as e:
+            print(f"ERROR writing Parquet copy: {e}")
+            print(traceback.format_exc())
 
     processed.update(new_ids)
-    append_run_processed_ids(ts, processed)
+    STATE.maybe_compact()
+    STORE.close()
     print(f"Wrote {written} row(s) to {csv_path}")
+    compaction.log_stats()
+    profiles.log_stats()
+    http_client.log_stats()
+    response_cache.log_stats()
+    llm_cache.log_stats()
+    llm_async.log_stats()
+    # Per-run LLM accounting (latency percentiles, tokens, estimated cost) next to the CSV
+    try:
+        report_path = os.path.splitext(csv_path)[0] + '_llm_report.json'
+        llm_metrics.write_report(report_path, {'script': 'outreach', 'run_ts': ts, 'csv': os.path.basename(csv_path), 'rows': written})
+        llm_metrics.log_summary()
+        print(f"[LLM] Report -> {report_path}")
+    except Exception as e:
+        print(f"ERROR writing LLM report: {e}")
+        print(traceback.format_exc())
+    tracing.finish(csv_path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+import traceback
+from typing import Callable, Iterator
+
+_DONE = object()
+DURABILITY_LEVELS = ('none', 'flush', 'fsync')
+
+
+def check_durability(durability: str) -> str:
+    """Return durability when it is a known level, else raise ValueError (call at startup, before any commit)."""
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability {durability!r} (expected one of {DURABILITY_LEVELS})")
+    return durability
+
+
+def sync_file(f, durability: str):
+    """Make writes to f durable to the given level: 'none', 'flush' (OS buffers) or 'fsync' (disk)."""
+    check_durability(durability)
+    if durability in ('flush', 'fsync'):
+        f.flush()
+    if durability == 'fsync':
+        os.fsync(f.fileno())
+
+
+def run_stream(feed_fn: Callable[[Callable], None], worker_fn: Callable, workers: int = 4, queue_size: int = 20) -> Iterator:
+    """
+    Stream items from a producer through a bounded worker pool.
+
+    feed_fn(submit) runs on its own thread and calls submit(item) for every
+    item it produces; submit blocks while `queue_size` items are waiting, so
+    a fast producer is throttled by the workers (backpressure) and memory
+    stays bounded. Each of the `workers` threads applies worker_fn to items
+    as they arrive. Yields (item, result, error) tuples in completion order;
+    a failing item yields its exception and never affects other items.
+    """
+    workers = max(1, workers)
+    inbox = queue.Queue(maxsize=max(1, queue_size))
+    outbox = queue.Queue(maxsize=max(1, queue_size))
+
+    def _feed():
+        try:
+            feed_fn(inbox.put)
+        except Exception as e:
+            print(f"ERROR stream producer: {e}")
+            print(traceback.format_exc())
+        finally:
+            for _ in range(workers):
+                inbox.put(_DONE)
+
+    def _work():
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                outbox.put(_DONE)
+                return
+            try:
+                outbox.put((item, worker_fn(item), None))
+            except Exception as e:
+                outbox.put((item, None, e))
+
+    threads = [threading.Thread(target=_feed, name='stream-feed', daemon=True)]
+    threads += [threading.Thread(target=_work, name=f'stream-worker-{i}', daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+
+    finished = 0
+    while finished < workers:
+        result = outbox.get()
+        if result is _DONE:
+            finished += 1
+            continue
+        yield result
+
+
+class GroupCommitWriter:
+    """
+    Background writer thread that group-commits (row, job_id) pairs.
+
+    put() only enqueues (it blocks while `queue_size` entries are waiting),
+    so workers never wait on disk. The writer thread gathers entries until
+    it holds `max_rows` of them or the oldest has waited `max_delay`
+    seconds, then calls commit(rows, ids) once for the whole group. commit
+    persists the rows before the ids, so a row and its processed ID become
+    durable together: a crash can leave rows whose IDs are retried next
+    run, never IDs without their rows. A failing commit is logged and its
+    IDs are not recorded.
+    """
+
+    def __init__(self, commit: Callable, max_rows: int = 50, max_delay: float = 1.0, queue_size: int = 1000,
+                 name: str = 'writer'):
+        self.commit = commit
+        self.max_rows = max(1, max_rows)
+        self.max_delay = max_delay
+        self.name = name
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.rows = 0
+        self.commits = 0
+        self.failed = 0
+        self.commit_seconds = 0.0
+        self._thread.start()
+
+    def put(self, row: dict, job_id):
+        self._queue.put((row, job_id))
+
+    def flush(self):
+        """Block until every entry put so far is committed."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Commit what is left and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_DONE)
+            self._thread.join()
+
+    def _commit(self, rows: list, ids: list):
+        if not rows:
+            return
+        start = time.perf_counter()
+        try:
+            self.commit(rows, ids)
+            self.rows += len(rows)
+            self.commits += 1
+        except Exception as e:
+            self.failed += len(rows)
+            print(f"ERROR {self.name} commit of {len(rows)} row(s): {e}")
+            print(traceback.format_exc())
+        self.commit_seconds += time.perf_counter() - start
+
+    def _run(self):
+        rows, ids, deadline = [], [], None
+        while True:
+            timeout = None if not rows else max(0.0, deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None  # the oldest entry waited max_delay
+            if entry is None or entry is _DONE or isinstance(entry, threading.Event):
+                self._commit(rows, ids)
+                rows, ids = [], []
+                if entry is _DONE:
+                    return
+                if entry is not None:
+                    entry.set()
+                continue
+            row, job_id = entry
+            if not rows:
+                deadline = time.monotonic() + self.max_delay
+            rows.append(row)
+            ids.append(job_id)
+            if len(rows) >= self.max_rows:
+                self._commit(rows, ids)
+                rows, ids = [], []
+
+    def log_stats(self):
+        print(f"[WRITE] {self.name}: rows={self.rows} commits={self.commits} failed_rows={self.failed} "
+              f"commit_time={self.commit_seconds:.2f}s")
@@ -0,0 +1,196 @@
+import argparse
+import csv
+import glob
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset("""
+a an and are as at be been but by can do for from has have if in into is it its of on or our that the their
+them they this to was we were what when where which while who will with you your us not all any more most
+other some such than too very also may must should would could about over under within across per via etc
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _keyword_re(keywords: Iterable[str]):
+    words = [re.escape(k.lower()) for k in keywords if k.strip()]
+    return re.compile(r"\b(?:" + "|".join(words) + r")\b") if words else None
+
+
+class LocalScorer:
+    """
+    Cheap job/CV similarity used to skip obvious mismatches before the LLM.
+
+    Jobs and the CV are sparse term vectors weighted with BM25-style
+    saturated term frequency times IDF (document frequencies from recent
+    job descriptions); the local score is their cosine similarity plus a
+    bonus for titles with a keep keyword. A title matching a reject keyword
+    scores 0, unless it also matches a keep keyword ("Sales Engineer (Data
+    Platform)" is kept). Jobs scoring below `threshold` are not sent to the
+    LLM.
+    """
+
+    def __init__(self, cv_text: str, corpus: Iterable[str] = (), threshold: float = 0.0, k1: float = 1.2,
+                 reject_titles: Iterable[str] = (), keep_titles: Iterable[str] = (), keep_bonus: float = 0.0):
+        self.threshold = threshold
+        self.k1 = k1
+        self.keep_bonus = keep_bonus
+        self._reject_re = _keyword_re(reject_titles)
+        self._keep_re = _keyword_re(keep_titles)
+        self._df = Counter()
+        self._docs = 0
+        for doc in corpus:
+            self._df.update(set(tokenize(doc)))
+            self._docs += 1
+        self._cv_vec = self._vector(tokenize(cv_text))
+        self._lock = threading.Lock()
+        self.scored = 0
+        self.skipped = 0
+
+    def _idf(self, term: str) -> float:
+        # BM25 idf with +1 smoothing; unseen terms get the maximum weight
+        df = self._df.get(term, 0)
+        return math.log(1 + (self._docs - df + 0.5) / (df + 0.5))
+
+    def _vector(self, tokens: List[str]) -> Dict[str, float]:
+        vec = {}
+        for term, tf in Counter(tokens).items():
+            vec[term] = self._idf(term) * tf * (self.k1 + 1) / (tf + self.k1)
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {t: w / norm for t, w in vec.items()}
+
+    def similarity(self, text: str) -> float:
+        vec = self._vector(tokenize(text))
+        cv = self._cv_vec
+        if len(vec) > len(cv):
+            vec, cv = cv, vec
+        return sum(w * cv.get(t, 0.0) for t, w in vec.items())
+
+    def score(self, title: str, description: str) -> float:
+        """Local fit score in [0, 1 + keep_bonus]; 0 for rejected titles."""
+        title_l = (title or '').lower()
+        keep = self._keep_re is not None and self._keep_re.search(title_l)
+        if not keep and self._reject_re is not None and self._reject_re.search(title_l):
+            return 0.0
+        sim = self.similarity(f"{title or ''}\n{title or ''}\n{description or ''}")
+        if keep:
+            sim += self.keep_bonus
+        return sim
+
+    def check(self, job: dict) -> bool:
+        """Score a scraped job (sets job['local_score']); returns True when it should go to the LLM."""
+        local = self.score(job.get('job_title'), job.get('job_description'))
+        job['local_score'] = local
+        keep = local >= self.threshold
+        with self._lock:
+            self.scored += 1
+            if not keep:
+                self.skipped += 1
+        return keep
+
+    def log_stats(self):
+        print(f"[PREFILTER] Skipped {self.skipped}/{self.scored} LLM fit calls (threshold={self.threshold})")
+
+
+def recent_descriptions(limit: int) -> List[str]:
+    """Most recent job descriptions from the job store (IDF corpus); empty when the store is unavailable."""
+    try:
+        from job_store import STORE
+        return STORE.recent_descriptions(limit)
+    except Exception as e:
+        print(f"[PREFILTER] No IDF corpus from the job store: {e}")
+        return []
+
+
+def build_scorer(cv_text: str, search_keywords: Iterable[str] = ()) -> Optional[LocalScorer]:
+    """
+    Scorer configured from config.PREFILTER_*; None when the pre-filter is disabled.
+
+    The searched job titles count as keep keywords, so a role searched for
+    on purpose is never rejected by its title.
+    """
+    if not config.PREFILTER_ENABLED:
+        return None
+    return LocalScorer(
+        cv_text,
+        corpus=recent_descriptions(config.PREFILTER_CORPUS_SIZE),
+        threshold=config.PREFILTER_THRESHOLD,
+        reject_titles=config.PREFILTER_REJECT_TITLES,
+        keep_titles=list(config.PREFILTER_KEEP_TITLES) + [k.strip() for k in search_keywords if k.strip()],
+        keep_bonus=config.PREFILTER_KEEP_BONUS,
+    )
+
+
+def _fit_value(raw) -> Optional[int]:
+    m = re.search(r'\d+', str(raw or ''))
+    return int(m.group(0)) if m else None
+
+
+def calibrate(cv_path: str, csv_glob: str, min_fit: int):
+    """Compare local scores with past LLM fit values from search CSVs and print a threshold table."""
+    rows = {}
+    for path in sorted(glob.glob(csv_glob)):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                fit = _fit_value(row.get('fit'))
+                if fit is not None and row.get('description'):
+                    rows[row.get('id') or row.get('job url')] = (row.get('job title') or '', row['description'], fit)
+    if not rows:
+        print(f"No scored rows found in {csv_glob}")
+        return
+    with open(cv_path, 'r', encoding='utf-8') as f:
+        cv_text = f.read()
+    scorer = LocalScorer(
+        cv_text,
+        corpus=[d for _, d, _ in rows.values()],
+        reject_titles=config.PREFILTER_REJECT_TITLES,
+        keep_titles=config.PREFILTER_KEEP_TITLES,
+        keep_bonus=config.PREFILTER_KEEP_BONUS,
+    )
+    scored = sorted((scorer.score(t, d), fit) for t, d, fit in rows.values())
+    n = len(scored)
+    locals_, fits = [s for s, _ in scored], [f for _, f in scored]
+
+    mean_l, mean_f = sum(locals_) / n, sum(fits) / n
+    cov = sum((l - mean_l) * (f - mean_f) for l, f in scored)
+    var_l = sum((l - mean_l) ** 2 for l in locals_)
+    var_f = sum((f - mean_f) ** 2 for f in fits)
+    corr = cov / math.sqrt(var_l * var_f) if var_l and var_f else 0.0
+    print(f"Calibration over {n} jobs with an LLM fit (pearson r={corr:.3f}, current threshold={config.PREFILTER_THRESHOLD})")
+
+    print("\nfit  jobs  mean_local  min_local")
+    for fit in sorted(set(fits)):
+        vals = [l for l, f in scored if f == fit]
+        print(f"{fit:>3}  {len(vals):>4}  {sum(vals) / len(vals):>10.3f}  {min(vals):>9.3f}")
+
+    good = sum(1 for f in fits if f > min_fit)
+    print(f"\nthreshold  skipped  skipped%  lost_fit>{min_fit}")
+    for pct in (0, 5, 10, 20, 30, 40, 50):
+        threshold = locals_[min(n - 1, n * pct // 100)] if pct else 0.0
+        skipped = sum(1 for l in locals_ if l < threshold)
+        lost = sum(1 for l, f in scored if l < threshold and f > min_fit)
+        print(f"{threshold:>9.3f}  {skipped:>7}  {100.0 * skipped / n:>7.1f}%  {lost:>5}/{good}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local pre-filter scorer tools")
+    parser.add_argument("--calibrate", action="store_true", help="Compare local scores with past LLM fit values")
+    parser.add_argument("--cv", default="cv.txt", help="CV file (default: cv.txt)")
+    parser.add_argument("--csv-glob", default=os.path.join(config.OUTREACH_OUTPUT_DIR, "search_*.csv"),
+                        help="Search CSVs holding past LLM fit scores")
+    parser.add_argument("--min-fit", type=int, default=3, help="Fit above which a skipped job counts as lost")
+    args = parser.parse_args()
+    if args.calibrate:
+        calibrate(args.cv, args.csv_glob, args.min_fit)
+    else:
+        parser.print_help()
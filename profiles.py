@@ -0,0 +1,81 @@
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import config
+from linkedin_scraper import fetch_public_profile
+
+
+class ProfileEnricher:
+    """
+    Demand-driven recruiter-profile lookups, memoized per profile URL.
+
+    prefetch() starts a fetch on a small background pool as soon as a
+    profile is known to be needed; get() returns it, waiting only when the
+    fetch is still running (or starting it when nobody prefetched). Each
+    URL is fetched and parsed once per run; network fetches wait on the
+    shared PROFILE_RATE_LIMITER token bucket. Across runs the raw page comes
+    from the persistent response cache (the 'profile' TTL in
+    config.HTTP_CACHE_TTLS; the CI workflow restores it between runs), so a
+    recruiter posting many jobs costs one request per TTL.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._futures = {}  # profile url -> Future of the parsed profile
+        self.lookups = 0
+        self.ready = 0  # lookups answered by an earlier prefetch/get of the same URL
+        self.fetches = 0
+
+    def _submit(self, url: str) -> Future:
+        # Called with self._lock held
+        future = self._futures.get(url)
+        if future is None:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='profile')
+            future = self._pool.submit(fetch_public_profile, url)
+            self._futures[url] = future
+            self.fetches += 1
+        return future
+
+    def prefetch(self, url: str):
+        """Start fetching url in the background (no-op when empty or already requested)."""
+        if not url:
+            return
+        with self._lock:
+            self._submit(url)
+
+    def get(self, url: str) -> Optional[dict]:
+        """Parsed profile for url ({} when it could not be fetched); None when url is empty."""
+        if not url:
+            return None
+        with self._lock:
+            self.lookups += 1
+            if url in self._futures:
+                self.ready += 1
+            future = self._submit(url)
+        try:
+            return future.result() or {}
+        except Exception as e:
+            print(f"ERROR fetching recruiter profile {url}: {e}")
+            print(traceback.format_exc())
+            return {}
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def log_stats(self):
+        print(f"[PROFILE] lookups={self.lookups} prefetched_or_memoized={self.ready} fetched={self.fetches}")
+
+
+PROFILES = ProfileEnricher(config.PROFILE_FETCH_WORKERS)
+
+
+def log_stats():
+    PROFILES.log_stats()
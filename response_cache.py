@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import config
+import http_client
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """Minimal response object served by the cache (same .text/.content/.status_code as requests)."""
+
+    def __init__(self, url: str, content: bytes, encoding: str, status_code: int = 200, from_cache: bool = False):
+        self.url = url
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class ResponseCache:
+    """
+    Persistent, compressed, content-addressed HTTP response cache.
+
+    Bodies are zlib-compressed blobs named by the SHA-256 of their content
+    (identical pages such as authwalls are stored once); a SQLite index maps
+    each URL to its blob with fetch and last-access times. Entries expire per
+    endpoint (config.HTTP_CACHE_TTLS), the total blob size is capped with LRU
+    eviction, and concurrent requests for the same URL are coalesced so only
+    one of them hits the network.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttls: dict, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            os.makedirs(self.blob_dir, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite'), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " url TEXT PRIMARY KEY, endpoint TEXT, blob TEXT, size INTEGER,"
+                " encoding TEXT, fetched_at REAL, accessed_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_blob ON entries(blob)")
+            self._conn.commit()
+        return self._conn
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest + '.z')
+
+    def _lookup(self, url: str, endpoint: str):
+        ttl = self.ttls.get(endpoint, 0)
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT blob, encoding, fetched_at FROM entries WHERE url = ?", (url,)).fetchone()
+            if not row:
+                return None
+            digest, encoding, fetched_at = row
+            if time.time() - fetched_at > ttl:
+                return None
+            db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                return CachedResponse(url, zlib.decompress(f.read()), encoding, from_cache=True)
+        except (OSError, zlib.error):
+            return None
+
+    def _store(self, url: str, endpoint: str, content: bytes, encoding: str):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        compressed = zlib.compress(content, 6)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (url, endpoint, blob, size, encoding, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, endpoint, digest, len(compressed), encoding, now, now),
+            )
+            db.commit()
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        # Called with self._lock held; sizes count each distinct blob once
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT blob, MAX(size) AS size FROM entries GROUP BY blob)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        for url, digest in db.execute("SELECT url, blob FROM entries ORDER BY accessed_at ASC").fetchall():
+            if total <= target:
+                break
+            db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.evictions += 1
+            if not db.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (digest,)).fetchone():
+                path = self._blob_path(digest)
+                try:
+                    total -= os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    pass
+        db.commit()
+
+    def fetch(self, url: str, endpoint: str, before_fetch=None, cacheable=None):
+        """
+        Return the response for url, from cache when fresh, otherwise from the network.
+
+        before_fetch: optional callable run only when the network is actually hit
+        (e.g. a rate limiter's acquire), so cache hits cost no politeness tokens.
+        cacheable: optional check on a 200 response; when it returns False the
+        response is returned but not stored (e.g. an authwall served as 200).
+        Only 200 responses are cached; endpoints without a TTL are never cached.
+        """
+        if not self.enabled or self.ttls.get(endpoint, 0) <= 0:
+            if before_fetch is not None:
+                before_fetch()
+            return http_client.get(url, endpoint=endpoint)
+
+        cached = self._lookup(url, endpoint)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        # Single-flight: the first caller fetches, concurrent callers wait for its result
+        with self._lock:
+            flight = self._inflight.get(url)
+            leader = flight is None
+            if leader:
+                flight = {'done': threading.Event(), 'response': None, 'error': None}
+                self._inflight[url] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['response']
+
+        try:
+            if before_fetch is not None:
+                before_fetch()
+            response = http_client.get(url, endpoint=endpoint)
+            if response.status_code == 200 and cacheable is not None and not cacheable(response):
+                with self._lock:
+                    self.rejected += 1
+                logger.info(f"[CACHE] not caching {url}: page failed the {endpoint} check")
+            elif response.status_code == 200:
+                try:
+                    self._store(url, endpoint, response.content, response.encoding)
+                except Exception as e:
+                    logger.warning(f"[CACHE] could not store {url}: {e}")
+            flight['response'] = response
+            return response
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            flight['done'].set()
+
+    def log_stats(self):
+        logger.info(f"[CACHE] http hits={self.hits} misses={self.misses} coalesced={self.coalesced} evictions={self.evictions} rejected={self.rejected}")
+
+
+CACHE = ResponseCache(
+    config.HTTP_CACHE_DIR,
+    max_bytes=config.HTTP_CACHE_MAX_BYTES,
+    ttls=config.HTTP_CACHE_TTLS,
+    enabled=config.HTTP_CACHE_ENABLED,
+)
+
+
+def fetch(url: str, endpoint: str, before_fetch=None, cacheable=None):
+    """Fetch through the process-wide response cache (see ResponseCache.fetch)."""
+    return CACHE.fetch(url, endpoint, before_fetch=before_fetch, cacheable=cacheable)
+
+
+def log_stats():
+    CACHE.log_stats()
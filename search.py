@@ -1,16 +1,29 @@
-import csv
 import datetime
 import json
 import os
-import random
-import time
+import threading
 from typing import List
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
 
+import columnar
+import compaction
 import config
+import dedup
+import http_client
+import llm_async
+import llm_cache
+import llm_metrics
+import prefilter
+import response_cache
 import prompts
-from linkedin_scraper import scrape_linkedin_jobs, fetch_public_profile
+import sorted_csv
+import tracing
+from grid import build_grid, describe_combo, run_grid
+from job_store import STORE
+from linkedin_scraper import JobIdFilter, iter_linkedin_jobs
+from pipeline import GroupCommitWriter, check_durability, run_stream
+from rate_limiter import RequestBudget
+from state_log import ProcessedIdLog
 from utils import call_llm
 
 # In-script configuration (no CLI)
@@ -53,10 +66,19 @@ CONFIG = {
     'cv_file': 'cv.txt',
     # Time posted filter: one of {'Any','Past 24 hours','Past Week','Past Month'}
     'time_posted': 'Past 24 hours',
-    # Batch size for processing jobs (failures isolate to a single batch)
-    'batch_size': 5,
-    # Max parallel LLM calls
-    'max_workers': 5,
+    # Fit-scoring worker threads (long-lived pool fed by the scraper); in-flight LLM
+    # requests are capped adaptively by the shared async LLM layer, not by this number
+    'max_workers': 16,
+    # Max scraped jobs (or fit batches) waiting for an LLM worker; a full queue pauses scraping
+    'queue_size': 20,
+    # Batched fit scoring: up to this many jobs share one LLM request (and one copy of the CV); 1 = one request per job
+    'fit_batch_max_jobs': 8,
+    # Token budget for the job summaries packed into one batched request (~4 chars per token)
+    'fit_batch_tokens': 6000,
+    # Grid combos scraped concurrently (keyword × country × work_type)
+    'grid_workers': 3,
+    # Global cap on LinkedIn requests (list + detail pages) per run; None = unlimited
+    'max_requests': None,
 }
 
 
@@ -65,49 +87,19 @@ def ensure_dirs():
     os.makedirs(config.STATE_DIR, exist_ok=True)
 
 
+STATE = ProcessedIdLog(config.PROCESSED_IDS_LOG_PATH, legacy_path=config.PROCESSED_IDS_PATH,
+                       fsync=config.WRITE_DURABILITY == 'fsync')
+
+
 def load_processed_ids() -> set:
     ensure_dirs()
-    if os.path.exists(config.PROCESSED_IDS_PATH):
-        try:
-            with open(config.PROCESSED_IDS_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            # Support legacy list format and new dict format {run_ts: [ids]}
-            if isinstance(data, list):
-                return set(data)
-            if isinstance(data, dict):
-                all_ids = set()
-                for _, ids in data.items():
-                    if isinstance(ids, list):
-                        all_ids.update(ids)
-                return all_ids
-            return set()
-        except Exception as e:
-            print(f"ERROR load_processed_ids: {e}")
-            print(traceback.format_exc())
-            return set()
-    return set()
+    return STATE.load()
 
 
 def append_run_processed_ids(run_timestamp: str, ids: set):
-    """Persist processed IDs grouped by run timestamp. Overwrites the entry for this run timestamp."""
+    """Append the IDs processed in this run that are not yet recorded (only new IDs are written)."""
     ensure_dirs()
-    existing = {}
-    if os.path.exists(config.PROCESSED_IDS_PATH):
-        try:
-            with open(config.PROCESSED_IDS_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                existing = data
-            elif isinstance(data, list):
-                # migrate legacy list into a synthetic key
-                existing = {"legacy": data}
-        except Exception as e:
-            print(f"ERROR reading existing processed ids: {e}")
-            print(traceback.format_exc())
-            existing = {}
-    existing[run_timestamp] = sorted(list(ids))
-    with open(config.PROCESSED_IDS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(existing, f)
+    STATE.append(run_timestamp, ids)
 
 
 def encode_keywords(keyword: str) -> str:
@@ -139,20 +131,26 @@ def build_system_prompt(cv_text: str) -> str:
     return prompts.FIT_SYSTEM_PROMPT.format(cv_text=cv_text)
 
 
-def build_user_prompt(job: dict, profile: dict, country: str, work_type_name: str, contract_types: List[str]) -> str:
-    bullets = job.get('job_description', '') or ''
+def build_batch_system_prompt(cv_text: str) -> str:
+    # Multi-job fit system prompt (JSON {"results": [...]} keyed by job id)
+    return prompts.FIT_BATCH_SYSTEM_PROMPT.format(cv_text=cv_text)
+
+
+def estimate_tokens(text: str) -> int:
+    # Token count used to size fit batches
+    return compaction.count_tokens(text)
+
+
+def prompt_description_tokens(text: str) -> int:
+    # Descriptions are compacted to COMPACT_MAX_TOKENS in the prompt
+    tokens = estimate_tokens(text)
+    return min(tokens, config.COMPACT_MAX_TOKENS) if config.COMPACT_ENABLED else tokens
+
+
+def build_user_prompt(job: dict, country: str, work_type_name: str, contract_types: List[str]) -> str:
+    # The fit prompt needs no recruiter profile: profiles are only fetched by outreach, when a message uses them
+    bullets = compaction.compact_for_prompt(job.get('job_description', '') or '', label=job.get('job_title') or '')
     company = job.get('company') or ''
-    recruiter_name = job.get('recruiter_name') or ''
-    profile_snippet = ''
-    if profile:
-        parts = [
-            profile.get('profile_name') or '',
-            profile.get('profile_subtitle') or '',
-            profile.get('profile_location') or '',
-        ]
-        profile_snippet = ' | '.join([p for p in parts if p])
-
-    ct = ','.join(contract_types) if contract_types else ''
     return (
         f"Job title: {job.get('job_title','')}\n"
         f"Company: {company}\n"
@@ -194,25 +192,192 @@ def open_csv_writer(timestamp_str: str):
     ensure_dirs()
     # Decoupled name for job search outputs to avoid overlap with outreach
     csv_path = os.path.join(config.OUTREACH_OUTPUT_DIR, f"search_{timestamp_str}.csv")
-    f = open(csv_path, 'w', encoding='utf-8', newline='')
-    writer = csv.DictWriter(f, fieldnames=config.OUTREACH_CSV_COLUMNS)
-    writer.writeheader()
-    return csv_path, f, writer
+    # Batches are written as sorted runs; the CSV appears, fully sorted, when the runs are merged
+    return csv_path, sorted_csv.open_search_writer(csv_path)
+
+
+def job_to_row(job: dict) -> dict:
+    """Map a scraped job dict to a search CSV row (fit filled in later unless carried from a duplicate)."""
+    local_score = job.get('local_score')
+    return {
+        'id': job.get('id'),
+        'job title': job.get('job_title') or '',
+        'description': job.get('job_description') or '',
+        'company name': job.get('company') or '',
+        'company linkedin url': job.get('company_link') or '',
+        'job url': job.get('job_link') or '',
+        'upload date': job.get('publishing_date') or job.get('posted_time_ago') or '',
+        'hiring manager name': job.get('recruiter_name') or '',
+        'hiring manager linkedin url': job.get('recruiter_link') or '',
+        'fit': job.get('carried_fit') or '',
+        'local score': f"{local_score:.4f}" if local_score is not None else '',
+        'duplicate group': job.get('duplicate_group') or '',
+        # not CSV columns: kept for the Parquet copy
+        'country': job.get('country') or '',
+        'work type': job.get('work_type') or '',
+    }
+
+
+def parse_fit_content(content) -> str:
+    if isinstance(content, dict):
+        return str(content.get('fit', ''))
+    try:
+        parsed = json.loads(content or '{}')
+        fit_raw = parsed.get('fit')
+        # message intentionally left empty in search phase
+        return str(fit_raw) if fit_raw is not None else ''
+    except Exception:
+        f, _ = parse_fit_and_message(content)
+        return f
+
+
+def job_fit_prompt(job: dict, combo: dict, contract_input: List[str]) -> str:
+    """Build the fit user prompt for one job."""
+    return build_user_prompt(job, combo['country'], combo['work_type_name'], contract_input)
+
+
+def score_job(job: dict, combo: dict, system_prompt: str, contract_input: List[str], user_prompt: str = None) -> dict:
+    """Build the CSV row for one job and fill its fit score via the LLM. Runs on a worker thread."""
+    row = job_to_row(job)
+    # Always compute fit via LLM for every job (profile optional)
+    if user_prompt is None:
+        user_prompt = job_fit_prompt(job, combo, contract_input)
+    try:
+        content, _, _ = call_llm(
+            system_prompt,
+            user_prompt,
+            response_format={"type": "json_object"},
+            purpose='fit',
+        )
+    except Exception as e:
+        print(f"ERROR LLM call: {e}")
+        print(traceback.format_exc())
+        content = ""
+    row['fit'] = parse_fit_content(content)
+    return row
 
 
-def chunked(items: List[dict], size: int):
-    if not items:
-        return []
-    for i in range(0, len(items), size):
-        yield items[i:i + size]
+def parse_batch_fits(content) -> dict:
+    """Map job id -> fit ('1'..'10') from a batched {"results": [...]} answer; malformed entries are left out."""
+    try:
+        parsed = content if isinstance(content, dict) else json.loads(content or '{}')
+    except Exception:
+        return {}
+    results = parsed.get('results') if isinstance(parsed, dict) else parsed
+    fits = {}
+    for entry in results if isinstance(results, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        jid = str(entry.get('id') or '').strip()
+        try:
+            fit = int(entry.get('fit'))
+        except (TypeError, ValueError):
+            continue
+        if jid and 1 <= fit <= 10:
+            fits.setdefault(jid, str(fit))
+    return fits
+
+
+def score_jobs_batch(items: list, batch_system_prompt: str, system_prompt: str, contract_input: List[str]) -> list:
+    """
+    Score several (combo, job) items with one LLM request; returns their rows in the same order.
+
+    Each job is packed under a 'JOB ID: <id>' header and the answer must carry
+    one result per id. Jobs whose result is missing or malformed are
+    re-requested individually with the single-job prompt.
+    """
+    prompts_by_item = [job_fit_prompt(job, combo, contract_input) for combo, job in items]
+    if len(items) == 1:
+        combo, job = items[0]
+        return [score_job(job, combo, system_prompt, contract_input, prompts_by_item[0])]
+
+    user_prompt = '\n\n'.join(
+        f"JOB ID: {job.get('id')}\n{prompt}" for (combo, job), prompt in zip(items, prompts_by_item)
+    )
+    fits = {}
+    try:
+        content, prompt_tokens, completion_tokens = call_llm(
+            batch_system_prompt,
+            user_prompt,
+            response_format={"type": "json_object"},
+            purpose='fit_batch',
+        )
+        fits = parse_batch_fits(content)
+        print(f"[FIT] batch jobs={len(items)} scored={len(fits)} tokens={prompt_tokens}+{completion_tokens} (~{(prompt_tokens + completion_tokens) // len(items)}/job)")
+    except Exception as e:
+        print(f"ERROR batched LLM call ({len(items)} jobs): {e}")
+        print(traceback.format_exc())
+
+    rows = []
+    for (combo, job), prompt in zip(items, prompts_by_item):
+        fit = fits.get(str(job.get('id') or ''))
+        if fit is None:
+            # missing or malformed in the batched answer: re-request this job alone
+            rows.append(score_job(job, combo, system_prompt, contract_input, prompt))
+            continue
+        row = job_to_row(job)
+        row['fit'] = fit
+        rows.append(row)
+    return rows
+
+
+class FitBatcher:
+    """
+    Groups scraped (combo, job) items into fit batches for the LLM workers.
+
+    add() is called concurrently by the grid scrapers; a batch is handed to
+    submit once it reaches max_jobs or its summaries would exceed
+    max_tokens. flush() submits the remainder when scraping is done.
+    """
+
+    def __init__(self, submit, max_jobs: int, max_tokens: int):
+        self.submit = submit
+        self.max_jobs = max(1, max_jobs)
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._items = []
+        self._tokens = 0
+
+    def add(self, item):
+        combo, job = item
+        tokens = prompt_description_tokens(job.get('job_description')) + estimate_tokens(job.get('job_title')) + 20
+        ready = []
+        with self._lock:
+            if self._items and self._tokens + tokens > self.max_tokens:
+                ready.append(self._take())
+            self._items.append(item)
+            self._tokens += tokens
+            if len(self._items) >= self.max_jobs:
+                ready.append(self._take())
+        # submit outside the lock: it blocks while the LLM queue is full
+        for batch in ready:
+            self.submit(batch)
+
+    def _take(self) -> list:
+        # Called with self._lock held
+        batch, self._items, self._tokens = self._items, [], 0
+        return batch
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self.submit(batch)
 
 
 def main():
+    # Fail fast on a bad WRITE_DURABILITY: inside a group commit the error would drop every group
+    check_durability(config.WRITE_DURABILITY)
     timestamp_str = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     processed_ids = load_processed_ids()
 
     cv_text = read_cv_text(CONFIG['cv_file'])
     system_prompt = build_system_prompt(cv_text)
+    batch_system_prompt = build_batch_system_prompt(cv_text)
+    # Local pre-filter: obvious mismatches are recorded with their local score and never reach the LLM
+    scorer = prefilter.build_scorer(cv_text, CONFIG['keywords'])
+    # Near-duplicate groups (this run + recent history): only one job per group is scored
+    dedup_index = dedup.build_index()
 
     keywords = [k.strip() for k in CONFIG['keywords'] if k.strip()]
     countries = [c.strip() for c in CONFIG['countries'] if c.strip()]
@@ -222,166 +387,211 @@ def main():
     time_posted_code = map_time_posted(CONFIG.get('time_posted', 'Any'))
 
     new_ids = set()
-    csv_path, csv_file, csv_writer = open_csv_writer(timestamp_str)
+    # Skips persisted IDs and IDs already fetched by an earlier combo, before any detail download
+    id_filter = JobIdFilter(processed_ids)
+    csv_path, csv_out = open_csv_writer(timestamp_str)
+    # Columnar copy partitioned by run date (None without pyarrow)
+    parquet_out = columnar.open_writer('search', timestamp_str)
     total_rows = 0
 
-    # High-level grid progress
-    total_combos = sum(1 for _ in [(kw, ct, wt) for ct in countries for wt in work_types for kw in keywords])
-    combo_idx = 0
-
-    for country in countries:
-        if country not in config.GEO_IDS:
-            continue
-        geo_id = config.GEO_IDS[country]
-        for work_type_name, work_type_val in config.WORK_TYPES.items():
-            # filter only selected work types
-            if work_type_name not in work_types:
-                continue
-            for kw in keywords:
-                combo_idx += 1
-                print(f"[GRID] {combo_idx}/{total_combos} → kw='{kw}', country='{country}', work_type='{work_type_name}', pages={CONFIG['pages']}")
-                encoded_kw = encode_keywords(kw)
-                # scrape
-                jobs = scrape_linkedin_jobs(
-                    keywords=encoded_kw,
-                    location=country,
-                    geoId=geo_id,
-                    work_type=work_type_val,
-                    jobs_per_page=10,
-                    max_pages=CONFIG['pages'],
-                    search_keyword_job_title=kw,
-                    contract_types=contract_codes if contract_codes else None,
-                    time_posted_code=time_posted_code,
-                )
-                time.sleep(random.uniform(0.5, 1.0))
-                print(f"[SCRAPE] Found {len(jobs or [])} jobs for kw='{kw}', country='{country}', work_type='{work_type_name}'")
-
-                # Process in batches; if a batch fails, skip only that batch
-                for batch in chunked(jobs or [], CONFIG.get('batch_size', 10)):
-                    total_batches = max(1, (len(jobs or []) + CONFIG.get('batch_size', 10) - 1) // CONFIG.get('batch_size', 10))
-                    print(f"[BATCH] Start batch ({len(batch)} items) for kw='{kw}', country='{country}', work_type='{work_type_name}' [{combo_idx}/{total_combos}] -> size={CONFIG.get('batch_size',10)} total_batches={total_batches}")
-                    try:
-                        batch_rows = []
-                        batch_new_ids = set()
-                        llm_futures = {}
-                        max_workers = max(1, min(CONFIG.get('batch_size', 10), CONFIG.get('max_workers', 8)))
-                        executor = ThreadPoolExecutor(max_workers=max_workers)
-                        for job in batch:
-                            jid = job.get('id')
-                            if not jid or jid in processed_ids or jid in new_ids:
-                                continue
-
-                            recruiter_link = job.get('recruiter_link')
-                            profile = None
-                            if recruiter_link:
-                                profile = fetch_public_profile(recruiter_link)
-                                time.sleep(random.uniform(0.3, 0.8))
-
-                            # Prepare row; LLM to be filled later (parallel)
-                            row = {
-                            'id': jid,
-                                'job title': job.get('job_title') or '',
-                                'description': job.get('job_description') or '',
-                                'company name': job.get('company') or '',
-                                'company linkedin url': job.get('company_link') or '',
-                                'job url': job.get('job_link') or '',
-                                'upload date': job.get('publishing_date') or job.get('posted_time_ago') or '',
-                                'hiring manager name': job.get('recruiter_name') or '',
-                                'hiring manager linkedin url': recruiter_link or '',
-                                'fit': '',
-                            }
-                            batch_rows.append(row)
-                            batch_new_ids.add(jid)
-
-                            # Always compute fit via LLM for every job (profile optional)
-                            user_prompt = build_user_prompt(job, profile or {}, country, work_type_name, contract_input)
-                            def _llm_call(sp=system_prompt, up=user_prompt):
-                                try:
-                                    content, _, _ = call_llm(
-                                        sp,
-                                        up,
-                                        response_format={"type": "json_object"},
-                                    )
-                                    return content
-                                except Exception as e:
-                                    print(f"ERROR LLM call: {e}")
-                                    print(traceback.format_exc())
-                                    return ""
-                            future = executor.submit(_llm_call)
-                            llm_futures[future] = row
-
-                        # Collect LLM results
-                        for fut in as_completed(llm_futures):
-                            row = llm_futures[fut]
-                            content = fut.result()
-                            if isinstance(content, dict):
-                                row['fit'] = str(content.get('fit', ''))
-                                # message intentionally left empty in search phase
-                            else:
-                                try:
-                                    import json as _json
-                                    parsed = _json.loads(content or '{}')
-                                    fit_raw = parsed.get('fit')
-                                    row['fit'] = str(fit_raw) if fit_raw is not None else ''
-                                    # message intentionally left empty in search phase
-                                except Exception:
-                                    f, m = parse_fit_and_message(content)
-                                    row['fit'] = f
-                        executor.shutdown(wait=True)
-                    except Exception as e:
-                        print(f"ERROR processing batch of size {len(batch)}: {e}")
-                        print(traceback.format_exc())
-                        # skip this batch and continue
-                        continue
-
-                    # If batch succeeded, persist rows now and persist IDs
-                    try:
-                        for r in batch_rows:
-                            csv_writer.writerow(r)
-                        csv_file.flush()
-                        os.fsync(csv_file.fileno())
-                        total_rows += len(batch_rows)
-                        new_ids.update(batch_new_ids)
-                        # Persist processed ids incrementally
-                        tmp_ids = set(processed_ids)
-                        tmp_ids.update(new_ids)
-                        append_run_processed_ids(timestamp_str, tmp_ids)
-                        print(f"[BATCH] Wrote {len(batch_rows)} rows | cumulative_rows={total_rows}")
-                    except Exception as e:
-                        print(f"ERROR writing batch to CSV: {e}")
-                        print(traceback.format_exc())
-
-    # close CSV first
-    csv_file.close()
-
-    # End-of-run resort: read, sort, and rewrite the CSV
-    try:
+    # Grid scheduler: combos run concurrently, interleaved across countries,
+    # sharing one request budget. Each parsed job is streamed straight into a
+    # bounded LLM worker pool, so scraping and fit scoring overlap; a full
+    # queue blocks the scrapers (backpressure) and keeps memory bounded.
+    combos = build_grid(countries, work_types, keywords)
+    total_combos = len(combos)
+    budget = RequestBudget(CONFIG.get('max_requests'))
+
+    def _scrape_combo(combo, add):
+        found = 0
+        for job in iter_linkedin_jobs(
+            keywords=encode_keywords(combo['keyword']),
+            location=combo['country'],
+            geoId=combo['geo_id'],
+            work_type=combo['work_type_val'],
+            jobs_per_page=10,
+            max_pages=CONFIG['pages'],
+            search_keyword_job_title=combo['keyword'],
+            contract_types=contract_codes if contract_codes else None,
+            time_posted_code=time_posted_code,
+            id_filter=id_filter,
+            budget=budget,
+        ):
+            add((combo, job))
+            found += 1
+        return found
+
+    def _feed(submit):
+        # Jobs are grouped into fit batches (one LLM request each) before reaching the workers
+        batcher = FitBatcher(submit, CONFIG.get('fit_batch_max_jobs', 1), CONFIG.get('fit_batch_tokens', 6000))
+
+        def _route(item):
+            combo, job = item
+            if dedup_index is not None:
+                group, rep = dedup_index.assign(job)
+                job['duplicate_group'] = group
+                if rep is not None:
+                    if not dedup_index.from_history(group):
+                        # representative is scored in this run; its fit is copied when its row arrives
+                        job['duplicate_of'] = rep
+                        submit([item])
+                        return
+                    stored = STORE.get(rep)
+                    if stored and stored.get('fit'):
+                        job['duplicate_of'] = rep
+                        job['carried_fit'] = stored['fit']
+                        submit([item])
+                        return
+                    # representative from history has no usable fit: score this job normally
+            if scorer is not None and not scorer.check(job):
+                job['prefiltered'] = True
+                submit([item])
+            else:
+                batcher.add(item)
+
+        with tracing.span('grid.run', combos=total_combos):
+            for combo, found, _elapsed in run_grid(combos, lambda c: _scrape_combo(c, _route), CONFIG.get('grid_workers', 1)):
+                count = found if isinstance(found, int) else len(found)
+                print(f"[SCRAPE] Found {count} jobs for {describe_combo(combo)} [{combo['idx']}/{total_combos}]")
+        batcher.flush()
+
+    def _score(batch):
+        if batch[0][1].get('prefiltered') or batch[0][1].get('duplicate_of'):
+            # below the local threshold (fit left empty) or a near-duplicate (fit carried over): no LLM call
+            return [job_to_row(job) for _, job in batch]
+        # LLM spans inside are tagged with the batch's job ids and combo
+        with tracing.span('score.fit_batch', context=True, job_id=','.join(str(job.get('id')) for _, job in batch),
+                          combo=describe_combo(batch[0][0])):
+            try:
+                return score_jobs_batch(batch, batch_system_prompt, system_prompt, contract_input)
+            except Exception as e:
+                if len(batch) == 1:
+                    raise
+                print(f"ERROR fit batch of {len(batch)} jobs, scoring them one by one: {e}")
+        # Failure isolates to a single job: a job that still fails gets no row
         rows = []
-        with open(csv_path, 'r', encoding='utf-8', newline='') as f_in:
-            reader = csv.DictReader(f_in)
-            for r in reader:
-                rows.append(r)
-
-        def _fit_to_int(v: str) -> int:
+        for combo, job in batch:
             try:
-                return int(''.join(ch for ch in str(v) if ch.isdigit()))
-            except Exception:
-                return -1
-        rows.sort(key=lambda r: ((r.get('company name') or '').lower(), -_fit_to_int(r.get('fit') or '')))
-
-        with open(csv_path, 'w', encoding='utf-8', newline='') as f_out:
-            writer = csv.DictWriter(f_out, fieldnames=config.OUTREACH_CSV_COLUMNS)
-            writer.writeheader()
-            for r in rows:
-                writer.writerow(r)
-        print(f"[WRITE] Final resorted file -> {csv_path}")
-    except Exception as e:
-        print(f"ERROR final resort write: {e}")
-        print(traceback.format_exc())
-    processed_ids.update(new_ids)
-    append_run_processed_ids(timestamp_str, processed_ids)
+                rows.append(score_jobs_batch([(combo, job)], batch_system_prompt, system_prompt, contract_input)[0])
+            except Exception as e:
+                print(f"ERROR processing job id={job.get('id')} ({describe_combo(combo)}): {e}")
+                rows.append(None)
+        return rows
+
+    def _commit(rows, ids):
+        # Runs on the writer thread: rows reach the CSV run and the job store before their IDs count as processed
+        # (the Parquet copy is best-effort: rows are buffered into row groups and written on close(), so
+        # after a crash it is rebuilt from the CSV with `python columnar.py --import-csv`)
+        nonlocal total_rows
+        ids = [jid for jid in ids if jid]  # None: written, but not marked processed (see _accept)
+        with tracing.span('write.csv', rows=len(rows)):
+            csv_out.write_run(rows)
+        with tracing.span('write.job_store', rows=len(rows)):
+            STORE.add_search_rows(timestamp_str, rows)
+        if parquet_out is not None:
+            with tracing.span('write.parquet', rows=len(rows)):
+                parquet_out.write_rows(rows)
+        total_rows += len(rows)
+        new_ids.update(ids)
+        # Persist processed ids incrementally (append-only, this group's ids)
+        with tracing.span('write.state', ids=len(ids)):
+            append_run_processed_ids(timestamp_str, ids)
+        print(f"[BATCH] Wrote {len(rows)} rows | cumulative_rows={total_rows}")
+
+    # Group commits happen off the main thread, so disk syncs never hold up scraping or scoring
+    writer = GroupCommitWriter(_commit, max_rows=config.WRITE_GROUP_MAX_ROWS, max_delay=config.WRITE_GROUP_MAX_DELAY,
+                               name='search-writer')
+    accepted = set()
+
+    max_workers = max(1, CONFIG.get('max_workers', 5))
+    print(f"[GRID] {total_combos} combos, parallelism={CONFIG.get('grid_workers', 1)}, pages={CONFIG['pages']}, max_requests={budget.limit}, llm_workers={max_workers}")
+    def _accept(jid, row, record=True):
+        # record=False (pre-filtered jobs): the row is written but the id is not marked processed, so the
+        # job is scored again by the next run, with that run's threshold, CV and keywords
+        if not jid or jid in processed_ids or jid in accepted:
+            return
+        accepted.add(jid)
+        writer.put(row, jid if record else None)
+
+    group_fits = {}  # duplicate group -> fit of its representative scored in this run
+    prefiltered_groups = set()  # duplicate groups whose representative was pre-filtered in this run
+    waiting_dups = {}  # duplicate group -> [(jid, row)] waiting for the representative's fit
+    done = failed = 0
+    for batch, rows, err in run_stream(_feed, _score, workers=max_workers, queue_size=CONFIG.get('queue_size', 20)):
+        done += len(batch)
+        if err is not None:
+            for combo, job in batch:
+                print(f"ERROR processing job id={job.get('id')} ({describe_combo(combo)}): {err}")
+            rows = [None] * len(batch)
+        failed += sum(1 for row in rows if row is None)
+        print(f"[PROGRESS] {done} jobs processed ok={done - failed} failed={failed}")
+        for (combo, job), row in zip(batch, rows):
+            if row is None:
+                continue
+            jid = job.get('id')
+            group = job.get('duplicate_group')
+            if job.get('duplicate_of') and not job.get('carried_fit'):
+                if group not in group_fits:
+                    waiting_dups.setdefault(group, []).append((jid, row))
+                    continue
+                row['fit'] = group_fits[group]
+            if group and job.get('prefiltered'):
+                prefiltered_groups.add(group)
+            _accept(jid, row, record=not job.get('prefiltered') and group not in prefiltered_groups)
+            if group and not job.get('duplicate_of'):
+                group_fits[group] = row['fit']
+                for dup_jid, dup_row in waiting_dups.pop(group, []):
+                    dup_row['fit'] = row['fit']
+                    _accept(dup_jid, dup_row, record=group not in prefiltered_groups)
+    # Duplicates whose representative failed keep an empty fit
+    for dups in waiting_dups.values():
+        for dup_jid, dup_row in dups:
+            _accept(dup_jid, dup_row)
+    writer.close()
+    if parquet_out is not None:
+        try:
+            parquet_path = parquet_out.close()  # flushes the last row group, so rows is final after it
+            print(f"[WRITE] Parquet copy ({parquet_out.rows} rows) -> {parquet_path}")
+        except Exception as e:
+            print(f"ERROR writing Parquet copy: {e}")
+            print(traceback.format_exc())
 
+    # Final CSV: k-way merge of the sorted batch runs, swapped in with an atomic rename
+    with tracing.span('write.merge', runs=csv_out.run_count):
+        try:
+            merged = csv_out.finish()
+            print(f"[WRITE] Final sorted file ({merged} rows) -> {csv_path}")
+        except Exception as e:
+            print(f"ERROR final merge write (runs kept in {csv_out.runs_dir}): {e}")
+            print(traceback.format_exc())
+    processed_ids.update(new_ids)
+    STATE.maybe_compact()
+    STORE.close()
+
+    print(f"[FILTER] Skipped {id_filter.skipped} detail fetches (processed={id_filter.skipped_processed}, seen_this_run={id_filter.skipped_seen})")
+    print(f"[GRID] Requests spent={budget.spent} denied={budget.denied}")
+    if scorer is not None:
+        scorer.log_stats()
+    if dedup_index is not None:
+        dedup_index.log_stats()
+        dedup_index.close()
+    compaction.log_stats()
+    writer.log_stats()
     print(f"Wrote {total_rows} rows to {csv_path}")
+    http_client.log_stats()
+    response_cache.log_stats()
+    llm_cache.log_stats()
+    llm_async.log_stats()
+    # Per-run LLM accounting (latency percentiles, tokens, estimated cost) next to the CSV
+    try:
+        report_path = os.path.splitext(csv_path)[0] + '_llm_report.json'
+        llm_metrics.write_report(report_path, {'script': 'search', 'run_ts': timestamp_str, 'csv': os.path.basename(csv_path), 'rows': total_rows})
+        llm_metrics.log_summary()
+        print(f"[LLM] Report -> {report_path}")
+    except Exception as e:
+        print(f"ERROR writing LLM report: {e}")
+        print(traceback.format_exc())
+    tracing.finish(csv_path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import glob
+import heapq
+import os
+import re
+import shutil
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+import config
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class _Descending:
+    """Wraps a text value so it sorts in reverse."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def sort_key(keys: Sequence[Tuple[str, str, str]]) -> Callable[[dict], tuple]:
+    """
+    Row key function for [(column, 'text' | 'number', 'asc' | 'desc'), ...].
+
+    Text compares case-insensitively; numbers use the first number in the
+    cell ('7/10' -> 7). Rows with no number sort last in either direction.
+    """
+    parts = []
+    for column, kind, order in keys:
+        if kind not in ('text', 'number') or order not in ('asc', 'desc'):
+            raise ValueError(f"Invalid sort key {(column, kind, order)!r}")
+        parts.append((column, kind == 'number', order == 'desc'))
+
+    def key(row: dict) -> tuple:
+        out = []
+        for column, numeric, desc in parts:
+            raw = row.get(column)
+            if numeric:
+                m = _NUMBER_RE.search(str(raw if raw is not None else ''))
+                if m is None:
+                    out.append((1, 0.0))
+                else:
+                    value = float(m.group(0))
+                    out.append((0, -value if desc else value))
+            else:
+                value = str(raw or '').casefold()
+                out.append(_Descending(value) if desc else value)
+        return tuple(out)
+
+    return key
+
+
+class SortedRunWriter:
+    """
+    Sorted CSV output built as an external merge sort.
+
+    Each batch is sorted and written as its own run file (fsync'd, so a
+    batch is durable before its IDs are marked processed) under
+    `<path>.runs/`. finish() k-way merges the runs with heapq into
+    `<path>.tmp` and renames it over `path`, so readers only ever see a
+    complete sorted file; memory is bounded by one batch plus one row per
+    open run. More than `fan_in` runs are merged in several passes. Runs
+    left behind by an interrupted process are picked up again (see the
+    CLI).
+    """
+
+    def __init__(self, path: str, fieldnames: List[str], keys: Sequence[Tuple[str, str, str]],
+                 fsync: bool = True, fan_in: int = 64):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.key = sort_key(keys)
+        self.fsync = fsync
+        self.fan_in = max(2, fan_in)
+        self.runs_dir = path + '.runs'
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._runs = sorted(glob.glob(os.path.join(self.runs_dir, 'run_*.csv')))
+        self._next = max((int(os.path.basename(p)[4:10]) for p in self._runs), default=-1) + 1
+        self.rows = 0
+
+    @property
+    def run_count(self) -> int:
+        return len(self._runs)
+
+    def _new_run_path(self) -> str:
+        path = os.path.join(self.runs_dir, f"run_{self._next:06d}.csv")
+        self._next += 1
+        return path
+
+    def _write(self, path: str, rows: Iterable[dict]) -> int:
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            # rows may carry extra keys for other outputs (e.g. Parquet-only columns)
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        return count
+
+    def write_run(self, rows: List[dict]) -> int:
+        """Sort rows and write them as one run; returns the number of rows written."""
+        if not rows:
+            return 0
+        run_path = self._new_run_path()
+        tmp_path = run_path + '.tmp'
+        count = self._write(tmp_path, sorted(rows, key=self.key))
+        os.replace(tmp_path, run_path)
+        self._runs.append(run_path)
+        self.rows += count
+        return count
+
+    def _merge(self, run_paths: List[str], out_path: str) -> int:
+        files = [open(p, 'r', encoding='utf-8', newline='') for p in run_paths]
+        try:
+            readers = [csv.DictReader(f) for f in files]
+            return self._write(out_path, heapq.merge(*readers, key=self.key))
+        finally:
+            for f in files:
+                f.close()
+
+    def finish(self) -> int:
+        """Merge all runs into path (atomic rename), remove the runs; returns the number of rows."""
+        runs = list(self._runs)
+        # Intermediate passes keep at most fan_in run files open at once; each pass merges
+        # consecutive groups and keeps them in run order, so rows with equal keys stay in write order
+        while len(runs) > self.fan_in:
+            merged_runs = []
+            for start in range(0, len(runs), self.fan_in):
+                group = runs[start:start + self.fan_in]
+                if len(group) == 1:
+                    merged_runs.append(group[0])
+                    continue
+                merged = self._new_run_path()
+                self._merge(group, merged + '.tmp')
+                os.replace(merged + '.tmp', merged)
+                for p in group:
+                    os.remove(p)
+                merged_runs.append(merged)
+            runs = merged_runs
+        tmp_path = self.path + '.tmp'
+        count = self._merge(runs, tmp_path)
+        os.replace(tmp_path, self.path)
+        shutil.rmtree(self.runs_dir, ignore_errors=True)
+        self._runs = []
+        return count
+
+
+def open_search_writer(csv_path: str) -> SortedRunWriter:
+    """Writer for a search CSV, sorted by config.SEARCH_SORT_KEYS."""
+    return SortedRunWriter(csv_path, config.SEARCH_CSV_COLUMNS, config.SEARCH_SORT_KEYS,
+                           fsync=config.WRITE_DURABILITY == 'fsync', fan_in=config.SORT_MERGE_FAN_IN)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finish the sorted merge of a search CSV left as runs by an interrupted run")
+    parser.add_argument("csv_path", help="Final CSV path (its runs are in <csv_path>.runs/)")
+    args = parser.parse_args()
+    if not os.path.isdir(args.csv_path + '.runs'):
+        parser.error(f"No runs directory for {args.csv_path}")
+    written = open_search_writer(args.csv_path).finish()
+    print(f"Merged {written} rows into {args.csv_path}")
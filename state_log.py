@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import traceback
+
+
+class ProcessedIdLog:
+    """
+    Append-only log of processed job IDs, one "<run_ts>\\t<job_id>" record per line.
+
+    Each batch appends only the IDs it has not recorded before (O(new IDs)
+    per write instead of rewriting the whole state), and startup builds the
+    membership set in one pass over the file. A torn last line from a crash
+    is ignored on read and dropped by the next compaction, which rewrites the
+    log to a temp file and swaps it in with an atomic rename. The legacy JSON
+    state (a list, or {run_ts: [cumulative ids]}) is migrated on first use.
+    """
+
+    def __init__(self, path: str, legacy_path: str = None, fsync: bool = True):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._ids = None
+        self._lines = 0
+        self._torn = False
+
+    def _iter_records(self):
+        """Yields (run_ts, job_id) for every complete record in the log."""
+        if not os.path.exists(self.path):
+            return
+        self._torn = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    # partial write from a crash; never acknowledged, so skip it
+                    self._torn = True
+                    break
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 2 or not parts[1]:
+                    continue
+                yield parts[0], parts[1]
+
+    def _migrate_legacy(self):
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"ERROR reading legacy processed ids {self.legacy_path}: {e}")
+            print(traceback.format_exc())
+            return
+        if isinstance(data, list):
+            runs = [('legacy', data)]
+        elif isinstance(data, dict):
+            # Legacy run keys hold cumulative sets: the first run listing an ID is the one that processed it
+            runs = [(run_ts, data[run_ts]) for run_ts in sorted(data.keys())]
+        else:
+            runs = []
+        seen = set()
+        records = []
+        for run_ts, ids in runs:
+            if not isinstance(ids, list):
+                continue
+            for jid in ids:
+                jid = str(jid)
+                if jid not in seen:
+                    seen.add(jid)
+                    records.append((run_ts, jid))
+        self._write_atomic(records)
+        os.replace(self.legacy_path, self.legacy_path + '.migrated')
+        print(f"[STATE] Migrated {len(records)} ids from {self.legacy_path} -> {self.path}")
+
+    def _write_atomic(self, records):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for run_ts, jid in records:
+                f.write(f"{run_ts}\t{jid}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _load_locked(self):
+        try:
+            self._migrate_legacy()
+            ids = set()
+            lines = 0
+            for _, jid in self._iter_records():
+                ids.add(jid)
+                lines += 1
+            self._ids = ids
+            self._lines = lines
+        except Exception as e:
+            print(f"ERROR load_processed_ids: {e}")
+            print(traceback.format_exc())
+            self._ids = set()
+
+    def load(self) -> set:
+        """Returns the set of all processed IDs (single pass over the log)."""
+        with self._lock:
+            self._load_locked()
+            return set(self._ids)
+
+    def load_run_index(self) -> dict:
+        """Returns {job_id: run_ts} mapping every ID to the run that first processed it."""
+        with self._lock:
+            self._migrate_legacy()
+            index = {}
+            for run_ts, jid in self._iter_records():
+                index.setdefault(jid, run_ts)
+            return index
+
+    def append(self, run_ts: str, ids) -> int:
+        """Durably appends the IDs not yet recorded; returns how many were written."""
+        with self._lock:
+            if self._ids is None:
+                self._load_locked()
+            new = [str(jid) for jid in ids if str(jid) not in self._ids]
+            if not new:
+                return 0
+            if self._torn:
+                # never append after a torn line: it would merge with the next record
+                self._compact_locked()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{run_ts}\t{jid}\n" for jid in new))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._ids.update(new)
+            self._lines += len(new)
+            return len(new)
+
+    def _compact_locked(self):
+        first_run = {}
+        for run_ts, jid in self._iter_records():
+            first_run.setdefault(jid, run_ts)
+        self._write_atomic((run_ts, jid) for jid, run_ts in first_run.items())
+        self._lines = len(first_run)
+        self._torn = False
+
+    def compact(self):
+        """Rewrites the log with one record per ID (dropping duplicates and torn lines) via atomic rename."""
+        with self._lock:
+            self._compact_locked()
+
+    def maybe_compact(self, slack: float = 0.2):
+        """Compacts when duplicate/garbage records exceed `slack` of the live IDs (or a torn line was seen)."""
+        with self._lock:
+            if self._ids is None:
+                return
+            waste = self._lines - len(self._ids)
+            if self._torn or waste > max(100, len(self._ids) * slack):
+                self._compact_locked()
@@ -0,0 +1,60 @@
+import json
+
+import search
+from search import parse_batch_fits, score_jobs_batch
+
+COMBO = {'country': 'Italy', 'work_type_name': 'Remote'}
+
+
+def test_parse_batch_fits_keeps_only_valid_entries():
+    content = json.dumps({'results': [
+        {'id': '1', 'fit': 7},
+        {'id': 2, 'fit': '9'},
+        {'id': '3', 'fit': 'high'},
+        {'id': '4', 'fit': 11},
+        {'fit': 5},
+        'junk',
+        {'id': '1', 'fit': 2},  # duplicate id: the first answer wins
+    ]})
+    assert parse_batch_fits(content) == {'1': '7', '2': '9'}
+
+
+def test_parse_batch_fits_malformed_answers():
+    assert parse_batch_fits('not json') == {}
+    assert parse_batch_fits(None) == {}
+    assert parse_batch_fits({'results': 'nope'}) == {}
+    assert parse_batch_fits('[{"id": "1", "fit": 4}]') == {'1': '4'}  # bare list answer
+
+
+def _jobs(*ids):
+    return [(COMBO, {'id': jid, 'job_title': f"Job {jid}", 'job_description': "SQL reporting."}) for jid in ids]
+
+
+def test_missing_and_malformed_ids_fall_back_to_single_calls(monkeypatch):
+    calls = []
+
+    def fake_call_llm(system_prompt, user_prompt, response_format=None, purpose=None):
+        calls.append(purpose)
+        if purpose == 'fit_batch':
+            return {'results': [{'id': 'a', 'fit': 8}, {'id': 'b', 'fit': 'n/a'}]}, 100, 10
+        return {'fit': 3}, 10, 1
+
+    monkeypatch.setattr(search, 'call_llm', fake_call_llm)
+    rows = score_jobs_batch(_jobs('a', 'b', 'c'), 'batch system', 'system', [])
+    assert [(r['id'], r['fit']) for r in rows] == [('a', '8'), ('b', '3'), ('c', '3')]
+    assert calls == ['fit_batch', 'fit', 'fit']
+
+
+def test_failed_batch_call_scores_every_job_alone(monkeypatch):
+    calls = []
+
+    def fake_call_llm(system_prompt, user_prompt, response_format=None, purpose=None):
+        calls.append(purpose)
+        if purpose == 'fit_batch':
+            raise RuntimeError('rate limited')
+        return {'fit': 6}, 10, 1
+
+    monkeypatch.setattr(search, 'call_llm', fake_call_llm)
+    rows = score_jobs_batch(_jobs('a', 'b'), 'batch system', 'system', [])
+    assert [(r['id'], r['fit']) for r in rows] == [('a', '6'), ('b', '6')]
+    assert calls == ['fit_batch', 'fit', 'fit']
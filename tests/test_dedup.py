@@ -0,0 +1,57 @@
+from dedup import DuplicateIndex
+
+DESCRIPTION = (
+    "We are looking for an analyst to join our reporting team in Milan. You will build SQL models, "
+    "maintain Tableau dashboards, work with finance stakeholders and automate monthly reporting in Python. "
+    "Requirements: three years of experience, fluent Italian and English, strong attention to detail."
+)
+
+
+def _job(job_id, title, description=DESCRIPTION, company="Acme"):
+    return {'id': job_id, 'job_title': title, 'company': company, 'job_description': description}
+
+
+def _index(tmp_path, **kwargs):
+    return DuplicateIndex(str(tmp_path / 'dedup.sqlite'), **kwargs)
+
+
+def test_reposted_job_joins_the_first_jobs_group(tmp_path):
+    index = _index(tmp_path)
+    assert index.assign(_job('1', "Data Analyst")) == ('1', None)
+    assert index.assign(_job('2', "Data Analyst", DESCRIPTION + " Apply today.")) == ('1', '1')
+    assert index.duplicates == 1
+    index.close()
+
+
+def test_same_template_with_different_title_is_not_collapsed(tmp_path):
+    index = _index(tmp_path)
+    index.assign(_job('1', "Data Analyst"))
+    assert index.assign(_job('2', "Senior Backend Engineer")) == ('2', None)
+    index.close()
+
+
+def test_dissimilar_descriptions_stay_apart(tmp_path):
+    index = _index(tmp_path)
+    index.assign(_job('1', "Data Analyst"))
+    other = "Field sales role covering Lombardy retail accounts with a company car and monthly targets."
+    assert index.assign(_job('2', "Data Analyst", other)) == ('2', None)
+    index.close()
+
+
+def test_threshold_above_similarity_keeps_jobs_apart(tmp_path):
+    index = _index(tmp_path, threshold=1.01)
+    index.assign(_job('1', "Data Analyst"))
+    assert index.assign(_job('2', "Data Analyst")) == ('2', None)
+    index.close()
+
+
+def test_groups_persist_across_runs(tmp_path):
+    first = _index(tmp_path)
+    first.assign(_job('1', "Data Analyst"))
+    first.close()
+    second = _index(tmp_path)
+    assert second.load_history() == 1
+    group_id, representative = second.assign(_job('2', "Data Analyst"))
+    assert (group_id, representative) == ('1', '1')
+    assert second.from_history(group_id)
+    second.close()
@@ -0,0 +1,59 @@
+import csv
+import sqlite3
+
+from job_store import JobStore, import_csvs
+
+SEARCH_ROW = {'id': '1', 'job title': 'Data Analyst', 'company name': 'Acme', 'job url': 'https://x/1', 'fit': '7'}
+
+
+def _store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite'))
+
+
+def test_outreach_first_job_takes_the_later_search_run(tmp_path):
+    store = _store(tmp_path)
+    store.add_outreach_rows('20250102_090000', [dict(SEARCH_ROW, fit='9', message='hi')])
+    assert store.get('1')['run_ts'] is None
+    store.add_search_rows('20250103_080000', [SEARCH_ROW])
+    store.add_search_rows('20250104_080000', [dict(SEARCH_ROW, fit='')])
+    job = store.get('1')
+    assert job['run_ts'] == '20250103_080000'
+    assert job['fit'] == '7'  # the outreach fit never overwrites the search fit
+    store.close()
+
+
+def test_outreach_run_ts_from_older_stores_is_cleared(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    store = JobStore(path)
+    store.add_outreach_rows('20250102_090000', [SEARCH_ROW])
+    store.close()
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE jobs SET run_ts = '20250102_090000'")  # as written before the fix
+    store = JobStore(path)
+    assert store.get('1')['run_ts'] is None
+    store.close()
+
+
+def test_import_csvs_rebuilds_the_store_in_run_order(tmp_path):
+    runs = {
+        'search_20250101_080000.csv': [SEARCH_ROW],
+        'outreach_20250101_090000.csv': [dict(SEARCH_ROW, fit='8', message='hello', **{'tailored cv': 'cv'})],
+        'search_20250102_080000.csv': [dict(SEARCH_ROW, fit='6'), dict(SEARCH_ROW, id='2', fit='')],
+        'notes.csv': [SEARCH_ROW],
+    }
+    for name, rows in runs.items():
+        with open(tmp_path / name, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=sorted({k for r in rows for k in r}))
+            writer.writeheader()
+            writer.writerows(rows)
+    store = _store(tmp_path)
+    assert import_csvs(store, str(tmp_path / '*.csv')) == 4
+    first = store.get('1')
+    assert (first['run_ts'], first['fit']) == ('20250101_080000', '6')
+    assert store.get('2')['run_ts'] == '20250102_080000'
+    out = tmp_path / 'export.csv'
+    assert store.export_csv(str(out), outreach=True) == 1
+    with open(out, encoding='utf-8') as f:
+        row = next(csv.DictReader(f))
+    assert (row['message'], row['tailored cv'], row['fit']) == ('hello', 'cv', '8')
+    store.close()
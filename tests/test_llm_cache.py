@@ -0,0 +1,65 @@
+import sqlite3
+
+import llm_cache
+from llm_cache import LLMCache, is_cacheable
+
+
+def _cache(tmp_path, max_bytes=10 ** 6):
+    return LLMCache(str(tmp_path / 'llm.sqlite'), max_bytes=max_bytes)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.get('k') is None
+    cache.put('k', 'model', '{"fit": 7}', 10, 2)
+    assert cache.get('k') == '{"fit": 7}'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_running_total_survives_reopen_and_replacement(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put('a', 'm', 'x' * 100)
+    cache.put('a', 'm', 'x' * 40)
+    cache.put('b', 'm', 'y' * 10)
+    assert cache._total == 50
+    reopened = _cache(tmp_path)
+    assert reopened.get('a') == 'x' * 40
+    assert reopened._total == 50
+
+
+def test_eviction_follows_batched_access_times(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+    cache = _cache(tmp_path, max_bytes=250)
+    for key in ('a', 'b'):
+        now[0] += 1
+        cache.put(key, 'm', key * 100)
+    now[0] += 1
+    assert cache.get('a')  # access time only recorded in memory
+    with sqlite3.connect(cache.path) as db:
+        assert db.execute("SELECT accessed_at FROM completions WHERE key = 'a'").fetchone()[0] == 1001.0
+    now[0] += 1
+    cache.put('c', 'm', 'c' * 100)  # over the cap: 'b' is the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') and cache.get('c')
+    assert (cache.evictions, cache._total) == (1, 200)
+
+
+def test_flush_writes_pending_access_times(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: 5.0)
+    cache = _cache(tmp_path)
+    cache.put('a', 'm', 'text')
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: 9.0)
+    cache.get('a')
+    cache.flush()
+    with sqlite3.connect(cache.path) as db:
+        assert db.execute("SELECT accessed_at FROM completions WHERE key = 'a'").fetchone()[0] == 9.0
+
+
+def test_only_parsable_completions_are_cacheable():
+    json_format = {"type": "json_object"}
+    assert is_cacheable('{"fit": 7}', json_format)
+    assert not is_cacheable('{"fit": 7', json_format)
+    assert not is_cacheable('Fit: 7/10', json_format)
+    assert not is_cacheable('', None)
+    assert is_cacheable('Dear hiring manager, ...', None)
@@ -0,0 +1,115 @@
+import io
+import threading
+import time
+
+import pytest
+
+from pipeline import GroupCommitWriter, check_durability, run_stream, sync_file
+from state_log import ProcessedIdLog
+
+
+class _Recorder:
+    """commit() that records each group and signals when one arrives."""
+
+    def __init__(self):
+        self.groups = []
+        self.committed = threading.Event()
+
+    def __call__(self, rows, ids):
+        self.groups.append((list(rows), list(ids)))
+        self.committed.set()
+
+
+def test_commits_when_max_rows_reached():
+    commit = _Recorder()
+    writer = GroupCommitWriter(commit, max_rows=3, max_delay=60)
+    for i in range(3):
+        writer.put({'n': i}, str(i))
+    # The group is full: committed without waiting for max_delay, flush() or close()
+    assert commit.committed.wait(5)
+    assert commit.groups == [([{'n': 0}, {'n': 1}, {'n': 2}], ['0', '1', '2'])]
+    writer.close()
+    assert writer.commits == 1 and writer.rows == 3
+
+
+def test_commits_when_max_delay_reached():
+    commit = _Recorder()
+    writer = GroupCommitWriter(commit, max_rows=100, max_delay=0.05)
+    start = time.monotonic()
+    writer.put({'n': 1}, '1')
+    assert commit.committed.wait(5)
+    assert time.monotonic() - start >= 0.05
+    assert commit.groups == [([{'n': 1}], ['1'])]
+    writer.close()
+    assert writer.commits == 1
+
+
+def test_close_drains_the_queue():
+    commit = _Recorder()
+    writer = GroupCommitWriter(commit, max_rows=100, max_delay=60)
+    for i in range(5):
+        writer.put({'n': i}, str(i))
+    writer.close()
+    assert commit.groups == [([{'n': i} for i in range(5)], [str(i) for i in range(5)])]
+    assert not writer._thread.is_alive()
+    writer.close()  # idempotent
+
+
+def test_flush_waits_for_the_commit():
+    commit = _Recorder()
+    writer = GroupCommitWriter(commit, max_rows=100, max_delay=60)
+    writer.put({'n': 1}, '1')
+    writer.flush()
+    assert commit.groups == [([{'n': 1}], ['1'])]
+    writer.close()
+
+
+def test_failed_commit_does_not_record_its_ids(tmp_path):
+    log = ProcessedIdLog(str(tmp_path / 'ids.log'), fsync=False)
+    written = []
+
+    def commit(rows, ids):
+        # Same order as search/outreach: rows first, then their ids
+        if any(r.get('bad') for r in rows):
+            raise OSError('disk full')
+        written.extend(rows)
+        log.append('20250101_080000', ids)
+
+    writer = GroupCommitWriter(commit, max_rows=2, max_delay=60)
+    writer.put({'n': 1}, '1')
+    writer.put({'n': 2}, '2')
+    writer.put({'n': 3, 'bad': True}, '3')
+    writer.put({'n': 4}, '4')
+    writer.put({'n': 5}, '5')
+    writer.close()
+
+    assert [r['n'] for r in written] == [1, 2, 5]
+    assert log.load() == {'1', '2', '5'}
+    assert writer.failed == 2 and writer.rows == 3 and writer.commits == 2
+
+
+def test_run_stream_yields_every_item_and_isolates_errors():
+    def feed(submit):
+        for i in range(20):
+            submit(i)
+
+    def work(i):
+        if i == 7:
+            raise ValueError('bad item')
+        return i * i
+
+    results = {item: (result, error) for item, result, error in run_stream(feed, work, workers=3, queue_size=2)}
+    assert sorted(results) == list(range(20))
+    assert isinstance(results[7][1], ValueError) and results[7][0] is None
+    assert all(results[i] == (i * i, None) for i in range(20) if i != 7)
+
+
+def test_durability_levels():
+    assert check_durability('fsync') == 'fsync'
+    with pytest.raises(ValueError):
+        check_durability('FSYNC')
+    with pytest.raises(ValueError):
+        sync_file(io.StringIO(), 'sync')
+    f = io.StringIO()
+    sync_file(f, 'none')
+    sync_file(f, 'flush')
@@ -0,0 +1,59 @@
+from prefilter import LocalScorer
+
+CV = "Data analyst with SQL, Python, Tableau dashboards and stakeholder reporting."
+
+
+def _scorer(**kwargs):
+    corpus = ["Warehouse picker, forklift licence required.", "Nurse for night shifts in a hospital ward.",
+              "Data analyst building SQL reports.", "Sales representative, field visits, car provided."]
+    return LocalScorer(CV, corpus=corpus, **kwargs)
+
+
+def test_related_job_scores_above_unrelated():
+    scorer = _scorer()
+    related = scorer.score("Data Analyst", "SQL and Python reporting, Tableau dashboards for stakeholders.")
+    unrelated = scorer.score("Forklift Driver", "Warehouse shifts, forklift licence required.")
+    assert related > unrelated
+    assert unrelated == 0.0
+
+
+def test_threshold_decides_llm_call_and_sets_local_score():
+    scorer = _scorer(threshold=0.1)
+    keep = {'job_title': "Data Analyst", 'job_description': "SQL, Python and Tableau reporting."}
+    skip = {'job_title': "Night Nurse", 'job_description': "Hospital ward night shifts."}
+    assert scorer.check(keep) is True
+    assert scorer.check(skip) is False
+    assert keep['local_score'] >= 0.1 > skip['local_score']
+    assert (scorer.scored, scorer.skipped) == (2, 1)
+
+
+def test_score_equal_to_threshold_is_kept():
+    scorer = _scorer()
+    job = {'job_title': "Data Analyst", 'job_description': "SQL reporting."}
+    scorer.threshold = scorer.score(job['job_title'], job['job_description'])
+    assert scorer.check(job) is True
+
+
+def test_reject_and_keep_title_keywords():
+    scorer = _scorer(reject_titles=["intern"], keep_titles=["analyst"], keep_bonus=0.5)
+    assert scorer.score("Marketing Intern", "SQL, Python, Tableau.") == 0.0
+    plain = _scorer().score("Data Analyst", "SQL, Python, Tableau.")
+    assert abs(scorer.score("Data Analyst", "SQL, Python, Tableau.") - (plain + 0.5)) < 1e-9
+
+
+def test_keep_keyword_overrides_reject_keyword():
+    scorer = _scorer(reject_titles=["sales", "ios"], keep_titles=["data", "ai"])
+    for title in ("Sales Engineer (Data Platform)", "AI Engineer - iOS"):
+        assert scorer.score(title, "SQL, Python, Tableau.") > 0
+    assert scorer.score("Sales Manager", "SQL, Python, Tableau.") == 0.0
+
+
+def test_searched_titles_are_never_rejected(monkeypatch):
+    import prefilter
+    monkeypatch.setattr(prefilter.config, 'PREFILTER_ENABLED', True)
+    monkeypatch.setattr(prefilter.config, 'PREFILTER_REJECT_TITLES', ['sales'])
+    monkeypatch.setattr(prefilter.config, 'PREFILTER_KEEP_TITLES', [])
+    monkeypatch.setattr(prefilter, 'recent_descriptions', lambda limit: [])
+    scorer = prefilter.build_scorer(CV, ['Solution Architect', ' '])
+    assert scorer.score("Pre-Sales Solution Architect", "SQL, Python, Tableau dashboards.") > 0
+    assert scorer.score("Pre-Sales Manager", "SQL, Python, Tableau dashboards.") == 0.0
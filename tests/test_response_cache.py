@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+import types
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+TTLS = {'detail': 100, 'list': 0}
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+        self.encoding = 'utf-8'
+
+
+class FakeNetwork:
+    """Stands in for http_client.get: serves pages by URL and counts requests."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, endpoint=None):
+        self.calls.append(url)
+        page = self.pages[url]
+        return page if isinstance(page, FakeResponse) else FakeResponse(page)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _cache(tmp_path, monkeypatch, pages, max_bytes=10 ** 6):
+    net = FakeNetwork(pages)
+    monkeypatch.setattr(response_cache.http_client, 'get', net.get)
+    return ResponseCache(str(tmp_path / 'http'), max_bytes=max_bytes, ttls=TTLS), net
+
+
+def test_hit_is_served_from_disk_until_the_ttl_expires(tmp_path, monkeypatch, clock):
+    cache, net = _cache(tmp_path, monkeypatch, {'u': b'<html>job</html>'})
+    assert cache.fetch('u', 'detail').content == b'<html>job</html>'
+    clock[0] += 99
+    hit = cache.fetch('u', 'detail')
+    assert hit.from_cache and hit.text == '<html>job</html>'
+    assert net.calls == ['u']
+    clock[0] += 2  # 101s after the fetch: expired
+    assert not getattr(cache.fetch('u', 'detail'), 'from_cache', False)
+    assert net.calls == ['u', 'u']
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_endpoint_without_ttl_and_non_200_are_not_cached(tmp_path, monkeypatch, clock):
+    cache, net = _cache(tmp_path, monkeypatch, {'l': b'list', 'e': FakeResponse(b'busy', 429)})
+    cache.fetch('l', 'list')
+    cache.fetch('l', 'list')
+    cache.fetch('e', 'detail')
+    cache.fetch('e', 'detail')
+    assert net.calls == ['l', 'l', 'e', 'e']
+
+
+def test_before_fetch_runs_only_on_network_fetches(tmp_path, monkeypatch, clock):
+    cache, _ = _cache(tmp_path, monkeypatch, {'u': b'page'})
+    tokens = []
+    for _ in range(3):
+        cache.fetch('u', 'detail', before_fetch=lambda: tokens.append(1))
+    assert tokens == [1]
+
+
+def test_rejected_page_is_returned_but_not_stored(tmp_path, monkeypatch, clock):
+    cache, net = _cache(tmp_path, monkeypatch, {'u': b'<title>Sign Up | LinkedIn</title>'})
+    check = lambda response: b'Sign Up' not in response.content
+    assert cache.fetch('u', 'detail', cacheable=check).content.startswith(b'<title>')
+    cache.fetch('u', 'detail', cacheable=check)
+    assert net.calls == ['u', 'u']
+    assert cache.rejected == 2
+
+
+def test_lru_eviction_keeps_blobs_still_shared_by_other_urls(tmp_path, monkeypatch, clock):
+    # Incompressible 1000-byte bodies: each blob is ~1KB on disk, the cap fits two of them
+    shared, second, third = os.urandom(1000), os.urandom(1000), os.urandom(1000)
+    cache, _ = _cache(tmp_path, monkeypatch, {'a': shared, 'b': shared, 'c': second, 'd': third}, max_bytes=2500)
+    for url in ('a', 'b', 'c'):
+        clock[0] += 1
+        cache.fetch(url, 'detail')
+    clock[0] += 1
+    cache.fetch('a', 'detail')  # 'a' is now the most recently used
+    clock[0] += 1
+    cache.fetch('d', 'detail')  # third blob: over the cap, evict least recently used URLs
+    cached = {url for url in 'abcd' if cache._lookup(url, 'detail') is not None}
+    assert cached == {'a', 'd'}
+    # 'b' was evicted but its blob is still 'a''s body
+    assert cache._lookup('a', 'detail').content == shared
+    assert cache.evictions == 2
+
+
+def test_concurrent_misses_for_one_url_make_one_request(tmp_path, monkeypatch, clock):
+    cache, net = _cache(tmp_path, monkeypatch, {})
+    release = threading.Event()
+    entered = threading.Event()
+
+    def slow_get(url, endpoint=None):
+        net.calls.append(url)
+        entered.set()
+        release.wait(5)
+        return FakeResponse(b'page')
+
+    monkeypatch.setattr(response_cache.http_client, 'get', slow_get)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch('u', 'detail').content)) for _ in range(5)]
+    threads[0].start()
+    entered.wait(5)
+    for t in threads[1:]:
+        t.start()
+    while cache.coalesced < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert net.calls == ['u']
+    assert results == [b'page'] * 5
+    assert (cache.misses, cache.coalesced) == (1, 4)
+
+
+def test_failed_fetch_is_raised_and_clears_the_in_flight_entry(tmp_path, monkeypatch, clock):
+    cache, _ = _cache(tmp_path, monkeypatch, {})
+
+    def failing_get(url, endpoint=None):
+        raise ConnectionError('reset')
+
+    monkeypatch.setattr(response_cache.http_client, 'get', failing_get)
+    with pytest.raises(ConnectionError):
+        cache.fetch('u', 'detail')
+    assert 'u' not in cache._inflight
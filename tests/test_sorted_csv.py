@@ -0,0 +1,69 @@
+import csv
+import os
+import random
+
+import pytest
+
+from sorted_csv import SortedRunWriter, sort_key
+
+FIELDS = ['id', 'fit', 'company name']
+KEYS = [('fit', 'number', 'desc'), ('company name', 'text', 'asc')]
+
+
+def _read(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _writer(tmp_path, fan_in=64):
+    return SortedRunWriter(str(tmp_path / 'out.csv'), FIELDS, KEYS, fsync=False, fan_in=fan_in)
+
+
+def test_sort_key_numbers_text_and_missing_values():
+    key = sort_key(KEYS)
+    rows = [{'fit': '', 'company name': 'a'}, {'fit': '7/10', 'company name': 'b'},
+            {'fit': '9', 'company name': 'Zeta'}, {'fit': '9', 'company name': 'alpha'}]
+    assert [r['company name'] for r in sorted(rows, key=key)] == ['alpha', 'Zeta', 'b', 'a']
+    with pytest.raises(ValueError):
+        sort_key([('fit', 'date', 'asc')])
+
+
+@pytest.mark.parametrize('fan_in', [64, 2])
+def test_merge_matches_a_full_sort_and_is_stable(tmp_path, fan_in):
+    rng = random.Random(7)
+    rows = [{'id': str(i), 'fit': str(rng.randint(0, 5)), 'company name': rng.choice('abc')} for i in range(500)]
+    writer = _writer(tmp_path, fan_in)
+    for start in range(0, len(rows), 37):
+        writer.write_run(rows[start:start + 37])
+    assert writer.run_count == 14
+    assert writer.finish() == len(rows)
+    # Python's sort is stable: equal keys keep their write order, across runs too
+    assert [r['id'] for r in _read(tmp_path / 'out.csv')] == [r['id'] for r in sorted(rows, key=sort_key(KEYS))]
+    assert not os.path.exists(tmp_path / 'out.csv.runs')
+    assert not os.path.exists(tmp_path / 'out.csv.tmp')
+
+
+def test_extra_columns_are_ignored(tmp_path):
+    writer = _writer(tmp_path)
+    writer.write_run([{'id': '1', 'fit': '3', 'company name': 'a', 'country': 'Italy'}])
+    writer.finish()
+    assert _read(tmp_path / 'out.csv') == [{'id': '1', 'fit': '3', 'company name': 'a'}]
+
+
+def test_runs_left_by_an_interrupted_process_are_resumed(tmp_path):
+    first = _writer(tmp_path)
+    first.write_run([{'id': '1', 'fit': '2', 'company name': 'a'}])
+    first.write_run([{'id': '2', 'fit': '8', 'company name': 'a'}])
+    # crash before finish(): a new writer picks the runs up and keeps numbering after them
+    second = _writer(tmp_path)
+    assert second.run_count == 2
+    second.write_run([{'id': '3', 'fit': '5', 'company name': 'a'}])
+    assert second.run_count == 3
+    assert second.finish() == 3
+    assert [r['id'] for r in _read(tmp_path / 'out.csv')] == ['2', '3', '1']
+
+
+def test_no_runs_writes_a_header_only_file(tmp_path):
+    assert _writer(tmp_path).finish() == 0
+    with open(tmp_path / 'out.csv', encoding='utf-8') as f:
+        assert f.read().strip() == ','.join(FIELDS)
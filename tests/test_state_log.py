@@ -0,0 +1,85 @@
+import json
+import os
+
+from state_log import ProcessedIdLog
+
+
+def _log(tmp_path, legacy=None):
+    legacy_path = None
+    if legacy is not None:
+        legacy_path = str(tmp_path / 'ids.json')
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+    return ProcessedIdLog(str(tmp_path / 'ids.log'), legacy_path=legacy_path, fsync=False)
+
+
+def test_migrates_legacy_run_dict_to_first_run(tmp_path):
+    # Legacy run keys hold cumulative id lists
+    log = _log(tmp_path, {'20250102_080000': ['1', '2', '3'], '20250101_080000': ['1', 2]})
+    assert log.load() == {'1', '2', '3'}
+    assert log.load_run_index() == {'1': '20250101_080000', '2': '20250101_080000', '3': '20250102_080000'}
+    assert not os.path.exists(tmp_path / 'ids.json')
+    assert os.path.exists(tmp_path / 'ids.json.migrated')
+
+
+def test_migrates_legacy_list(tmp_path):
+    log = _log(tmp_path, ['5', '5', 6])
+    assert log.load() == {'5', '6'}
+    with open(log.path, encoding='utf-8') as f:
+        assert f.read() == 'legacy\t5\nlegacy\t6\n'
+
+
+def test_existing_log_wins_over_legacy(tmp_path):
+    with open(tmp_path / 'ids.log', 'w', encoding='utf-8') as f:
+        f.write('run1\t9\n')
+    log = _log(tmp_path, ['1'])
+    assert log.load() == {'9'}
+    assert os.path.exists(tmp_path / 'ids.json')
+
+
+def test_append_writes_only_new_ids(tmp_path):
+    log = _log(tmp_path)
+    assert log.append('run1', ['1', '2']) == 2
+    assert log.append('run2', ['2', '3']) == 1
+    assert ProcessedIdLog(log.path).load_run_index() == {'1': 'run1', '2': 'run1', '3': 'run2'}
+
+
+def test_torn_last_line_is_ignored_and_dropped_before_append(tmp_path):
+    with open(tmp_path / 'ids.log', 'w', encoding='utf-8') as f:
+        f.write('run1\t1\nrun1\t2\nrun1\t3')  # crash mid-record
+    log = _log(tmp_path)
+    assert log.load() == {'1', '2'}
+    assert log.append('run2', ['4']) == 1
+    with open(log.path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert sorted(lines) == ['run1\t1', 'run1\t2', 'run2\t4']
+    assert ProcessedIdLog(log.path).load() == {'1', '2', '4'}
+
+
+def test_compact_keeps_first_run_and_leaves_no_temp_file(tmp_path):
+    with open(tmp_path / 'ids.log', 'w', encoding='utf-8') as f:
+        f.write('run1\t1\nrun2\t1\nbad line\nrun2\t2\n')
+    log = _log(tmp_path)
+    log.compact()
+    assert not os.path.exists(log.path + '.tmp')
+    assert ProcessedIdLog(log.path).load_run_index() == {'1': 'run1', '2': 'run2'}
+    with open(log.path, encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 2
+
+
+def test_failed_compaction_keeps_the_old_log(tmp_path, monkeypatch):
+    with open(tmp_path / 'ids.log', 'w', encoding='utf-8') as f:
+        f.write('run1\t1\nrun2\t1\n')
+    log = _log(tmp_path)
+
+    def fail(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    try:
+        log.compact()
+    except OSError:
+        pass
+    monkeypatch.undo()
+    with open(log.path, encoding='utf-8') as f:
+        assert f.read() == 'run1\t1\nrun2\t1\n'
@@ -0,0 +1,182 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import config
+from llm_metrics import percentile
+
+
+class _NoopSpan:
+    """Shared span used when tracing is off: entering and leaving it does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def tag(self, **tags):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'tags', 'start', 'context')
+
+    def __init__(self, tracer, name: str, tags: dict, context: bool):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+        self.context = context
+
+    def __enter__(self):
+        local = self.tracer._local
+        stack = getattr(local, 'tags', None)
+        if stack is None:
+            stack = local.tags = [{}]
+        if stack[-1]:
+            self.tags = dict(stack[-1], **self.tags)
+        if self.context:
+            stack.append(self.tags)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        if self.context:
+            self.tracer._local.tags.pop()
+        self.tracer._record(self.name, self.start, end, self.tags)
+        return False
+
+    def tag(self, **tags):
+        """Add tags once they are known (e.g. a row count after the work is done)."""
+        self.tags.update(tags)
+
+
+class Tracer:
+    """
+    Per-stage spans for a run (scraper, parsing, LLM, writers, grid).
+
+    span() times a block and records it with tags (job_id, combo, ...);
+    context=True also passes its tags to the spans nested in it on the
+    same thread. Spans are exported as Chrome trace JSON (open in
+    chrome://tracing or ui.perfetto.dev) and summarised per stage. When
+    disabled, span() returns a shared no-op object and traced functions
+    are called directly.
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = 200000):
+        self.enabled = enabled
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._events = []
+        self._durations = {}  # span name -> [seconds]
+        self._threads = {}  # thread id -> thread name
+        self.dropped = 0
+
+    def span(self, name: str, context: bool = False, **tags):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, tags, context)
+
+    def _record(self, name: str, start: float, end: float, tags: dict):
+        thread = threading.current_thread()
+        with self._lock:
+            self._durations.setdefault(name, []).append(end - start)
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append((name, start, end, thread.ident, tags))
+
+    def summary(self) -> list:
+        """Per-stage rows: (name, count, total_s, mean_ms, p50_ms, p95_ms, max_ms), slowest total first."""
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self._durations.items()}
+        rows = []
+        for name, values in durations.items():
+            total = sum(values)
+            rows.append((name, len(values), total, 1000 * total / len(values),
+                         1000 * percentile(values, 50), 1000 * percentile(values, 95), 1000 * values[-1]))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows
+
+    def log_summary(self):
+        if not self.enabled:
+            return
+        rows = self.summary()
+        print(f"[TRACE] {'stage':<28} {'count':>7} {'total_s':>9} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9} {'max_ms':>9}")
+        for name, count, total, mean, p50, p95, longest in rows:
+            print(f"[TRACE] {name:<28} {count:>7} {total:>9.2f} {mean:>9.1f} {p50:>9.1f} {p95:>9.1f} {longest:>9.1f}")
+        if self.dropped:
+            print(f"[TRACE] {self.dropped} span(s) over max_events={self.max_events} kept in the summary only")
+
+    def export_chrome(self, path: str) -> Optional[str]:
+        """Write spans as Chrome trace JSON (complete 'X' events, microseconds); returns the path."""
+        if not self.enabled:
+            return None
+        pid = os.getpid()
+        with self._lock:
+            events, threads = list(self._events), dict(self._threads)
+        trace = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        for name, start, end, tid, tags in events:
+            trace.append({
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': round((start - self._origin) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': {k: str(v) for k, v in tags.items()},
+            })
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp_path, path)
+        return path
+
+
+TRACER = Tracer(enabled=config.TRACE_ENABLED, max_events=config.TRACE_MAX_EVENTS)
+
+
+def span(name: str, context: bool = False, **tags):
+    return TRACER.span(name, context=context, **tags)
+
+
+def traced(name: str, tags: Callable[..., dict] = None):
+    """Decorator: run the function in a span; `tags` maps the call's arguments to span tags."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with TRACER.span(name, **(tags(*args, **kwargs) if tags else {})):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish(csv_path: str):
+    """End-of-run: print the per-stage table and write the Chrome trace next to the run's CSV."""
+    if not TRACER.enabled:
+        return
+    TRACER.log_summary()
+    try:
+        path = TRACER.export_chrome(os.path.splitext(csv_path)[0] + '_trace.json')
+        print(f"[TRACE] Chrome trace -> {path}")
+    except Exception as e:
+        print(f"ERROR writing trace: {e}")
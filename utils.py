@@ -1,25 +1,21 @@
 import openai
 from dotenv import load_dotenv
-from litellm import completion
 load_dotenv()
 
-# --- LiteLLM wrapper for Gemini 2.5 Pro with system+user prompts ---
-def call_llm(system_prompt: str, user_prompt: str, model: str = "gemini/gemini-2.5-flash", temperature: float = 0, response_format=None):
-
-    kwargs = {}
-    if response_format is not None:
-        kwargs["response_format"] = response_format
+import llm_async
+import tracing
 
-    response = completion(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=temperature,
-        **kwargs,
-    )
-    # LiteLLM returns an OpenAI-compatible response schema
-    content = response["choices"][0]["message"].get("content", "")
-    usage = response.get("usage", {})
-    return content, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
\ No newline at end of file
+# --- LiteLLM wrapper for Gemini 2.5 Pro with system+user prompts ---
+def call_llm(system_prompt: str, user_prompt: str, model: str = "gemini/gemini-2.5-flash", temperature: float = 0, response_format=None, use_cache: bool = True, purpose: str = 'other'):
+    # Runs on the shared async LLM layer (adaptive concurrency, retry with backoff, deadline, persistent cache);
+    # `purpose` labels the call in the per-run LLM accounting report (llm_metrics)
+    with tracing.span('llm.call_llm', purpose=purpose, model=model):
+        return llm_async.CLIENT.call(
+            system_prompt,
+            user_prompt,
+            model=model,
+            temperature=temperature,
+            response_format=response_format,
+            use_cache=use_cache,
+            purpose=purpose,
+        )